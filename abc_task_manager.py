@@ -34,6 +34,7 @@ from custom_types import (
     TaskStatus,
     TaskStatusUpdateEvent,
 )
+from metrics import REGISTRY, SSE_STREAMS_ACTIVE
 from utils import new_not_implemented_error
 
 logger = logging.getLogger(__name__)
@@ -84,6 +85,34 @@ class InMemoryTaskManager(TaskManager):
         self.lock = asyncio.Lock()
         self.task_sse_subscribers: dict[str, List[asyncio.Queue]] = {}
         self.subscriber_lock = asyncio.Lock()
+        self._register_metrics()
+
+    def _register_metrics(self):
+        REGISTRY.register_collector(
+            "a2a_tasks", "Tasks in the store, by state.", self._collect_task_states
+        )
+        REGISTRY.register_collector(
+            "a2a_sse_subscriber_queue_depth",
+            "Events waiting in SSE subscriber queues (total and deepest queue).",
+            self._collect_queue_depths,
+        )
+
+    def _collect_task_states(self):
+        counts = {state: 0 for state in TaskState}
+        for task in list(self.tasks.values()):
+            counts[task.status.state] += 1
+        return [({"state": state.value}, count) for state, count in counts.items()]
+
+    def _collect_queue_depths(self):
+        depths = [
+            queue.qsize()
+            for queues in list(self.task_sse_subscribers.values())
+            for queue in list(queues)
+        ]
+        return [
+            ({"stat": "total"}, sum(depths)),
+            ({"stat": "max"}, max(depths, default=0)),
+        ]
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         logger.info(f"Getting task {request.params.id}")
@@ -273,6 +302,7 @@ class InMemoryTaskManager(TaskManager):
     async def dequeue_events_for_sse(
         self, request_id, task_id, sse_event_queue: asyncio.Queue
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+        SSE_STREAMS_ACTIVE.inc()
         try:
             while True:
                 event = await sse_event_queue.get()
@@ -284,6 +314,7 @@ class InMemoryTaskManager(TaskManager):
                 if isinstance(event, TaskStatusUpdateEvent) and event.final:
                     break
         finally:
+            SSE_STREAMS_ACTIVE.dec()
             async with self.subscriber_lock:
                 if task_id in self.task_sse_subscribers:
                     self.task_sse_subscribers[task_id].remove(sse_event_queue)
@@ -0,0 +1,198 @@
+"""Admission control for agent-work JSON-RPC methods.
+
+Requests that start LLM work (``tasks/send``, ``tasks/sendSubscribe``) have to
+acquire a slot from their session's limit, their method's limit and the
+global limit. When a limit is saturated, requests wait in a short bounded
+queue. If the queue is full or the wait times out, the request is shed
+immediately instead of piling up behind the model.
+
+The narrowest limit is acquired first, so a request waiting for its session
+or method does not hold a global slot that other requests could use. All
+waits of one request share a single ``queue_timeout``.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METHOD_LIMITS = {"tasks/send": 32, "tasks/sendSubscribe": 32}
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, scope: str, retry_after: float):
+        self.scope = scope
+        self.retry_after = retry_after
+        super().__init__(f"Admission rejected by {scope} limit")
+
+
+class ConcurrencyLimit:
+    """A counting semaphore with a bounded FIFO wait queue."""
+
+    def __init__(self, limit: int, max_waiting: int):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    @property
+    def idle(self) -> bool:
+        return self.active == 0 and not self._waiters
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if self.waiting >= self.max_waiting or timeout <= 0:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        if waiter.done() and not waiter.cancelled():
+            # release() handed its slot over to us; active is unchanged.
+            return True
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        return False
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionTicket:
+    """The slots held by one admitted request. Releasing is idempotent."""
+
+    def __init__(
+        self,
+        controller: "AdmissionController",
+        limits: list[tuple[str, ConcurrencyLimit]],
+        session_id: str | None,
+    ):
+        self._controller = controller
+        self._limits = limits
+        self._session_id = session_id
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self._limits, self._session_id)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = 64,
+        method_limits: dict[str, int] | None = None,
+        max_concurrent_per_session: int = 2,
+        max_waiting_per_session: int = 1,
+        max_queue: int = 32,
+        queue_timeout: float = 0.5,
+        retry_after: float = 1.0,
+    ):
+        self.method_limits = dict(
+            DEFAULT_METHOD_LIMITS if method_limits is None else method_limits
+        )
+        self.max_concurrent_per_session = max_concurrent_per_session
+        self.max_waiting_per_session = max_waiting_per_session
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._global = ConcurrencyLimit(max_concurrent, max_queue)
+        self._methods = {
+            method: ConcurrencyLimit(limit, max_queue)
+            for method, limit in self.method_limits.items()
+        }
+        self._sessions: dict[str, ConcurrencyLimit] = {}
+
+        self.admitted: dict[str, int] = {method: 0 for method in self.method_limits}
+        self.shed: dict[str, int] = {"global": 0, "method": 0, "session": 0}
+
+    def applies_to(self, method: str) -> bool:
+        return method in self._methods
+
+    async def acquire(self, method: str, session_id: str | None) -> AdmissionTicket:
+        """Acquires session, method and global slots, in that order.
+
+        Raises AdmissionRejected when any of them cannot be obtained in time.
+        """
+        scopes: list[tuple[str, ConcurrencyLimit]] = []
+        if session_id and self.max_concurrent_per_session > 0:
+            session_limit = self._sessions.get(session_id)
+            if session_limit is None:
+                session_limit = ConcurrencyLimit(
+                    self.max_concurrent_per_session, self.max_waiting_per_session
+                )
+                self._sessions[session_id] = session_limit
+            scopes.append(("session", session_limit))
+        scopes.append(("method", self._methods[method]))
+        scopes.append(("global", self._global))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout
+        acquired: list[tuple[str, ConcurrencyLimit]] = []
+        for scope, limit in scopes:
+            try:
+                admitted = await limit.acquire(deadline - loop.time())
+            except asyncio.CancelledError:
+                self._release(acquired, session_id)
+                raise
+            if not admitted:
+                self._release(acquired, session_id)
+                self.shed[scope] += 1
+                logger.warning(f"Shedding {method} request: {scope} limit saturated")
+                raise AdmissionRejected(scope, self.retry_after)
+            acquired.append((scope, limit))
+
+        self.admitted[method] += 1
+        return AdmissionTicket(self, acquired, session_id)
+
+    def _release(
+        self, limits: Iterable[tuple[str, ConcurrencyLimit]], session_id: str | None
+    ):
+        for _scope, limit in limits:
+            limit.release()
+        session_limit = self._sessions.get(session_id) if session_id else None
+        if session_limit is not None and session_limit.idle:
+            del self._sessions[session_id]
+
+    def stats(self) -> dict:
+        return {
+            "active": self._global.active,
+            "queue_depth": self._global.waiting
+            + sum(limit.waiting for limit in self._methods.values()),
+            "methods": {
+                method: {
+                    "active": limit.active,
+                    "queue_depth": limit.waiting,
+                    "admitted": self.admitted[method],
+                }
+                for method, limit in self._methods.items()
+            },
+            "sessions_active": len(self._sessions),
+            "shed": dict(self.shed),
+        }
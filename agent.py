@@ -1,34 +1,40 @@
 import asyncio
+import logging
+import os
 from typing import Any, AsyncIterable, Dict, Literal
 
 from langchain_core.messages import AIMessage, ToolMessage
-from langchain_mcp_adapters.client import MultiServerMCPClient # type: ignore
-from langchain_groq import ChatGroq
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 from pydantic import BaseModel
 
-memory = MemorySaver()
-
-
-def _fetch_mcp_tools_sync() -> list:
-    """
-    Helper function: runs the async MultiServerMCPClient code in a synchronous manner.
-    Fetches the remote tools from your MCP server(s).
-    """
-    servers_config = {
-        "currency_server": {
-            "transport": "sse",
-            "url": "http://127.0.0.1:3000/sse",
-        }
+from agent_history import SessionHistoryMixin
+from checkpointer import agent_checkpointer
+from context_compaction import CompactedAgentState, get_context_compactor
+from currency_fast_path import (
+    FAST_PATH_REQUESTS,
+    fast_path_enabled,
+    format_conversion,
+    parse_conversion_query,
+    tool_arguments,
+)
+from mcp_pool import get_mcp_pool
+from model_provider import get_chat_model, get_mcp_tools
+from tracing import TRACING_CALLBACK
+
+logger = logging.getLogger(__name__)
+
+
+MCP_SERVERS = {
+    "currency_server": {
+        "transport": os.getenv("A2A_MCP_TRANSPORT", "sse"),
+        "url": os.getenv("A2A_MCP_URL", "http://127.0.0.1:3000/sse"),
     }
+}
 
-    async def _fetch_tools():
-        async with MultiServerMCPClient(servers_config) as client:
-            return client.get_tools()
 
-    # Run the async method in a blocking (sync) fashion
-    return asyncio.run(_fetch_tools())
+def _fetch_mcp_tools_sync() -> list:
+    """Fetches the remote tools from the MCP server(s), called over the shared session pool."""
+    return get_mcp_pool(MCP_SERVERS).get_tools()
 
 
 class ResponseFormat(BaseModel):
@@ -38,7 +44,9 @@ class ResponseFormat(BaseModel):
     message: str
 
 
-class CurrencyAgent:
+class CurrencyAgent(SessionHistoryMixin):
+    response_format = ResponseFormat
+
     SYSTEM_INSTRUCTION = (
         "You are a specialized assistant for currency conversions. "
         "Your sole purpose is to use the 'get_exchange_rate' tool to answer questions about currency exchange rates. "
@@ -51,29 +59,97 @@ class CurrencyAgent:
     )
 
     def __init__(self):
+        self.model = get_chat_model(max_tokens=2048)
         # Instead of a local @tool, fetch remote tools from MCP
-        self.tools = _fetch_mcp_tools_sync()
-
-        self.model = ChatGroq(model="meta-llama/llama-4-scout-17b-16e-instruct", max_tokens=2048)
-        self.graph = create_react_agent(
+        self._uses_pool = False
+        self._build(get_mcp_tools(self._fetch_remote_tools))
+        if self._uses_pool:
+            get_mcp_pool(MCP_SERVERS).on_tools_changed(self._on_tools_changed)
+
+    def _fetch_remote_tools(self) -> list:
+        self._uses_pool = True
+        return _fetch_mcp_tools_sync()
+
+    def _on_tools_changed(self, server):
+        """Rebuilds the graph with the new tool list; runs already started keep the old one."""
+        logger.info(f"Rebuilding CurrencyAgent for the changed tools of {server}")
+        try:
+            self._build(get_mcp_tools(self._fetch_remote_tools))
+        except Exception as e:
+            logger.error(f"Rebuilding CurrencyAgent failed, keeping the previous tools: {e}")
+
+    def _build(self, tools):
+        graph = create_react_agent(
             self.model,
-            tools=self.tools,
-            checkpointer=memory,
+            tools=tools,
+            checkpointer=agent_checkpointer("CurrencyAgent"),
             prompt=self.SYSTEM_INSTRUCTION,
             response_format=ResponseFormat,
+            pre_model_hook=get_context_compactor(self.model, "CurrencyAgent"),
+            state_schema=CompactedAgentState,
         )
+        exchange_rate_tool = next((tool for tool in tools if tool.name == "get_exchange_rate"), None)
+        self.tools, self.graph, self.exchange_rate_tool = tools, graph, exchange_rate_tool
+        self.fast_path = fast_path_enabled() and exchange_rate_tool is not None
+
+    def _parse_fast_path(self, query):
+        """Returns the parsed conversion if the query can skip the LLM."""
+        if not self.fast_path:
+            return None
+        parsed = parse_conversion_query(query)
+        if parsed is None:
+            FAST_PATH_REQUESTS.inc("fallback")
+        return parsed
+
+    def _fast_path_response(self, query, sessionId, parsed, result):
+        content = format_conversion(parsed, result)
+        if content is None:
+            FAST_PATH_REQUESTS.inc("error")
+            return None
+        FAST_PATH_REQUESTS.inc("hit")
+        response = {"is_task_complete": True, "require_user_input": False, "content": content}
+        self.record_turn(query, sessionId, response)
+        return response
 
     def invoke(self, query, sessionId) -> str:
-        config = {"configurable": {"thread_id": sessionId}}
-        self.graph.invoke({"messages": [("user", query)]}, config)
-        return self.get_agent_response(config)
+        config = {
+            "configurable": {"thread_id": sessionId},
+            "callbacks": [TRACING_CALLBACK],
+        }
+        if parsed := self._parse_fast_path(query):
+            try:
+                result = self.exchange_rate_tool.invoke(tool_arguments(parsed))
+            except Exception as e:
+                logger.warning(f"Fast path exchange rate lookup failed, using the agent: {e}")
+                result = None
+            if response := self._fast_path_response(query, sessionId, parsed, result):
+                return response
+        state = self.graph.invoke({"messages": [("user", query)]}, config)
+        return self._response_from_state(state)
 
     async def stream(self, query, sessionId) -> AsyncIterable[Dict[str, Any]]:
         inputs = {"messages": [("user", query)]}
-        config = {"configurable": {"thread_id": sessionId}}
-
-        for item in self.graph.stream(inputs, config, stream_mode="values"):
-            message = item["messages"][-1]
+        config = {
+            "configurable": {"thread_id": sessionId},
+            "callbacks": [TRACING_CALLBACK],
+        }
+        if parsed := self._parse_fast_path(query):
+            try:
+                result = await self.exchange_rate_tool.ainvoke(tool_arguments(parsed))
+            except Exception as e:
+                logger.warning(f"Fast path exchange rate lookup failed, using the agent: {e}")
+                result = None
+            # Records the turn; a checkpoint write, so keep it off the loop.
+            response = await asyncio.to_thread(
+                self._fast_path_response, query, sessionId, parsed, result
+            )
+            if response:
+                yield response
+                return
+
+        state = {}
+        for state in self.graph.stream(inputs, config, stream_mode="values"):
+            message = state["messages"][-1]
             if (
                 isinstance(message, AIMessage)
                 and message.tool_calls
@@ -91,11 +167,14 @@ class CurrencyAgent:
                     "content": "Processing the exchange rates..",
                 }
 
-        yield self.get_agent_response(config)
+        yield self._response_from_state(state)
 
     def get_agent_response(self, config):
-        current_state = self.graph.get_state(config)
-        structured_response = current_state.values.get("structured_response")
+        """Reads the response back from the checkpoint, for inspection outside a run."""
+        return self._response_from_state(self.graph.get_state(config).values)
+
+    def _response_from_state(self, state):
+        structured_response = state.get("structured_response")
         if structured_response and isinstance(structured_response, ResponseFormat):
             if structured_response.status == "input_required":
                 return {
@@ -0,0 +1,39 @@
+"""Session history for turns the agents answer without running their graph.
+
+Cache hits (specialized_agents.py), the currency fast path (agent.py) and
+turns shared across agents (task_manager.py) are written into the graph's
+checkpoint as if the model had answered, so follow-up questions see them.
+"""
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+class SessionHistoryMixin:
+    """For agents whose ``graph`` was built with ``response_format=self.response_format``."""
+
+    def has_history(self, query, sessionId) -> bool:
+        """Whether the checkpointer still holds earlier turns of the session.
+
+        Takes the query like record_turn, so that a router can pick the agent.
+        """
+        state = self.graph.get_state({"configurable": {"thread_id": sessionId}})
+        return bool(state.values.get("messages"))
+
+    def record_turn(self, query, sessionId, response):
+        """Writes a turn answered without running the graph into the session history."""
+        if response["is_task_complete"]:
+            status = "completed"
+        elif response["require_user_input"]:
+            status = "input_required"
+        else:
+            return
+        self.graph.update_state(
+            {"configurable": {"thread_id": sessionId}},
+            {
+                "messages": [HumanMessage(query), AIMessage(response["content"])],
+                "structured_response": self.response_format(
+                    status=status, message=response["content"]
+                ),
+            },
+            as_node="generate_structured_response",
+        )
@@ -1,12 +1,17 @@
+import asyncio
 import logging
 import os
 
 import click
 from dotenv import load_dotenv
 
+from admission import AdmissionController
 from agent import CurrencyAgent
 from specialized_agents import EmailWriterAgent, CodeGeneratorAgent, ImageGeneratorAgent, GameGeneratorAgent, DeepLearningAgent,RainformentAgent, DsaAgent
 from custom_types import AgentCapabilities, AgentCard, AgentSkill, MissingAPIKeyError
+from mcp_pool import close_mcp_pool
+from model_provider import requires_api_key
+from profiler import profile_to_file
 from push_notification_auth import PushNotificationSenderAuth
 from server import A2AServer
 from task_manager import AgentTaskManager
@@ -20,10 +25,46 @@ logger = logging.getLogger(__name__)
 @click.command()
 @click.option("--host", "host", default="localhost")
 @click.option("--port", "port", default=8000)
-def main(host, port):
+@click.option("--max-concurrent", "max_concurrent", default=64)
+@click.option("--max-concurrent-per-session", "max_concurrent_per_session", default=2)
+@click.option("--max-waiting-per-session", "max_waiting_per_session", default=1)
+@click.option("--admission-queue", "admission_queue", default=32)
+@click.option("--admission-timeout", "admission_timeout", default=0.5)
+@click.option(
+    "--admin-token",
+    "admin_token",
+    default=lambda: os.getenv("A2A_ADMIN_TOKEN"),
+    help="Enables the /admin/profile endpoint for bearers of this token.",
+)
+@click.option(
+    "--profile-seconds",
+    "profile_seconds",
+    default=0.0,
+    help="Sample the process for this many seconds after startup.",
+)
+@click.option("--profile-output", "profile_output", default="profile.collapsed")
+@click.option(
+    "--coalesce/--no-coalesce",
+    "coalesce",
+    default=True,
+    help="Share one agent run between identical first-turn queries in flight.",
+)
+def main(
+    host,
+    port,
+    max_concurrent,
+    max_concurrent_per_session,
+    max_waiting_per_session,
+    admission_queue,
+    admission_timeout,
+    admin_token,
+    profile_seconds,
+    profile_output,
+    coalesce,
+):
     """Starts the Multi-Agent server."""
     try:
-        if not os.getenv("GROQ_API_KEY"):
+        if requires_api_key() and not os.getenv("GROQ_API_KEY"):
             raise MissingAPIKeyError("GROQ_API_KEY environment variable not set.")
 
         capabilities = AgentCapabilities(streaming=True, pushNotifications=False)
@@ -148,11 +189,28 @@ def main(host, port):
         server = A2AServer(
             agent_card=agent_card,
             task_manager=AgentTaskManager(
-                agent=multi_agent, notification_sender_auth=notification_sender_auth
+                agent=multi_agent,
+                notification_sender_auth=notification_sender_auth,
+                coalesce_requests=coalesce,
             ),
             host=host,
             port=port,
+            admission=AdmissionController(
+                max_concurrent=max_concurrent,
+                max_concurrent_per_session=max_concurrent_per_session,
+                max_waiting_per_session=max_waiting_per_session,
+                max_queue=admission_queue,
+                queue_timeout=admission_timeout,
+            ),
+            admin_token=admin_token,
         )
+        server.app.add_event_handler("shutdown", close_mcp_pool)
+        if profile_seconds > 0:
+
+            async def start_profile():
+                asyncio.create_task(profile_to_file(profile_seconds, profile_output))
+
+            server.app.add_event_handler("startup", start_profile)
 
         server.app.add_route(
             "/.well-known/jwks.json",
@@ -0,0 +1,99 @@
+"""Load benchmark for the /.well-known/agent.json endpoint.
+
+Runs the A2AServer app in-process (no network) and compares the current
+pre-serialized handler against the previous per-request model_dump, both for
+plain GETs and for conditional GETs that revalidate with If-None-Match.
+
+    python bench_agent_card.py --requests 5000 --concurrency 50
+"""
+
+import asyncio
+import json
+import time
+
+import click
+import httpx
+from fastapi.responses import JSONResponse
+
+from custom_types import AgentCapabilities, AgentCard, AgentSkill
+from server import A2AServer
+
+
+def _make_card(n_skills: int) -> AgentCard:
+    return AgentCard(
+        name="Benchmark Agent",
+        description="Agent card used for benchmarking",
+        url="http://localhost:8000/",
+        version="1.0.0",
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[
+            AgentSkill(
+                id=f"skill_{i}",
+                name=f"Skill {i}",
+                description="A skill with a reasonably long description " * 4,
+                tags=["benchmark", "agent", "card"],
+                examples=["Example prompt one", "Example prompt two"],
+            )
+            for i in range(n_skills)
+        ],
+    )
+
+
+class _LegacyCardServer(A2AServer):
+    """Serves the card the way the server did before pre-serialization."""
+
+    async def _get_agent_card(self, request):
+        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+
+
+async def _drive(app, total: int, concurrency: int, headers: dict) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker():
+            for _ in counter:
+                start = time.perf_counter()
+                response = await client.get("/.well-known/agent.json", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        "statuses": statuses,
+    }
+
+
+@click.command()
+@click.option("--requests", "total", default=5000)
+@click.option("--concurrency", default=50)
+@click.option("--skills", default=8)
+def main(total, concurrency, skills):
+    card = _make_card(skills)
+    current = A2AServer(agent_card=card)
+    legacy = _LegacyCardServer(agent_card=card)
+    etag = current._agent_card_etag
+
+    results = {
+        "legacy_get": asyncio.run(_drive(legacy.app, total, concurrency, {})),
+        "cached_get": asyncio.run(_drive(current.app, total, concurrency, {})),
+        "cached_conditional_get": asyncio.run(
+            _drive(current.app, total, concurrency, {"If-None-Match": etag})
+        ),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
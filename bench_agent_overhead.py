@@ -0,0 +1,96 @@
+"""Per-request agent overhead with a zero-latency fake model.
+
+Compares building the response from the run's final state (current) with
+the previous extra ``graph.get_state`` after every run (legacy). The legacy
+agent is the same class with that read patched back in, so it is the only
+difference. Requests alternate between the two.
+
+    python bench_agent_overhead.py --requests 300 --history 20
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import click
+
+from bench_utils import git_revision
+
+
+def _with_legacy_read(agent, session_id):
+    """Makes the agent re-read its checkpoint after each run, like the previous code."""
+    config = {"configurable": {"thread_id": session_id}}
+    response_from_state = agent._response_from_state
+    agent._response_from_state = lambda state: response_from_state(
+        agent.graph.get_state(config).values
+    )
+    return agent
+
+
+def _invoke(agent, query, session_id):
+    return agent.invoke(query, session_id)
+
+
+def _stream(agent, query, session_id):
+    async def consume():
+        async for item in agent.stream(query, session_id):
+            last = item
+        return last
+
+    return asyncio.run(consume())
+
+
+def _stats(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "mean_us": round(statistics.mean(samples) * 1e6, 1),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6, 1),
+    }
+
+
+def _compare(call, agents: dict, requests: int, history: int) -> dict:
+    """Alternates between the agents request by request, so drift affects both equally."""
+    for name, agent in agents.items():
+        for turn in range(history):
+            call(agent, f"warm-up {turn}", name)
+    samples = {name: [] for name in agents}
+    for i in range(requests):
+        for name, agent in agents.items():
+            start = time.perf_counter()
+            call(agent, f"request {i}", name)
+            samples[name].append(time.perf_counter() - start)
+    return {name: _stats(values) for name, values in samples.items()}
+
+
+@click.command()
+@click.option("--requests", default=300, help="Measured requests per path.")
+@click.option("--history", default=20, help="Turns already in the session before measuring.")
+def main(requests, history):
+    os.environ.update(
+        {
+            "A2A_MODEL_PROVIDER": "fake",
+            "A2A_RESPONSE_CACHE": "0",
+            "A2A_SEMANTIC_CACHE": "0",
+        }
+    )
+    from specialized_agents import EmailWriterAgent
+
+    report = {"revision": git_revision(), "requests": requests, "history": history}
+    for kind, call in (("invoke", _invoke), ("stream", _stream)):
+        agents = {
+            "legacy": _with_legacy_read(EmailWriterAgent(), f"{kind}-legacy"),
+            "current": EmailWriterAgent(),
+        }
+        results = _compare(
+            lambda agent, query, name: call(agent, query, f"{kind}-{name}"), agents, requests, history
+        )
+        results["saved_us"] = round(results["legacy"]["mean_us"] - results["current"]["mean_us"], 1)
+        report[kind] = results
+    click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
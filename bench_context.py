@@ -0,0 +1,94 @@
+"""Time to first token over long sessions, with and without context compaction.
+
+Runs multi-turn sessions against EmailWriterAgent on the fake model provider.
+Its prefill time scales with prompt tokens, like a hosted model, so the full
+history gets slower every turn. Time to first token is measured on the agent
+node's model call and includes any summarization done before it.
+
+    python bench_context.py --turns 50 --sessions 3 --prefill-tps 20000
+"""
+
+import json
+import os
+import statistics
+import time
+
+import click
+
+from bench_utils import git_revision
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _run_session(agent, session_id: str, turns: int, query_chars: int):
+    filler = ("Please keep the tone formal and mention the quarterly figures. " * 20)[:query_chars]
+    config = {"configurable": {"thread_id": session_id}}
+    ttfts, prompt_tokens = [], []
+    for turn in range(turns):
+        inputs = {"messages": [("user", f"Turn {turn}: {filler}")]}
+        start, first = time.perf_counter(), None
+        for _, metadata in agent.graph.stream(inputs, config, stream_mode="messages"):
+            if first is None and metadata.get("langgraph_node") == "agent":
+                first = time.perf_counter() - start
+        ttfts.append(first or 0.0)
+        messages = agent.graph.get_state(config).values["messages"]
+        usage = next(m.usage_metadata for m in reversed(messages) if m.type == "ai")
+        prompt_tokens.append(usage["input_tokens"])
+    return ttfts, prompt_tokens
+
+
+def _summarize(ttfts_by_turn: list[list[float]], tokens_by_turn: list[list[int]]) -> dict:
+    all_ttfts = [t for turn in ttfts_by_turn for t in turn]
+    last = ttfts_by_turn[-10:]
+    return {
+        "ttft_p50_ms": round(_percentile(all_ttfts, 0.5) * 1000, 2),
+        "ttft_p95_ms": round(_percentile(all_ttfts, 0.95) * 1000, 2),
+        "ttft_last10_mean_ms": round(statistics.mean(t for turn in last for t in turn) * 1000, 2),
+        "prompt_tokens_first_turn": round(statistics.mean(tokens_by_turn[0])),
+        "prompt_tokens_last_turn": round(statistics.mean(tokens_by_turn[-1])),
+        "prompt_tokens_max": max(t for turn in tokens_by_turn for t in turn),
+    }
+
+
+@click.command()
+@click.option("--turns", default=50, help="Turns per session.")
+@click.option("--sessions", default=3, help="Sessions per mode.")
+@click.option("--query-chars", default=600, help="Length of each user message.")
+@click.option("--prefill-tps", default=20000.0, help="Simulated prompt tokens per second.")
+@click.option("--latency", default="fixed:0.02", help="Simulated base model latency.")
+@click.option("--keep-turns", default=6)
+@click.option("--max-tokens", default=4000)
+def main(turns, sessions, query_chars, prefill_tps, latency, keep_turns, max_tokens):
+    os.environ.update(
+        {
+            "A2A_MODEL_PROVIDER": "fake",
+            "A2A_FAKE_LATENCY": latency,
+            "A2A_FAKE_PREFILL_TOKENS_PER_SECOND": str(prefill_tps),
+            "A2A_CONTEXT_KEEP_TURNS": str(keep_turns),
+            "A2A_CONTEXT_MAX_TOKENS": str(max_tokens),
+            "A2A_RESPONSE_CACHE": "0",
+            "A2A_SEMANTIC_CACHE": "0",
+        }
+    )
+    from specialized_agents import EmailWriterAgent
+
+    report = {"revision": git_revision(), "turns": turns, "sessions": sessions, "modes": {}}
+    for mode, enabled in (("full_history", "0"), ("compacted", "1")):
+        os.environ["A2A_CONTEXT_COMPACTION"] = enabled
+        agent = EmailWriterAgent()
+        ttfts_by_turn = [[] for _ in range(turns)]
+        tokens_by_turn = [[] for _ in range(turns)]
+        for session in range(sessions):
+            ttfts, tokens = _run_session(agent, f"{mode}-{session}", turns, query_chars)
+            for turn in range(turns):
+                ttfts_by_turn[turn].append(ttfts[turn])
+                tokens_by_turn[turn].append(tokens[turn])
+        report["modes"][mode] = _summarize(ttfts_by_turn, tokens_by_turn)
+    click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Microbenchmark of A2AServer per-request overhead, excluding the agent.
+
+The task manager below answers immediately, so the numbers only cover body
+decoding, request validation, handler dispatch and response encoding. The
+legacy path reproduces the previous request.json() + A2ARequest union +
+isinstance chain implementation for comparison.
+
+    python bench_dispatch.py --iterations 20000
+"""
+
+import asyncio
+import json
+import time
+import uuid
+
+import click
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+from abc_task_manager import TaskManager
+from custom_types import (
+    A2ARequest,
+    CancelTaskRequest,
+    GetTaskPushNotificationRequest,
+    GetTaskRequest,
+    GetTaskResponse,
+    JSONRPCResponse,
+    SendTaskRequest,
+    SendTaskResponse,
+    SendTaskStreamingRequest,
+    SetTaskPushNotificationRequest,
+    Task,
+    TaskResubscriptionRequest,
+    TaskState,
+    TaskStatus,
+)
+from server import A2AServer
+
+
+class NoOpTaskManager(TaskManager):
+    """Answers every request with a canned task, without any agent work."""
+
+    def __init__(self):
+        self.task = Task(id="bench", sessionId="bench", status=TaskStatus(state=TaskState.COMPLETED))
+
+    async def on_get_task(self, request):
+        return GetTaskResponse(id=request.id, result=self.task)
+
+    async def on_send_task(self, request):
+        return SendTaskResponse(id=request.id, result=self.task)
+
+    async def on_cancel_task(self, request):
+        return JSONRPCResponse(id=request.id)
+
+    async def on_send_task_subscribe(self, request):
+        return JSONRPCResponse(id=request.id)
+
+    async def on_set_task_push_notification(self, request):
+        return JSONRPCResponse(id=request.id)
+
+    async def on_get_task_push_notification(self, request):
+        return JSONRPCResponse(id=request.id)
+
+    async def on_resubscribe_to_task(self, request):
+        return JSONRPCResponse(id=request.id)
+
+
+class LegacyDispatchServer(A2AServer):
+    """The request handling as it was before direct method dispatch."""
+
+    async def _process_request(self, request):
+        try:
+            body = await request.json()
+            json_rpc_request = A2ARequest.validate_python(body)
+
+            if isinstance(json_rpc_request, GetTaskRequest):
+                result = await self.task_manager.on_get_task(json_rpc_request)
+            elif isinstance(json_rpc_request, SendTaskRequest):
+                result = await self.task_manager.on_send_task(json_rpc_request)
+            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
+                result = await self.task_manager.on_send_task_subscribe(json_rpc_request)
+            elif isinstance(json_rpc_request, CancelTaskRequest):
+                result = await self.task_manager.on_cancel_task(json_rpc_request)
+            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
+                result = await self.task_manager.on_set_task_push_notification(json_rpc_request)
+            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
+                result = await self.task_manager.on_get_task_push_notification(json_rpc_request)
+            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
+                result = await self.task_manager.on_resubscribe_to_task(json_rpc_request)
+            else:
+                raise ValueError(f"Unexpected request type: {type(json_rpc_request)}")
+
+            return JSONResponse(result.model_dump(exclude_none=True))
+        except Exception as e:
+            return self._handle_exception(e)
+
+
+PAYLOADS = {
+    "tasks/get": {"id": "task-1", "historyLength": 10},
+    "tasks/send": {
+        "id": "task-1",
+        "sessionId": "session-1",
+        "message": {
+            "role": "user",
+            "parts": [{"type": "text", "text": "Implement a binary search algorithm"}],
+        },
+        "acceptedOutputModes": ["text", "text/plain"],
+    },
+}
+
+
+def _make_request(body: bytes) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": []}
+    return Request(scope, receive)
+
+
+async def _time_server(server: A2AServer, body: bytes, iterations: int) -> float:
+    for _ in range(200):
+        await server._process_request(_make_request(body))
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await server._process_request(_make_request(body))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+@click.command()
+@click.option("--iterations", default=20000)
+def main(iterations):
+    task_manager = NoOpTaskManager()
+    servers = {
+        "legacy": LegacyDispatchServer(task_manager=task_manager),
+        "direct": A2AServer(task_manager=task_manager),
+    }
+    results = {}
+    for method, params in PAYLOADS.items():
+        body = json.dumps(
+            {"jsonrpc": "2.0", "id": uuid.uuid4().hex, "method": method, "params": params}
+        ).encode()
+        results[method] = {
+            name: round(asyncio.run(_time_server(server, body, iterations)), 2)
+            for name, server in servers.items()
+        }
+    print(json.dumps({"us_per_request": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""MCP tool-call latency: one-shot client per call vs. the warm session pool.
+
+Starts mcp_app.py (unless --url points at a running server) and calls
+get_exchange_rate three ways:
+
+* one_shot: a fresh MultiServerMCPClient per call, i.e. the transport setup
+  that the throwaway client forced onto every call;
+* pooled: sequential calls over MCPSessionPool;
+* pooled_concurrent: ``--concurrency`` callers sharing the pool.
+
+    python bench_mcp.py --calls 200 --concurrency 16
+"""
+
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+import httpx
+
+from bench_utils import git_revision
+
+
+def _stats(samples: list[float], elapsed: float) -> dict:
+    samples = sorted(samples)
+    return {
+        "calls": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 2),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+        "throughput_per_s": round(len(samples) / elapsed, 1),
+    }
+
+
+def _wait_for_server(url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with httpx.stream("GET", url, timeout=1.0) as response:
+                if response.status_code == 200:
+                    return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"MCP server at {url} did not come up")
+
+
+async def _one_shot(servers: dict, calls: int) -> dict:
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
+    samples = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        async with MultiServerMCPClient(servers) as client:
+            await client.get_tools()[0].ainvoke({"currency_to": "EUR"})
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples, time.perf_counter() - start)
+
+
+async def _pooled(tool, calls: int, concurrency: int) -> dict:
+    samples = []
+    remaining = iter(range(calls))
+
+    async def worker():
+        for _ in remaining:
+            t0 = time.perf_counter()
+            await tool.ainvoke({"currency_to": "EUR"})
+            samples.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _stats(samples, time.perf_counter() - start)
+
+
+@click.command()
+@click.option("--url", default=None, help="Use a running MCP server instead of starting one.")
+@click.option("--calls", default=200, help="Calls per mode.")
+@click.option("--one-shot-calls", default=50, help="Calls for the slow one-shot mode.")
+@click.option("--concurrency", default=16)
+@click.option("--sessions", default=4, help="Pooled sessions.")
+def main(url, calls, one_shot_calls, concurrency, sessions):
+    server = None
+    if url is None:
+        url = "http://127.0.0.1:3000/sse"
+        server = subprocess.Popen(
+            [sys.executable, "mcp_app.py"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    try:
+        _wait_for_server(url)
+        servers = {"currency_server": {"transport": "sse", "url": url}}
+        from mcp_pool import MCPSessionPool
+
+        pool = MCPSessionPool(servers, sessions_per_server=sessions, refresh_interval=0)
+        tool = pool.get_tools()[0]
+
+        async def run():
+            await tool.ainvoke({"currency_to": "EUR"})  # warm-up
+            return {
+                "one_shot": await _one_shot(servers, one_shot_calls),
+                "pooled": await _pooled(tool, calls, 1),
+                "pooled_concurrent": await _pooled(tool, calls, concurrency),
+            }
+
+        report = {
+            "revision": git_revision(),
+            "sessions": sessions,
+            "concurrency": concurrency,
+            "modes": asyncio.run(run()),
+        }
+        pool.close()
+        click.echo(json.dumps(report, indent=2))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Precision and latency of the semantic response cache.
+
+Each base prompt gets paraphrases that should hit the cache (different
+casing and punctuation, polite padding). A set of reworded prompts, with
+words added, dropped or swapped, also should hit, and is what the threshold
+trades against the near misses. Each base prompt also gets near misses
+that must not hit. Some use the same template with a different subject,
+such as "binary search" versus "merge sort". Others change a single
+modifier, such as "ascending" versus "descending" or "Python" versus "Java".
+The benchmark reports precision and
+recall per similarity threshold, plus lookup and insert latency at several
+cache sizes.
+
+    python bench_semantic_cache.py --thresholds 0.8,0.85,0.9,0.95
+"""
+
+import json
+import random
+import time
+
+import click
+
+from semantic_cache import SemanticCache
+
+SUBJECTS = [
+    "binary search", "merge sort", "quick sort", "a linked list", "a hash map",
+    "dijkstra's shortest path", "a trie", "breadth first search", "a min heap",
+    "an LRU cache", "topological sort", "union find", "a segment tree",
+    "depth first search", "bubble sort", "a binary search tree",
+]
+TEMPLATES = [
+    "Implement {} in Python",
+    "Write a function for {}",
+    "Explain the time complexity of {}",
+    "Draft an email to my team about {}",
+]
+# (cached, near miss) pairs that differ in one word or in word order.
+MODIFIER_PAIRS = [
+    ("Sort a list ascending", "Sort a list descending"),
+    ("Reverse a singly linked list", "Reverse a doubly linked list"),
+    ("Reverse a linked list", "Reverse a doubly linked list"),
+    ("Code binary search in Python", "Code binary search in Java"),
+    ("Write a function for merge sort in Python", "Write a function for merge sort in Rust"),
+    ("Find the maximum of an array", "Find the minimum of an array"),
+    ("Explain the best case complexity of quick sort", "Explain the worst case complexity of quick sort"),
+    ("Convert 100 USD to EUR", "Convert 100 EUR to USD"),
+    ("Convert 100 USD to EUR", "Convert 1000 USD to EUR"),
+    ("Draft an email to my team about the launch", "Draft an email to my manager about the launch"),
+]
+# (cached, reworded) pairs that ask the same thing in other words.
+REWORDINGS = [
+    ("Explain the time complexity of radix sort", "Explain radix sort time complexity"),
+    ("Explain the time complexity of radix sort", "What is the time complexity of radix sort"),
+    ("Write a function for a bloom filter", "Write a bloom filter function"),
+    ("Write a function for a bloom filter", "Write a function for a bloom filter data structure"),
+    ("Implement heapsort in Python", "Implement a heapsort in Python code"),
+    ("Implement heapsort in Python", "Python implementation of heapsort"),
+    ("Implement heapsort in Python", "Write heapsort in Python"),
+    ("Draft an email to my team about the offsite", "Draft an email for my team about the offsite"),
+    ("Draft an email to my team about the offsite", "Write an email to my team about the offsite"),
+    ("Convert 100 USD to EUR", "Convert 100 USD into EUR"),
+    ("Convert 100 USD to EUR", "How much is 100 USD in EUR"),
+]
+PARAPHRASES = [
+    lambda q: q.lower(),
+    lambda q: q + "?",
+    lambda q: "Please " + q[0].lower() + q[1:],
+    lambda q: "Can you " + q[0].lower() + q[1:] + "?",
+    lambda q: q.upper() + "!",
+    lambda q: "  " + q.replace(" ", "  ") + " ",
+    lambda q: q + " please",
+]
+
+
+def build_dataset(rng: random.Random):
+    cached, positives, negatives = [], [], []
+    subjects = SUBJECTS[:]
+    rng.shuffle(subjects)
+    held_out = subjects[len(subjects) // 2 :]
+    for template in TEMPLATES:
+        for subject in subjects[: len(subjects) // 2]:
+            query = template.format(subject)
+            cached.append(query)
+            positives.extend((paraphrase(query), query) for paraphrase in PARAPHRASES)
+        for subject in held_out:
+            negatives.append(template.format(subject))
+    for query, near_miss in MODIFIER_PAIRS:
+        if query not in cached:
+            cached.append(query)
+            positives.extend((paraphrase(query), query) for paraphrase in PARAPHRASES)
+        negatives.append(near_miss)
+    for query, reworded in REWORDINGS:
+        if query not in cached:
+            cached.append(query)
+        positives.append((reworded, query))
+    return cached, positives, negatives
+
+
+def precision_recall(cache: SemanticCache, positives, negatives, threshold: float) -> dict:
+    cache.threshold = threshold
+    true_hits = wrong_hits = false_hits = 0
+    for query, expected in positives:
+        match = cache.get("bench", query)
+        if match == expected:
+            true_hits += 1
+        elif match is not None:
+            wrong_hits += 1
+    for query in negatives:
+        if cache.get("bench", query) is not None:
+            false_hits += 1
+    hits = true_hits + wrong_hits + false_hits
+    return {
+        "threshold": threshold,
+        "precision": round(true_hits / hits, 4) if hits else None,
+        "recall": round(true_hits / len(positives), 4),
+        "false_hits": false_hits,
+        "wrong_answer_hits": wrong_hits,
+    }
+
+
+def latency(size: int, rng: random.Random, lookups: int) -> dict:
+    cache = SemanticCache(max_entries=size)
+    words = [s.split()[-1] for s in SUBJECTS] + ["email", "code", "python", "rust", "design"]
+    start = time.perf_counter()
+    for i in range(size):
+        cache.put("bench", " ".join(rng.choices(words, k=6)) + f" {i}", i)
+    insert_us = (time.perf_counter() - start) / size * 1e6
+
+    timings = []
+    for _ in range(lookups):
+        query = " ".join(rng.choices(words, k=6))
+        start = time.perf_counter()
+        cache.get("bench", query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "entries": size,
+        "insert_us": round(insert_us, 1),
+        "lookup_p50_us": round(timings[len(timings) // 2] * 1e6, 1),
+        "lookup_p99_us": round(timings[int(len(timings) * 0.99)] * 1e6, 1),
+    }
+
+
+@click.command()
+@click.option("--thresholds", default="0.75,0.8,0.85,0.9,0.95")
+@click.option("--sizes", default="256,2048,16384")
+@click.option("--lookups", default=2000)
+@click.option("--seed", default=0)
+def main(thresholds, sizes, lookups, seed):
+    rng = random.Random(seed)
+    cached, positives, negatives = build_dataset(rng)
+    cache = SemanticCache(max_entries=len(cached))
+    for query in cached:
+        cache.put("bench", query, query)
+
+    results = {
+        "dataset": {"cached": len(cached), "paraphrases": len(positives), "near_misses": len(negatives)},
+        "quality": [
+            precision_recall(cache, positives, negatives, float(t)) for t in thresholds.split(",")
+        ],
+        "latency": [latency(int(size), rng, lookups) for size in sizes.split(",")],
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Load-testing harness for A2AServer + AgentTaskManager.
+
+Starts the server in a subprocess with a stub agent (no LLM, no network) and
+drives a configurable mix of tasks/send, tasks/sendSubscribe, tasks/get and
+tasks/resubscribe at a fixed concurrency. It prints a JSON report covering
+throughput, latency percentiles, time to first SSE event, server memory
+growth and the server's event-loop lag. Compare reports from two commits to
+spot regressions.
+
+    python bench_server.py --concurrency 32 --duration 30 \\
+        --mix send=0.3,subscribe=0.4,get=0.2,resubscribe=0.1 --output before.json
+
+``--agent multi`` runs the real MultiAgent instead, with the fake model
+provider and MCP stub from model_provider.py. Every task sends a distinct
+query, because the server coalesces identical in-flight first-turn queries
+into one run; ``--same-query`` measures that coalescing instead.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import time
+import uuid
+
+import click
+import httpx
+
+from bench_utils import git_revision
+from fakes import LatencyDistribution
+
+OPERATIONS = ("send", "subscribe", "get", "resubscribe")
+
+
+class StubAgent:
+    """Answers after a sampled delay, like an agent whose model is very predictable."""
+
+    SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
+
+    def __init__(self, latency: str = "fixed:0.05", steps: int = 2, seed: int = 0):
+        self.latency = LatencyDistribution(latency)
+        self.steps = steps
+        self.rng = random.Random(seed)
+
+    def invoke(self, query, sessionId):
+        # Synchronous like the real agents; AgentTaskManager runs it in a worker thread.
+        time.sleep(self.latency.sample(self.rng))
+        return {"is_task_complete": True, "require_user_input": False, "content": f"Echo: {query}"}
+
+    async def stream(self, query, sessionId):
+        for _ in range(self.steps - 1):
+            await asyncio.sleep(self.latency.sample(self.rng) / self.steps)
+            yield {"is_task_complete": False, "require_user_input": False, "content": "Working..."}
+        await asyncio.sleep(self.latency.sample(self.rng) / self.steps)
+        yield {"is_task_complete": True, "require_user_input": False, "content": f"Echo: {query}"}
+
+
+def _serve(host: str, port: int, agent_kind: str, latency: str):
+    import logging
+
+    logging.basicConfig(level=logging.WARNING)
+    from custom_types import AgentCapabilities, AgentCard, AgentSkill
+    from push_notification_auth import PushNotificationSenderAuth
+    from server import A2AServer
+    from task_manager import AgentTaskManager
+
+    if agent_kind == "multi":
+        os.environ.setdefault("A2A_MODEL_PROVIDER", "fake")
+        os.environ.setdefault("A2A_MCP_STUB", "1")
+        os.environ.setdefault("A2A_FAKE_LATENCY", latency)
+        from multi_agent import MultiAgent
+
+        agent = MultiAgent()
+    else:
+        agent = StubAgent(latency)
+
+    card = AgentCard(
+        name="Benchmark Agent",
+        url=f"http://{host}:{port}/",
+        version="1.0.0",
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[AgentSkill(id="echo", name="Echo")],
+    )
+    server = A2AServer(
+        host=host,
+        port=port,
+        agent_card=card,
+        task_manager=AgentTaskManager(agent=agent, notification_sender_auth=PushNotificationSenderAuth()),
+    )
+    server.start()
+
+
+def _rss_mb(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _percentiles(values: list[float]) -> dict[str, float | None]:
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    values = sorted(values)
+
+    def pick(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)
+
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def _parse_lag(metrics_text: str) -> dict[str, float]:
+    lag = {}
+    for line in metrics_text.splitlines():
+        if line.startswith("a2a_event_loop_lag_seconds{"):
+            quantile = line.split('quantile="')[1].split('"')[0]
+            lag[f"q{quantile}_ms"] = round(float(line.rsplit(" ", 1)[1]) * 1000, 2)
+    return lag
+
+
+def _rpc(method: str, params: dict) -> dict:
+    return {"jsonrpc": "2.0", "id": uuid.uuid4().hex, "method": method, "params": params}
+
+
+def _send_params(task_id: str, query: str) -> dict:
+    return {
+        "id": task_id,
+        "sessionId": uuid.uuid4().hex,
+        "message": {"role": "user", "parts": [{"type": "text", "text": query}]},
+        "acceptedOutputModes": ["text"],
+    }
+
+
+class LoadGenerator:
+    def __init__(self, url: str, mix: dict[str, float], timeout: float, same_query: bool = False):
+        self.url = url
+        self.same_query = same_query
+        self.sent = 0
+        self.operations = list(mix)
+        self.weights = [mix[op] for op in self.operations]
+        self.timeout = timeout
+        self.latencies: dict[str, list[float]] = {op: [] for op in OPERATIONS}
+        self.errors: dict[str, int] = {op: 0 for op in OPERATIONS}
+        self.first_event: list[float] = []
+        self.known_tasks: list[str] = []
+        self.streaming_tasks: set[str] = set()
+        self.rng = random.Random(0)
+
+    def _query(self) -> str:
+        # Distinct queries, so identical in-flight requests are not coalesced into one run.
+        if self.same_query:
+            return "convert 100 USD to EUR"
+        self.sent += 1
+        return f"convert {self.sent} USD to EUR"
+
+    async def _stream(self, client: httpx.AsyncClient, payload: dict, start: float) -> bool:
+        got_final = False
+        first = payload["method"] == "tasks/sendSubscribe"
+        async with client.stream("POST", self.url, json=payload, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                return False
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                if first:
+                    self.first_event.append(time.perf_counter() - start)
+                    first = False
+                event = json.loads(line[5:])
+                if "error" in event:
+                    return False
+                if event.get("result", {}).get("final"):
+                    got_final = True
+        return got_final
+
+    def _resolve(self, op: str) -> str:
+        """``op``, or the request it falls back to while there is no task for it yet."""
+        if op == "get" and not self.known_tasks:
+            return "send"
+        if op == "resubscribe" and not self.streaming_tasks:
+            return "subscribe"
+        return op
+
+    async def run_one(self, client: httpx.AsyncClient, op: str) -> bool:
+        if op == "get":
+            task_id = self.rng.choice(self.known_tasks)
+            response = await client.post(
+                self.url, json=_rpc("tasks/get", {"id": task_id, "historyLength": 5}), timeout=self.timeout
+            )
+            return response.status_code == 200 and "error" not in response.json()
+        if op == "resubscribe":
+            task_id = self.rng.choice(sorted(self.streaming_tasks))
+            payload = _rpc("tasks/resubscribe", {"id": task_id})
+            return await self._stream(client, payload, time.perf_counter())
+        if op == "subscribe":
+            task_id = uuid.uuid4().hex
+            self.streaming_tasks.add(task_id)
+            try:
+                payload = _rpc("tasks/sendSubscribe", _send_params(task_id, self._query()))
+                ok = await self._stream(client, payload, time.perf_counter())
+            finally:
+                self.streaming_tasks.discard(task_id)
+            self.known_tasks.append(task_id)
+            return ok
+
+        task_id = uuid.uuid4().hex
+        response = await client.post(self.url, json=_rpc("tasks/send", _send_params(task_id, self._query())), timeout=self.timeout)
+        self.known_tasks.append(task_id)
+        return response.status_code == 200 and "error" not in response.json()
+
+    async def worker(self, client: httpx.AsyncClient, deadline: float):
+        while time.perf_counter() < deadline:
+            # Latencies are recorded under the request actually sent.
+            op = self._resolve(self.rng.choices(self.operations, self.weights)[0])
+            start = time.perf_counter()
+            try:
+                ok = await self.run_one(client, op)
+            except (httpx.HTTPError, ValueError):
+                ok = False
+            self.latencies[op].append(time.perf_counter() - start)
+            if not ok:
+                self.errors[op] += 1
+
+    async def run(self, concurrency: int, duration: float) -> float:
+        limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits) as client:
+            deadline = time.perf_counter() + duration
+            start = time.perf_counter()
+            await asyncio.gather(*(self.worker(client, deadline) for _ in range(concurrency)))
+            return time.perf_counter() - start
+
+
+async def _wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(base_url + "/.well-known/agent.json")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+@click.command()
+@click.option("--concurrency", default=16)
+@click.option("--duration", default=20.0, help="Seconds of load after warm-up.")
+@click.option("--warmup", default=3.0)
+@click.option("--mix", default="send=0.3,subscribe=0.4,get=0.2,resubscribe=0.1")
+@click.option("--agent", "agent_kind", type=click.Choice(["stub", "multi"]), default="stub")
+@click.option("--agent-latency", default="lognormal:-3,0.5", help="Latency distribution spec.")
+@click.option("--port", default=8765)
+@click.option("--timeout", default=30.0)
+@click.option("--output", default=None, help="Write the JSON report here as well.")
+@click.option(
+    "--same-query/--unique-queries",
+    default=False,
+    help="Send one identical query, which the server coalesces; measures coalescing.",
+)
+def main(concurrency, duration, warmup, mix, agent_kind, agent_latency, port, timeout, output, same_query):
+    weights = {}
+    for item in mix.split(","):
+        op, _, weight = item.partition("=")
+        if op.strip() not in OPERATIONS:
+            raise click.BadParameter(f"Unknown operation {op}", param_hint="--mix")
+        weights[op.strip()] = float(weight)
+
+    host = "127.0.0.1"
+    base_url = f"http://{host}:{port}"
+    process = multiprocessing.get_context("spawn").Process(
+        target=_serve, args=(host, port, agent_kind, agent_latency), daemon=True
+    )
+    process.start()
+    try:
+        asyncio.run(_wait_ready(base_url))
+        if warmup > 0:
+            asyncio.run(
+                LoadGenerator(base_url + "/", weights, timeout, same_query).run(concurrency, warmup)
+            )
+        rss_before = _rss_mb(process.pid)
+
+        generator = LoadGenerator(base_url + "/", weights, timeout, same_query)
+        elapsed = asyncio.run(generator.run(concurrency, duration))
+
+        rss_after = _rss_mb(process.pid)
+        metrics_text = httpx.get(base_url + "/metrics").text
+    finally:
+        process.terminate()
+        process.join(5)
+
+    total = sum(len(v) for v in generator.latencies.values())
+    report = {
+        "revision": git_revision(),
+        "config": {
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "mix": weights,
+            "agent": agent_kind,
+            "agent_latency": agent_latency,
+            "same_query": same_query,
+        },
+        "throughput_rps": round(total / elapsed, 2),
+        "operations": {
+            op: {
+                "count": len(generator.latencies[op]),
+                "errors": generator.errors[op],
+                **_percentiles(generator.latencies[op]),
+            }
+            for op in OPERATIONS
+            if generator.latencies[op]
+        },
+        "time_to_first_sse_event": _percentiles(generator.first_event),
+        "server_rss_mb": {
+            "before": rss_before,
+            "after": rss_after,
+            "growth": None if rss_before is None or rss_after is None else round(rss_after - rss_before, 2),
+        },
+        "event_loop_lag": _parse_lag(metrics_text),
+    }
+    text = json.dumps(report, indent=2)
+    click.echo(text)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
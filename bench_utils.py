@@ -0,0 +1,13 @@
+"""Helpers shared by the bench_*.py scripts."""
+
+import subprocess
+
+
+def git_revision() -> str:
+    """The short commit hash of the checkout, recorded in every report."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
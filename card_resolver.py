@@ -1,8 +1,19 @@
+import asyncio
+import hashlib
 import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
 
 import httpx
 
 from custom_types import A2AClientJSONError, AgentCard
+from utils import run_sync
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CARD_CACHE_DIR = Path.home() / ".cache" / "a2a" / "agent_cards"
 
 
 class A2ACardResolver:
@@ -17,4 +28,167 @@ class A2ACardResolver:
             try:
                 return AgentCard(**response.json())
             except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
\ No newline at end of file
+                raise A2AClientJSONError(str(e)) from e
+
+
+class AgentCardCache:
+    """Stores fetched agent card documents on disk together with their ETag."""
+
+    def __init__(self, cache_dir: str | Path | None = None):
+        self.cache_dir = Path(
+            cache_dir or os.getenv("A2A_CARD_CACHE_DIR") or DEFAULT_CARD_CACHE_DIR
+        )
+
+    def _path_for(self, base_url: str) -> Path:
+        digest = hashlib.sha256(base_url.encode()).hexdigest()[:32]
+        return self.cache_dir / f"{digest}.json"
+
+    def load(self, base_url: str) -> tuple[dict[str, Any], str | None] | None:
+        path = self._path_for(base_url)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            return entry["card"], entry.get("etag")
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable agent card cache {path}: {e}")
+            return None
+
+    def store(self, base_url: str, card: dict[str, Any], etag: str | None) -> None:
+        path = self._path_for(base_url)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps({"url": base_url, "etag": etag, "card": card}),
+                encoding="utf-8",
+            )
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write agent card cache {path}: {e}")
+
+
+class AsyncA2ACardResolver:
+    """Resolves the agent cards of many remote agents concurrently.
+
+    Every address gets its own timeout, so one slow or dead agent neither
+    delays nor aborts the others. Successful fetches are cached on disk and
+    revalidated with ``If-None-Match`` on the next startup.
+    """
+
+    def __init__(
+        self,
+        agent_card_path: str = "/.well-known/agent.json",
+        timeout: float = 5.0,
+        cache: AgentCardCache | None = None,
+    ):
+        self.agent_card_path = agent_card_path.lstrip("/")
+        self.timeout = timeout
+        self.cache = cache if cache is not None else AgentCardCache()
+
+    async def fetch_card_document(
+        self, client: httpx.AsyncClient, base_url: str
+    ) -> dict[str, Any]:
+        base_url = base_url.rstrip("/")
+        cached = self.cache.load(base_url)
+        headers = {}
+        if cached and cached[1]:
+            headers["If-None-Match"] = cached[1]
+
+        response = await client.get(
+            base_url + "/" + self.agent_card_path,
+            headers=headers,
+            timeout=self.timeout,
+        )
+        if response.status_code == 304 and cached:
+            logger.debug(f"Agent card for {base_url} not modified")
+            return cached[0]
+
+        response.raise_for_status()
+        try:
+            document = response.json()
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+
+        self.cache.store(base_url, document, response.headers.get("etag"))
+        return document
+
+    async def fetch_all(
+        self, base_urls: Iterable[str]
+    ) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        """Fetches all card documents at once.
+
+        Returns the documents keyed by address and the addresses that failed.
+        """
+        base_urls = list(base_urls)
+        async with httpx.AsyncClient() as client:
+            results = await asyncio.gather(
+                *(self.fetch_card_document(client, url) for url in base_urls),
+                return_exceptions=True,
+            )
+
+        documents: dict[str, dict[str, Any]] = {}
+        failed: list[str] = []
+        for url, result in zip(base_urls, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Could not resolve agent card for {url}: {result}")
+                failed.append(url)
+            else:
+                documents[url] = result
+        return documents, failed
+
+    async def resolve_all(
+        self, base_urls: Iterable[str]
+    ) -> tuple[dict[str, AgentCard], list[str]]:
+        documents, failed = await self.fetch_all(base_urls)
+        cards: dict[str, AgentCard] = {}
+        for url, document in documents.items():
+            try:
+                cards[url] = AgentCard(**document)
+            except ValueError as e:
+                logger.warning(f"Invalid agent card from {url}: {e}")
+                failed.append(url)
+        return cards, failed
+
+    def fetch_all_sync(
+        self, base_urls: Iterable[str]
+    ) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        return run_sync(self.fetch_all(base_urls))
+
+    def resolve_all_sync(
+        self, base_urls: Iterable[str]
+    ) -> tuple[dict[str, AgentCard], list[str]]:
+        return run_sync(self.resolve_all(base_urls))
+
+    def retry_in_background(
+        self,
+        base_urls: Iterable[str],
+        on_resolved: Callable[[str, dict[str, Any]], None],
+        initial_delay: float = 2.0,
+        max_delay: float = 60.0,
+    ) -> Optional[asyncio.Task]:
+        """Keeps retrying unreachable agents with exponential backoff.
+
+        Must be called on the event loop that owns the caller's state. The
+        retry runs as a task on that loop, so ``on_resolved`` is called there,
+        with the address and the raw card document, as soon as an agent
+        becomes reachable.
+        """
+        pending = list(base_urls)
+        if not pending:
+            return None
+
+        async def _retry_loop():
+            delay = initial_delay
+            remaining = pending
+            while remaining:
+                await asyncio.sleep(delay)
+                documents, remaining = await self.fetch_all(remaining)
+                for url, document in documents.items():
+                    try:
+                        on_resolved(url, document)
+                    except Exception as e:
+                        logger.error(f"Failed to register agent card from {url}: {e}")
+                delay = min(delay * 2, max_delay)
+
+        return asyncio.get_running_loop().create_task(_retry_loop(), name="agent-card-retry")
@@ -0,0 +1,317 @@
+"""Record/replay of chat-model and MCP tool interactions.
+
+In ``record`` mode every model call and tool call goes to the real backend,
+and the response is appended to a JSON-lines cassette together with the
+observed latency. The cassette is gzip-compressed when the path ends in
+``.gz``. In ``replay`` mode the responses are served from the cassette
+without network access. Calls are matched on a hash of the request (the
+conversation without message ids, the bound tools and the tool choice, or
+the tool name and arguments). Identical requests replay in recorded order.
+``timing="original"`` sleeps for the recorded latency scaled by ``speed``.
+``timing="fast"`` returns at once.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    ToolMessage,
+    message_chunk_to_message,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from chat_wrapper import WrappedChatModel
+
+logger = logging.getLogger(__name__)
+
+MODES = ("record", "replay")
+TIMINGS = ("original", "fast")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _digest(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:24]
+
+
+def _message_key(message: BaseMessage) -> dict:
+    key = {"type": message.type, "content": message.content}
+    if isinstance(message, AIMessage) and message.tool_calls:
+        key["tool_calls"] = [{"name": c["name"], "args": c["args"]} for c in message.tool_calls]
+    if isinstance(message, ToolMessage):
+        key["name"] = message.name
+    return key
+
+
+def llm_request_key(messages: Sequence[BaseMessage], tools: list | None, tool_choice: Any) -> str:
+    return _digest(
+        {
+            "messages": [_message_key(m) for m in messages],
+            "tools": sorted(t["function"]["name"] for t in tools or []),
+            "tool_choice": tool_choice,
+        }
+    )
+
+
+def tool_request_key(name: str, args: dict) -> str:
+    return _digest({"name": name, "args": args})
+
+
+def _to_chunk(message: AIMessage) -> AIMessageChunk:
+    return AIMessageChunk(
+        content=message.content,
+        tool_call_chunks=[
+            {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+            for i, c in enumerate(message.tool_calls)
+        ],
+        usage_metadata=message.usage_metadata,
+    )
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", timing: str = "original", speed: float = 1.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if timing not in TIMINGS:
+            raise ValueError(f"Unknown cassette timing: {timing}")
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._interactions: dict[str, list[dict]] = defaultdict(list)
+        self._cursors: dict[str, int] = defaultdict(int)
+        self._tool_schemas: dict[str, dict] = {}
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        with _open(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["kind"] == "tool_schema":
+                    self._tool_schemas[entry["name"]] = entry
+                else:
+                    self._interactions[entry["key"]].append(entry)
+        logger.info(
+            f"Loaded {sum(map(len, self._interactions.values()))} interactions from {self.path}"
+        )
+
+    def _append(self, entry: dict):
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock, _open(self.path, "a") as f:
+            f.write(line + "\n")
+
+    def _next(self, key: str, description: str) -> dict:
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded {description} for key {key} in {self.path}")
+            # Repeats of an identical request replay in recorded order, then wrap around.
+            entry = entries[self._cursors[key] % len(entries)]
+            self._cursors[key] += 1
+            return entry
+
+    def delay(self, seconds: float) -> float:
+        return seconds * self.speed if self.timing == "original" else 0.0
+
+    def record_llm(self, key: str, message: AIMessage, first_token: float, total: float):
+        self._append(
+            {
+                "kind": "llm",
+                "key": key,
+                "response": message_to_dict(message),
+                "latency": {"first_token": round(first_token, 4), "total": round(total, 4)},
+            }
+        )
+
+    def replay_llm(self, key: str) -> tuple[AIMessage, float, float]:
+        entry = self._next(key, "model response")
+        message = messages_from_dict([entry["response"]])[0]
+        return message, entry["latency"]["first_token"], entry["latency"]["total"]
+
+    def record_tool(self, name: str, args: dict, result: Any, latency: float):
+        self._append(
+            {
+                "kind": "tool",
+                "key": tool_request_key(name, args),
+                "name": name,
+                "args": args,
+                "result": result,
+                "latency": round(latency, 4),
+            }
+        )
+
+    def replay_tool(self, name: str, args: dict) -> tuple[Any, float]:
+        entry = self._next(tool_request_key(name, args), f"result of tool {name}")
+        return entry["result"], entry["latency"]
+
+    def record_tools(self, tools: list[BaseTool]) -> list[BaseTool]:
+        """Wraps tools so that every call is recorded, along with each tool's schema."""
+        wrapped = []
+        for tool in tools:
+            function = convert_to_openai_tool(tool)["function"]
+            self._append(
+                {
+                    "kind": "tool_schema",
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": function.get("parameters", {}),
+                }
+            )
+
+            def _sync(_tool=tool, **kwargs):
+                start = time.perf_counter()
+                result = _tool.invoke(kwargs)
+                self.record_tool(_tool.name, kwargs, result, time.perf_counter() - start)
+                return result
+
+            async def _async(_tool=tool, **kwargs):
+                start = time.perf_counter()
+                result = await _tool.ainvoke(kwargs)
+                self.record_tool(_tool.name, kwargs, result, time.perf_counter() - start)
+                return result
+
+            wrapped.append(
+                StructuredTool(
+                    name=tool.name,
+                    description=tool.description,
+                    args_schema=tool.args_schema,
+                    func=_sync,
+                    coroutine=_async,
+                )
+            )
+        return wrapped
+
+    def replay_tools(self) -> list[BaseTool]:
+        """Rebuilds the recorded tools, answering from the cassette."""
+        tools = []
+        for name, schema in self._tool_schemas.items():
+
+            def _sync(_name=name, **kwargs):
+                result, latency = self.replay_tool(_name, kwargs)
+                time.sleep(self.delay(latency))
+                return result
+
+            async def _async(_name=name, **kwargs):
+                result, latency = self.replay_tool(_name, kwargs)
+                await asyncio.sleep(self.delay(latency))
+                return result
+
+            tools.append(
+                StructuredTool(
+                    name=name,
+                    description=schema["description"],
+                    args_schema=schema["parameters"],
+                    func=_sync,
+                    coroutine=_async,
+                )
+            )
+        return tools
+
+
+class CassetteChatModel(WrappedChatModel):
+    """Records the calls of ``inner`` to a cassette, or replays them without it."""
+
+    cassette: Cassette
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cassette-{self.cassette.mode}"
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs) -> ChatResult:
+        key = llm_request_key(messages, tools, tool_choice)
+        if self.cassette.mode == "replay":
+            message, _, total = self.cassette.replay_llm(key)
+            time.sleep(self.cassette.delay(total))
+        else:
+            start = time.perf_counter()
+            message = self._call_inner(messages, stop, tools, tool_choice)
+            total = time.perf_counter() - start
+            self.cassette.record_llm(key, message, total, total)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs
+    ) -> ChatResult:
+        key = llm_request_key(messages, tools, tool_choice)
+        if self.cassette.mode == "replay":
+            message, _, total = self.cassette.replay_llm(key)
+            await asyncio.sleep(self.cassette.delay(total))
+        else:
+            start = time.perf_counter()
+            message = await self._acall_inner(messages, stop, tools, tool_choice)
+            total = time.perf_counter() - start
+            self.cassette.record_llm(key, message, total, total)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        key = llm_request_key(messages, tools, tool_choice)
+        if self.cassette.mode == "replay":
+            message, first_token, total = self.cassette.replay_llm(key)
+            time.sleep(self.cassette.delay(first_token))
+            yield ChatGenerationChunk(message=_to_chunk(message))
+            time.sleep(self.cassette.delay(max(0.0, total - first_token)))
+            return
+
+        start = time.perf_counter()
+        first_token = None
+        merged = None
+        for chunk in self._stream_inner(messages, stop, tools, tool_choice):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            merged = chunk if merged is None else merged + chunk
+            yield ChatGenerationChunk(message=chunk)
+        total = time.perf_counter() - start
+        if merged is not None:
+            self.cassette.record_llm(key, message_chunk_to_message(merged), first_token, total)
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        key = llm_request_key(messages, tools, tool_choice)
+        if self.cassette.mode == "replay":
+            message, first_token, total = self.cassette.replay_llm(key)
+            await asyncio.sleep(self.cassette.delay(first_token))
+            yield ChatGenerationChunk(message=_to_chunk(message))
+            await asyncio.sleep(self.cassette.delay(max(0.0, total - first_token)))
+            return
+
+        start = time.perf_counter()
+        first_token = None
+        merged = None
+        async for chunk in self._astream_inner(messages, stop, tools, tool_choice):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            merged = chunk if merged is None else merged + chunk
+            yield ChatGenerationChunk(message=chunk)
+        total = time.perf_counter() - start
+        if merged is not None:
+            self.cassette.record_llm(key, message_chunk_to_message(merged), first_token, total)
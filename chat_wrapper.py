@@ -0,0 +1,59 @@
+"""Base class for chat models that wrap another chat model.
+
+The cassette recorder (cassette.py) and the LLM scheduler (llm_scheduler.py)
+both sit between the agents and the provider's chat model. They accept tools
+the way the agents bind them, pass them on to ``inner`` per call, and run
+the inner call without callbacks. Subclasses only add what happens around
+``_call_inner`` and friends.
+"""
+
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict
+
+# The wrapper's own run already reports to the callbacks (tracing, LangSmith),
+# so the inner model call must not report a second, nested run.
+INNER_CONFIG = {"callbacks": []}
+
+
+def message_text(message: BaseMessage) -> str:
+    """The text of a message, joining the text parts of multi-part content."""
+    if isinstance(message.content, str):
+        return message.content
+    return " ".join(
+        part.get("text", "") if isinstance(part, dict) else str(part) for part in message.content
+    )
+
+
+class WrappedChatModel(BaseChatModel):
+    """A chat model that forwards its calls, with their bound tools, to ``inner``."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel | None = None
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Any = None, **kwargs):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    def _bound_inner(self, tools: list | None, tool_choice: Any):
+        if self.inner is None:
+            raise ValueError(f"{type(self).__name__} requires an inner chat model")
+        if not tools:
+            return self.inner
+        return self.inner.bind_tools(tools, tool_choice=tool_choice)
+
+    def _call_inner(self, messages, stop, tools, tool_choice) -> BaseMessage:
+        return self._bound_inner(tools, tool_choice).invoke(messages, INNER_CONFIG, stop=stop)
+
+    async def _acall_inner(self, messages, stop, tools, tool_choice) -> BaseMessage:
+        return await self._bound_inner(tools, tool_choice).ainvoke(messages, INNER_CONFIG, stop=stop)
+
+    def _stream_inner(self, messages, stop, tools, tool_choice) -> Iterator[BaseMessageChunk]:
+        return self._bound_inner(tools, tool_choice).stream(messages, INNER_CONFIG, stop=stop)
+
+    def _astream_inner(self, messages, stop, tools, tool_choice) -> AsyncIterator[BaseMessageChunk]:
+        return self._bound_inner(tools, tool_choice).astream(messages, INNER_CONFIG, stop=stop)
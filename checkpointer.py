@@ -0,0 +1,340 @@
+"""Bounded LangGraph checkpointers for agent conversation memory.
+
+``A2A_CHECKPOINTER`` selects the backend:
+
+* ``memory`` (default) is BoundedMemorySaver. It keeps only the newest
+  ``A2A_CHECKPOINTS_PER_THREAD`` checkpoints of each thread, evicts threads
+  idle for ``A2A_SESSION_TTL`` seconds, and evicts least recently used
+  threads while the serialized size exceeds ``A2A_CHECKPOINT_MEMORY_MB``.
+* ``sqlite`` is BoundedSqliteSaver, stored in ``A2A_CHECKPOINT_DB``. It
+  applies the same per-thread and idle limits on disk, so process memory
+  stays flat however many sessions there are. It needs the optional
+  ``langgraph-checkpoint-sqlite`` package.
+
+Every agent gets a NamespacedCheckpointer view of the shared saver, so two
+agents that see the same ``sessionId`` keep separate conversations.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+EVICTIONS = REGISTRY.counter(
+    "a2a_checkpoint_evictions_total",
+    "Conversation threads evicted from the checkpointer, by reason.",
+    ("reason",),
+)
+
+
+class _ThreadUsage:
+    __slots__ = ("last_access", "bytes", "checkpoints", "blobs", "writes")
+
+    def __init__(self):
+        self.last_access = time.monotonic()
+        self.bytes = 0
+        self.checkpoints: dict[tuple[str, str], tuple[int, dict]] = {}
+        self.blobs: dict[tuple, int] = {}
+        self.writes: dict[tuple, int] = {}
+
+
+class BoundedMemorySaver(MemorySaver):
+    """MemorySaver with per-thread checkpoint limits, idle TTL and a memory budget.
+
+    Sizes are the serialized bytes the saver holds, which is a close lower
+    bound on the real footprint.
+    """
+
+    def __init__(
+        self,
+        max_checkpoints_per_thread: int = 3,
+        session_ttl: float = 3600.0,
+        max_bytes: int = 256 * 1024 * 1024,
+        sweep_interval: float = 30.0,
+    ):
+        super().__init__()
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.session_ttl = session_ttl
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.total_bytes = 0
+        self._threads: OrderedDict[str, _ThreadUsage] = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_sweep = time.monotonic()
+        REGISTRY.register_collector(
+            "a2a_checkpointer",
+            "Conversation threads and serialized bytes held in memory.",
+            lambda: [
+                ({"field": "threads"}, len(self._threads)),
+                ({"field": "bytes"}, self.total_bytes),
+            ],
+        )
+
+    def _usage(self, thread_id: str) -> _ThreadUsage:
+        usage = self._threads.get(thread_id)
+        if usage is None:
+            usage = self._threads[thread_id] = _ThreadUsage()
+        usage.last_access = time.monotonic()
+        self._threads.move_to_end(thread_id)
+        return usage
+
+    def _charge(self, usage: _ThreadUsage, amount: int):
+        usage.bytes += amount
+        self.total_bytes += amount
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            result = super().get_tuple(config)
+            if thread_id in self._threads:
+                self._usage(thread_id)
+            elif not any(self.storage.get(thread_id, {}).values()):
+                # MemorySaver's defaultdicts create entries on every lookup.
+                self.storage.pop(thread_id, None)
+            self._discard_empty_writes([result] if result else [])
+            return result
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+            self._discard_empty_writes(items)
+        yield from items
+
+    def _discard_empty_writes(self, items: Sequence[CheckpointTuple]):
+        """Drops the empty writes entries lookups create for pruned parent checkpoints."""
+        for item in items:
+            for config in (item.config, item.parent_config):
+                if not config:
+                    continue
+                configurable = config["configurable"]
+                key = (
+                    configurable["thread_id"],
+                    configurable.get("checkpoint_ns", ""),
+                    configurable["checkpoint_id"],
+                )
+                if key in self.writes and not self.writes[key]:
+                    del self.writes[key]
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            usage = self._usage(thread_id)
+
+            saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            size = len(saved[1]) + len(saved_metadata[1])
+            previous = usage.checkpoints.get((checkpoint_ns, checkpoint["id"]))
+            self._charge(usage, size - (previous[0] if previous else 0))
+            usage.checkpoints[(checkpoint_ns, checkpoint["id"])] = (
+                size,
+                dict(checkpoint["channel_versions"]),
+            )
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                blob_size = len(self.blobs[key][1])
+                self._charge(usage, blob_size - usage.blobs.get(key, 0))
+                usage.blobs[key] = blob_size
+
+            self._prune(thread_id, checkpoint_ns, usage)
+            self._evict()
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            usage = self._usage(thread_id)
+            size = sum(len(write[2][1]) for write in self.writes[key].values())
+            self._charge(usage, size - usage.writes.get(key, 0))
+            usage.writes[key] = size
+
+    def _prune(self, thread_id: str, checkpoint_ns: str, usage: _ThreadUsage):
+        """Drops all but the newest checkpoints of a thread, with their writes and blobs."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        excess = len(checkpoints) - self.max_checkpoints_per_thread
+        if excess <= 0:
+            return
+        # Checkpoint ids are time-ordered UUIDs, as MemorySaver.get_tuple assumes.
+        for checkpoint_id in sorted(checkpoints)[:excess]:
+            del checkpoints[checkpoint_id]
+            size, _ = usage.checkpoints.pop((checkpoint_ns, checkpoint_id), (0, None))
+            self._charge(usage, -size)
+            write_key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(write_key, None)
+            self._charge(usage, -usage.writes.pop(write_key, 0))
+
+        live = {
+            (thread_id, checkpoint_ns, channel, version)
+            for (ns, _), (_, versions) in usage.checkpoints.items()
+            if ns == checkpoint_ns
+            for channel, version in versions.items()
+        }
+        for key in [k for k in usage.blobs if k[1] == checkpoint_ns and k not in live]:
+            self.blobs.pop(key, None)
+            self._charge(usage, -usage.blobs.pop(key))
+
+    def _drop_thread(self, thread_id: str, reason: str):
+        usage = self._threads.pop(thread_id)
+        self.storage.pop(thread_id, None)
+        for key in usage.writes:
+            self.writes.pop(key, None)
+        for key in usage.blobs:
+            self.blobs.pop(key, None)
+        self.total_bytes -= usage.bytes
+        EVICTIONS.inc(reason)
+
+    def _evict(self):
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            while self._threads:
+                thread_id, usage = next(iter(self._threads.items()))
+                if now - usage.last_access < self.session_ttl:
+                    break
+                self._drop_thread(thread_id, "ttl")
+        # Never evict the most recently used thread: it is the one being written.
+        while self.total_bytes > self.max_bytes and len(self._threads) > 1:
+            oldest = next(iter(self._threads))
+            logger.info(f"Checkpoint memory over budget; evicting thread {oldest}")
+            self._drop_thread(oldest, "budget")
+
+
+class NamespacedCheckpointer(BaseCheckpointSaver):
+    """A view of a shared saver that prefixes every thread id with ``namespace``."""
+
+    def __init__(self, saver: BaseCheckpointSaver, namespace: str):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.prefix = f"{namespace}:"
+
+    def _inner(self, config: Optional[RunnableConfig]) -> Optional[RunnableConfig]:
+        if not config or "thread_id" not in config.get("configurable", {}):
+            return config
+        configurable = dict(config["configurable"])
+        configurable["thread_id"] = self.prefix + str(configurable["thread_id"])
+        return {**config, "configurable": configurable}
+
+    def _outer(self, config: Optional[RunnableConfig]) -> Optional[RunnableConfig]:
+        if not config or "thread_id" not in config.get("configurable", {}):
+            return config
+        configurable = dict(config["configurable"])
+        configurable["thread_id"] = configurable["thread_id"][len(self.prefix) :]
+        return {**config, "configurable": configurable}
+
+    def _owns(self, item: CheckpointTuple) -> bool:
+        return str(item.config["configurable"]["thread_id"]).startswith(self.prefix)
+
+    def _outer_tuple(self, item: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if item is None:
+            return None
+        return item._replace(
+            config=self._outer(item.config), parent_config=self._outer(item.parent_config)
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._outer_tuple(self.saver.get_tuple(self._inner(config)))
+
+    def list(self, config, *, filter=None, before=None, limit=None) -> Iterator[CheckpointTuple]:
+        for item in self.saver.list(
+            self._inner(config), filter=filter, before=self._inner(before), limit=limit
+        ):
+            if self._owns(item):
+                yield self._outer_tuple(item)
+
+    def put(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return self._outer(self.saver.put(self._inner(config), checkpoint, metadata, new_versions))
+
+    def put_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        self.saver.put_writes(self._inner(config), writes, task_id, task_path)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._outer_tuple(await self.saver.aget_tuple(self._inner(config)))
+
+    async def alist(
+        self, config, *, filter=None, before=None, limit=None
+    ) -> AsyncIterator[CheckpointTuple]:
+        async for item in self.saver.alist(
+            self._inner(config), filter=filter, before=self._inner(before), limit=limit
+        ):
+            if self._owns(item):
+                yield self._outer_tuple(item)
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return self._outer(
+            await self.saver.aput(self._inner(config), checkpoint, metadata, new_versions)
+        )
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        await self.saver.aput_writes(self._inner(config), writes, task_id, task_path)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
+
+
+@functools.lru_cache(maxsize=1)
+def get_checkpointer() -> BaseCheckpointSaver:
+    """The process-wide saver all agents share, configured from the environment."""
+    backend = os.getenv("A2A_CHECKPOINTER", "memory").lower()
+    max_checkpoints = int(os.getenv("A2A_CHECKPOINTS_PER_THREAD", "3"))
+    session_ttl = float(os.getenv("A2A_SESSION_TTL", "3600"))
+    if backend == "sqlite":
+        from sqlite_checkpointer import BoundedSqliteSaver
+
+        return BoundedSqliteSaver(
+            os.getenv("A2A_CHECKPOINT_DB", "checkpoints.sqlite"),
+            max_checkpoints_per_thread=max_checkpoints,
+            session_ttl=session_ttl,
+        )
+    if backend == "memory":
+        return BoundedMemorySaver(
+            max_checkpoints_per_thread=max_checkpoints,
+            session_ttl=session_ttl,
+            max_bytes=int(float(os.getenv("A2A_CHECKPOINT_MEMORY_MB", "256")) * 1024 * 1024),
+        )
+    raise ValueError(f"Unknown checkpointer backend: {backend}")
+
+
+def agent_checkpointer(namespace: str) -> NamespacedCheckpointer:
+    return NamespacedCheckpointer(get_checkpointer(), namespace)
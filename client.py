@@ -1,5 +1,6 @@
 import json
 from typing import Any, AsyncIterable
+from uuid import uuid4
 
 import httpx
 from httpx_sse import connect_sse
@@ -15,6 +16,7 @@ from custom_types import (
     GetTaskRequest,
     GetTaskResponse,
     JSONRPCRequest,
+    JSONRPCResponse,
     SendTaskRequest,
     SendTaskResponse,
     SendTaskStreamingRequest,
@@ -22,6 +24,20 @@ from custom_types import (
     SetTaskPushNotificationRequest,
     SetTaskPushNotificationResponse,
 )
+from tracing import TRACER, Span, inject_headers, inject_metadata
+
+RESPONSE_TYPES: dict[type[JSONRPCRequest], type[JSONRPCResponse]] = {
+    SendTaskRequest: SendTaskResponse,
+    GetTaskRequest: GetTaskResponse,
+    CancelTaskRequest: CancelTaskResponse,
+    SetTaskPushNotificationRequest: SetTaskPushNotificationResponse,
+    GetTaskPushNotificationRequest: GetTaskPushNotificationResponse,
+}
+
+
+def _inject_trace_metadata(request: JSONRPCRequest, span: Span):
+    if hasattr(request.params, "metadata"):
+        request.params.metadata = inject_metadata(request.params.metadata, span)
 
 
 class A2AClient:
@@ -41,24 +57,83 @@ class A2AClient:
         self, payload: dict[str, Any]
     ) -> AsyncIterable[SendTaskStreamingResponse]:
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None) as client:
-            with connect_sse(
-                client, "POST", self.url, json=request.model_dump()
-            ) as event_source:
-                try:
-                    for sse in event_source.iter_sse():
-                        yield SendTaskStreamingResponse(**json.loads(sse.data))
-                except json.JSONDecodeError as e:
-                    raise A2AClientJSONError(str(e)) from e
-                except httpx.RequestError as e:
-                    raise A2AClientHTTPError(400, str(e)) from e
+        # The span is not made current: this generator may be resumed from
+        # other contexts, so it is only passed along explicitly.
+        span = TRACER.start_span(
+            f"a2a.client {request.method}", attributes={"a2a.url": self.url}
+        )
+        _inject_trace_metadata(request, span)
+        try:
+            with httpx.Client(timeout=None) as client:
+                with connect_sse(
+                    client,
+                    "POST",
+                    self.url,
+                    json=request.model_dump(),
+                    headers=inject_headers(span=span),
+                ) as event_source:
+                    try:
+                        for sse in event_source.iter_sse():
+                            yield SendTaskStreamingResponse(**json.loads(sse.data))
+                    except json.JSONDecodeError as e:
+                        raise A2AClientJSONError(str(e)) from e
+                    except httpx.RequestError as e:
+                        raise A2AClientHTTPError(400, str(e)) from e
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            TRACER.end_span(span)
+
+    async def batch(self, requests: list[JSONRPCRequest]) -> list[JSONRPCResponse]:
+        """Sends several non-streaming requests in one JSON-RPC batch.
+
+        Responses are returned in the order of ``requests``. The requests are
+        sent as copies; those without an id, or sharing one with an earlier
+        request, get a fresh id so each response can be matched.
+        """
+        sent: list[JSONRPCRequest] = []
+        ids = set()
+        for request in requests:
+            copy = request.model_copy()
+            if hasattr(request.params, "metadata"):
+                copy.params = request.params.model_copy()
+            if copy.id is None or copy.id in ids:
+                copy.id = uuid4().hex
+            ids.add(copy.id)
+            sent.append(copy)
+        requests = sent
+        with TRACER.span("a2a.client batch", attributes={"a2a.url": self.url}) as span:
+            for request in requests:
+                _inject_trace_metadata(request, span)
+            payload = [request.model_dump() for request in requests]
+            raw_responses = await self._send_payload(payload)
+        if not isinstance(raw_responses, list):
+            raise A2AClientJSONError(f"Expected a batch response, got: {raw_responses}")
+
+        by_id = {item.get("id"): item for item in raw_responses}
+        responses = []
+        for request in requests:
+            response_type = RESPONSE_TYPES.get(type(request), JSONRPCResponse)
+            item = by_id.get(request.id)
+            if item is None:
+                raise A2AClientJSONError(f"Missing response for request {request.id}")
+            responses.append(response_type(**item))
+        return responses
 
     async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
+        with TRACER.span(
+            f"a2a.client {request.method}", attributes={"a2a.url": self.url}
+        ) as span:
+            _inject_trace_metadata(request, span)
+            return await self._send_payload(request.model_dump())
+
+    async def _send_payload(self, payload: Any) -> Any:
         async with httpx.AsyncClient() as client:
             try:
                 # Image generation could take time, adding timeout
                 response = await client.post(
-                    self.url, json=request.model_dump(), timeout=30
+                    self.url, json=payload, headers=inject_headers(), timeout=30
                 )
                 response.raise_for_status()
                 return response.json()
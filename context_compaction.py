@@ -0,0 +1,167 @@
+"""Caps the conversation context each agent sends to the model.
+
+Every turn of a session is appended to the LangGraph state, so without a
+limit the prompt, and with it latency and cost, grows with session length.
+ContextCompactor is a ``pre_model_hook`` for create_react_agent:
+
+* The last ``A2A_CONTEXT_KEEP_TURNS`` turns (default 6) are kept verbatim.
+  A turn runs from one user message to the next, so tool calls and their
+  results are never split.
+* Once ``A2A_CONTEXT_SUMMARY_BATCH`` (default 4) more turns have piled up,
+  the oldest are folded into a running summary stored in the graph state and
+  removed from ``messages``. The summary is extended incrementally, so each
+  compaction only reads the turns that just fell out of the window.
+* If the prompt would still exceed ``A2A_CONTEXT_MAX_TOKENS`` (default
+  4000), more turns are compacted straight away. The current turn is always
+  sent in full.
+
+Set ``A2A_CONTEXT_COMPACTION=0`` to send the full history instead.
+"""
+
+import logging
+import os
+from typing import Any, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.prebuilt.chat_agent_executor import AgentStateWithStructuredResponse
+from typing_extensions import NotRequired
+
+from llm_scheduler import estimate_request_tokens
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+COMPACTIONS = REGISTRY.counter(
+    "a2a_context_compactions_total",
+    "Times older conversation turns were folded into the running summary.",
+    ("agent", "summarizer"),
+)
+
+SUMMARY_INSTRUCTION = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Extend the current summary with the new messages. Keep names, figures, decisions "
+    "and open questions; drop pleasantries. Reply with the updated summary only, in at "
+    "most {words} words."
+)
+
+
+class CompactedAgentState(AgentStateWithStructuredResponse):
+    context_summary: NotRequired[str]
+
+
+def _turn_starts(messages: Sequence[BaseMessage]) -> list[int]:
+    starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return starts
+
+
+def _transcript(messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            role = "User"
+        elif isinstance(message, ToolMessage):
+            role = f"Tool {message.name or ''}".rstrip()
+        elif isinstance(message, AIMessage):
+            role = "Assistant"
+        else:
+            continue
+        text = message.text()
+        if isinstance(message, AIMessage) and message.tool_calls:
+            text = text or ", ".join(f"{call['name']}({call['args']})" for call in message.tool_calls)
+        if text:
+            lines.append(f"{role}: {text}")
+    return "\n".join(lines)
+
+
+class ContextCompactor:
+    def __init__(
+        self,
+        model: BaseChatModel,
+        name: str = "agent",
+        keep_turns: int = 6,
+        summary_batch: int = 4,
+        max_tokens: int = 4000,
+    ):
+        self.model = model
+        self.name = name
+        self.keep_turns = max(1, keep_turns)
+        self.summary_batch = max(1, summary_batch)
+        self.max_tokens = max_tokens
+        self.summary_tokens = max(64, max_tokens // 4)
+
+    def _summary_message(self, summary: str) -> list[BaseMessage]:
+        if not summary:
+            return []
+        return [SystemMessage(f"Summary of the earlier conversation:\n{summary}")]
+
+    def __call__(self, state: dict[str, Any]) -> dict[str, Any]:
+        messages = state["messages"]
+        summary = state.get("context_summary", "")
+        starts = _turn_starts(messages)
+
+        keep_from = len(starts) - self.keep_turns
+        if keep_from < self.summary_batch:
+            keep_from = 0
+        budget = self.max_tokens - estimate_request_tokens(self._summary_message(summary))
+        # Compact more turns if the kept ones would still overflow the budget.
+        while (
+            keep_from < len(starts) - 1
+            and estimate_request_tokens(messages[starts[keep_from] :]) > budget
+        ):
+            keep_from += 1
+        if keep_from == 0:
+            return {"llm_input_messages": [*self._summary_message(summary), *messages]}
+
+        dropped, kept = messages[: starts[keep_from]], messages[starts[keep_from] :]
+        summary = self.summarize(summary, dropped)
+        return {
+            "messages": [RemoveMessage(id=message.id) for message in dropped],
+            "context_summary": summary,
+            "llm_input_messages": [*self._summary_message(summary), *kept],
+        }
+
+    def summarize(self, summary: str, messages: Sequence[BaseMessage]) -> str:
+        """Folds ``messages`` into ``summary``; falls back to the transcript tail on failure."""
+        transcript = _transcript(messages)
+        summarizer = "llm"
+        try:
+            response = self.model.invoke(
+                [
+                    SystemMessage(SUMMARY_INSTRUCTION.format(words=self.summary_tokens * 3 // 4)),
+                    HumanMessage(
+                        f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+                    ),
+                ]
+            )
+            updated = response.text().strip()
+        except Exception as e:
+            logger.warning(f"Context summarization failed, keeping the transcript tail: {e}")
+            updated, summarizer = "", "fallback"
+        if not updated:
+            updated = f"{summary}\n{transcript}".strip()
+        COMPACTIONS.inc(self.name, summarizer)
+        # Bound the summary itself; the newest information is at the end.
+        return updated[-self.summary_tokens * 4 :]
+
+
+def get_context_compactor(model: BaseChatModel, name: str) -> Optional[ContextCompactor]:
+    """Returns the pre-model hook for an agent, or None when compaction is disabled."""
+    if os.getenv("A2A_CONTEXT_COMPACTION", "1").lower() in ("0", "false", "no"):
+        return None
+    return ContextCompactor(
+        model,
+        name=name,
+        keep_turns=int(os.getenv("A2A_CONTEXT_KEEP_TURNS", "6")),
+        summary_batch=int(os.getenv("A2A_CONTEXT_SUMMARY_BATCH", "4")),
+        max_tokens=int(os.getenv("A2A_CONTEXT_MAX_TOKENS", "4000")),
+    )
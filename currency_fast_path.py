@@ -0,0 +1,154 @@
+"""Answers simple currency conversions without the LLM.
+
+Queries such as "convert 100 USD to EUR", "how much is €250 in GBP on
+2024-03-01" or "USD/JPY rate" are matched in full by a compiled grammar.
+Matching queries go straight to ``get_exchange_rate`` and the answer is
+formatted locally. That is one tool call instead of two or more model round
+trips. Anything the grammar does not cover exactly falls back to the ReAct
+graph: extra words, unknown currency codes, ambiguous symbols such as ``$``,
+relative dates or a failed tool call.
+
+Disable with ``A2A_CURRENCY_FAST_PATH=0``.
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date as Date
+from typing import Any, Optional
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+FAST_PATH_REQUESTS = REGISTRY.counter(
+    "a2a_currency_fast_path_total",
+    "Currency queries seen by the parser fast path, by outcome.",
+    ("result",),
+)
+
+# ISO 4217 codes in active use. Restricting to real codes keeps three-letter
+# words ("the", "and") from being read as currencies.
+CURRENCY_CODES = frozenset(
+    """
+    AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BHD BIF BMD BND BOB
+    BRL BSD BTN BWP BYN BZD CAD CDF CHF CLP CNY COP CRC CUP CVE CZK DJF DKK DOP
+    DZD EGP ERN ETB EUR FJD FKP GBP GEL GHS GIP GMD GNF GTQ GYD HKD HNL HTG HUF
+    IDR ILS INR IQD IRR ISK JMD JOD JPY KES KGS KHR KMF KPW KRW KWD KYD KZT LAK
+    LBP LKR LRD LSL LYD MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MYR MZN
+    NAD NGN NIO NOK NPR NZD OMR PAB PEN PGK PHP PKR PLN PYG QAR RON RSD RUB RWF
+    SAR SBD SCR SDG SEK SGD SHP SLE SOS SRD SSP STN SYP SZL THB TJS TMT TND TOP
+    TRY TTD TWD TZS UAH UGX USD UYU UZS VES VND VUV WST XAF XCD XOF XPF YER ZAR
+    ZMW ZWL
+    """.split()
+)
+
+# Only symbols that name a single currency; "$", "kr" and friends fall back.
+CURRENCY_SYMBOLS = {"€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR", "₩": "KRW", "₽": "RUB"}
+
+_SYMBOL = "|".join(re.escape(symbol) for symbol in CURRENCY_SYMBOLS)
+_AMOUNT = r"(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?"
+_DATE = r"\d{4}-\d{2}-\d{2}"
+
+QUERY_GRAMMAR = re.compile(
+    rf"""
+    ^(?:please\s+)?
+    (?:(?:convert|change|exchange|how\s+much\s+is|how\s+much\s+are|what\s+is|what's)\s+)?
+    (?:the\s+)?
+    (?:
+        # 100 USD to EUR, €100 in GBP, 1,250.50 eur into usd
+        (?:(?P<symbol>{_SYMBOL})\s*(?P<symbol_amount>{_AMOUNT})
+          |(?P<amount>{_AMOUNT})\s*(?P<amount_code>[a-z]{{3}}))
+        \s+(?:to|in|into)\s+(?P<amount_to>[a-z]{{3}})
+      |
+        # exchange rate from USD to EUR, rate for usd/eur, USD to EUR rate
+        (?:(?:exchange\s+)?rate\s+(?:(?:for|from|of)\s+)?)?
+        (?P<pair_from>[a-z]{{3}})\s*(?:/|\s(?:to|in|into)\s)\s*(?P<pair_to>[a-z]{{3}})
+        (?:\s+(?:exchange\s+)?rate)?
+    )
+    (?:\s+(?:(?:on|for|as\s+of|at)\s+)?(?P<date>{_DATE}|today|latest|now))?
+    \s*[?.!]*$
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+@dataclass(frozen=True)
+class ConversionQuery:
+    currency_from: str
+    currency_to: str
+    amount: Optional[float] = None
+    currency_date: str = "latest"
+
+
+def parse_conversion_query(query: str) -> Optional[ConversionQuery]:
+    """Returns the parsed query, or None if it is not a plain conversion."""
+    match = QUERY_GRAMMAR.match(" ".join(query.split()))
+    if match is None:
+        return None
+    groups = match.groupdict()
+    if groups["symbol"]:
+        currency_from, amount = CURRENCY_SYMBOLS[groups["symbol"]], groups["symbol_amount"]
+    elif groups["amount"]:
+        currency_from, amount = groups["amount_code"].upper(), groups["amount"]
+    else:
+        currency_from, amount = groups["pair_from"].upper(), None
+    currency_to = (groups["amount_to"] or groups["pair_to"]).upper()
+    if currency_from not in CURRENCY_CODES or currency_to not in CURRENCY_CODES:
+        return None
+    date = (groups["date"] or "latest").lower()
+    if date not in ("latest", "today", "now"):
+        try:
+            Date.fromisoformat(date)
+        except ValueError:
+            return None
+    return ConversionQuery(
+        currency_from=currency_from,
+        currency_to=currency_to,
+        amount=float(amount.replace(",", "")) if amount else None,
+        currency_date="latest" if date in ("today", "now") else date,
+    )
+
+
+def tool_arguments(query: ConversionQuery) -> dict[str, str]:
+    return {
+        "currency_from": query.currency_from,
+        "currency_to": query.currency_to,
+        "currency_date": query.currency_date,
+    }
+
+
+def _format_number(value: float) -> str:
+    return f"{value:,.2f}" if abs(value) >= 1 else f"{value:.6g}"
+
+
+def format_conversion(query: ConversionQuery, result: Any) -> Optional[str]:
+    """Formats the tool result, or returns None if it carries no usable rate."""
+    if isinstance(result, list) and result:
+        result = result[0]
+    if isinstance(result, (str, bytes)):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return None
+    if not isinstance(result, dict):
+        return None
+    rate = (result.get("rates") or {}).get(query.currency_to)
+    if not isinstance(rate, (int, float)) or isinstance(rate, bool):
+        return None
+    rate = rate / (result.get("amount") or 1)
+    date = result.get("date") or query.currency_date
+    as_of = "the latest rate" if date == "latest" else f"the rate on {date}"
+    pair = f"1 {query.currency_from} = {rate:.6g} {query.currency_to}"
+    if query.amount is None:
+        return f"{pair} ({as_of})."
+    return (
+        f"{_format_number(query.amount)} {query.currency_from} = "
+        f"{_format_number(query.amount * rate)} {query.currency_to} ({pair}, {as_of})."
+    )
+
+
+def fast_path_enabled() -> bool:
+    return os.getenv("A2A_CURRENCY_FAST_PATH", "1").lower() not in ("0", "false", "no")
@@ -308,6 +308,12 @@ class ContentTypeNotSupportedError(JSONRPCError):
     data: None = None
 
 
+class ServerOverloadedError(JSONRPCError):
+    code: int = -32006
+    message: str = "Server is overloaded, retry later"
+    data: Any | None = None
+
+
 class AgentProvider(BaseModel):
     organization: str
     url: str | None = None
@@ -0,0 +1,266 @@
+"""Deterministic stand-ins for the Groq chat model and the MCP currency server.
+
+They let the whole agent pipeline run without network access or API keys,
+with latencies drawn from configurable distributions, for load tests and
+benchmarks. Select them with ``A2A_MODEL_PROVIDER=fake`` and
+``A2A_MCP_STUB=1`` (see model_provider.py).
+"""
+
+import asyncio
+import inspect
+import json
+import random
+import time
+import zlib
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+from chat_wrapper import message_text
+from utils import run_sync
+
+
+class LatencyDistribution:
+    """Parses specs like ``fixed:0.4``, ``uniform:0.2,0.8``, ``normal:0.5,0.1``,
+    ``lognormal:-0.7,0.5`` or ``exponential:0.5`` (all in seconds)."""
+
+    def __init__(self, spec: str = "fixed:0"):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.args = [float(arg) for arg in args.split(",") if arg.strip()]
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            value = self.args[0] if self.args else 0.0
+        elif self.kind == "uniform":
+            value = rng.uniform(self.args[0], self.args[1])
+        elif self.kind == "normal":
+            value = rng.gauss(self.args[0], self.args[1])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(self.args[0], self.args[1])
+        else:
+            value = rng.expovariate(1 / self.args[0])
+        return max(0.0, value)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeChatModel(BaseChatModel):
+    """A tool-calling chat model with deterministic answers and simulated timing.
+
+    The first turn calls the first bound tool (if any and ``call_tools``).
+    After that it answers in plain text. When asked for structured output
+    (a single tool with ``tool_choice="any"``), it fills the schema with
+    ``structured_status`` and the last answer. Time to first token is
+    ``latency`` plus prompt tokens at ``prefill_tokens_per_second``. Output
+    tokens then arrive at ``tokens_per_second``. A rate of 0 disables that
+    term.
+    """
+
+    latency: str = "fixed:0"
+    tokens_per_second: float = 0.0
+    prefill_tokens_per_second: float = 0.0
+    responses: list[str] = []
+    structured_status: str = "completed"
+    call_tools: bool = True
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _latency: LatencyDistribution = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._latency = LatencyDistribution(self.latency)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Any = None, **kwargs):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    def _answer_for(self, messages: list[BaseMessage]) -> str:
+        query = next(
+            (message_text(m) for m in reversed(messages) if isinstance(m, HumanMessage)),
+            "",
+        )
+        if self.responses:
+            return self.responses[zlib.crc32(query.encode()) % len(self.responses)]
+        tool_results = [message_text(m) for m in messages if isinstance(m, ToolMessage)]
+        if tool_results:
+            return f"Fake answer to: {query} (tool result: {tool_results[-1]})"
+        return f"Fake answer to: {query}"
+
+    def _structured_args(self, schema: dict, messages: list[BaseMessage]) -> dict:
+        last_answer = next(
+            (
+                message_text(m)
+                for m in reversed(messages)
+                if isinstance(m, AIMessage) and message_text(m)
+            ),
+            None,
+        ) or self._answer_for(messages)
+        args = {}
+        for name, prop in schema.get("parameters", {}).get("properties", {}).items():
+            if name == "status":
+                args[name] = self.structured_status
+            elif prop.get("type", "string") == "string":
+                args[name] = last_answer
+        return args
+
+    def _respond(self, messages: list[BaseMessage], **kwargs: Any) -> AIMessage:
+        tools = kwargs.get("tools") or []
+        tool_choice = kwargs.get("tool_choice")
+        prompt_tokens = sum(estimate_tokens(message_text(m)) for m in messages)
+
+        if tools and len(tools) == 1 and tool_choice not in (None, "auto", "none"):
+            function = tools[0]["function"]
+            args = self._structured_args(function, messages)
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": function["name"], "args": args, "id": "call_structured"}],
+            )
+        elif tools and self.call_tools and isinstance(messages[-1], HumanMessage):
+            function = tools[0]["function"]
+            call_id = f"call_{zlib.crc32(message_text(messages[-1]).encode()):08x}"
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": function["name"], "args": {}, "id": call_id}],
+            )
+        else:
+            message = AIMessage(content=self._answer_for(messages))
+
+        output_tokens = estimate_tokens(message_text(message) or str(message.tool_calls))
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+        }
+        return message
+
+    def _time_to_first_token(self, messages: list[BaseMessage]) -> float:
+        delay = self._latency.sample(self._rng)
+        if self.prefill_tokens_per_second > 0:
+            prompt_tokens = sum(estimate_tokens(message_text(m)) for m in messages)
+            delay += prompt_tokens / self.prefill_tokens_per_second
+        return delay
+
+    def _generation_time(self, message: AIMessage) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return message.usage_metadata["output_tokens"] / self.tokens_per_second
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._respond(messages, **kwargs)
+        time.sleep(self._time_to_first_token(messages) + self._generation_time(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._respond(messages, **kwargs)
+        await asyncio.sleep(self._time_to_first_token(messages) + self._generation_time(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, message: AIMessage) -> list[AIMessageChunk]:
+        if message.tool_calls:
+            return [
+                AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": i,
+                        }
+                        for i, call in enumerate(message.tool_calls)
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            ]
+        words = message.content.split(" ")
+        chunks = [AIMessageChunk(content=(" " if i else "") + word) for i, word in enumerate(words)]
+        chunks[-1].usage_metadata = message.usage_metadata
+        return chunks
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        message = self._respond(messages, **kwargs)
+        time.sleep(self._time_to_first_token(messages))
+        for chunk in self._chunks(message):
+            if self.tokens_per_second > 0:
+                time.sleep(estimate_tokens(chunk.content or " ") / self.tokens_per_second)
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._respond(messages, **kwargs)
+        await asyncio.sleep(self._time_to_first_token(messages))
+        for chunk in self._chunks(message):
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(estimate_tokens(chunk.content or " ") / self.tokens_per_second)
+            yield ChatGenerationChunk(message=chunk)
+
+
+def make_stub_mcp_tools(latency: str = "fixed:0", seed: int = 0) -> list[StructuredTool]:
+    """In-process replacement for the tools served by mcp_app.py.
+
+    Calls the tool functions directly instead of going through MCP over SSE,
+    adding a simulated round-trip latency.
+    """
+    import mcp_app
+
+    distribution = LatencyDistribution(latency)
+    rng = random.Random(seed)
+    tools = []
+    for func in (
+        mcp_app.get_exchange_rate,
+        mcp_app.get_exchange_rates_batch,
+        mcp_app.get_exchange_rate_average,
+        mcp_app.get_exchange_rate_range,
+    ):
+
+        def _sync(_func=func, **kwargs):
+            time.sleep(distribution.sample(rng))
+            result = _func(**kwargs)
+            if inspect.isawaitable(result):
+                result = run_sync(result)
+            return result
+
+        async def _async(_func=func, **kwargs):
+            await asyncio.sleep(distribution.sample(rng))
+            result = _func(**kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        if inspect.iscoroutinefunction(func):
+            template = StructuredTool.from_function(coroutine=func)
+        else:
+            template = StructuredTool.from_function(func)
+        tools.append(
+            StructuredTool(
+                name=template.name,
+                description=template.description,
+                args_schema=template.args_schema,
+                func=_sync,
+                coroutine=_async,
+            )
+        )
+    return tools
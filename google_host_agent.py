@@ -13,7 +13,7 @@ from google.genai import types # type: ignore
 from google.adk.agents.run_config import RunConfig # type: ignore
 from google.adk.sessions.in_memory_session_service import InMemorySessionService # type: ignore
 
-from card_resolver import A2ACardResolver
+from card_resolver import AsyncA2ACardResolver
 from client import A2AClient
 from custom_types import (
     AgentCard,
@@ -28,6 +28,7 @@ from custom_types import (
     TaskStatusUpdateEvent,
     TextPart,
 )
+from tracing import TRACER
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg], Task]
@@ -136,16 +137,14 @@ class HostAgent:
         self.task_callback = task_callback
         self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
         self.cards: dict[str, AgentCard] = {}
-        for address in remote_agent_addresses:
-            card_resolver = A2ACardResolver(address)
-            card = card_resolver.get_agent_card()
-            remote_connection = RemoteAgentConnections(card)
-            self.remote_agent_connections[card.name] = remote_connection
-            self.cards[card.name] = card
-        agent_info = []
-        for ra in self.list_remote_agents():
-            agent_info.append(json.dumps(ra))
-        self.agents = "\n".join(agent_info)
+        self.agents = ""
+        # Resolve all cards concurrently; unreachable agents are skipped here
+        # and registered later by the retry task (see before_model_callback).
+        self._card_resolver = AsyncA2ACardResolver()
+        cards, self._unresolved = self._card_resolver.resolve_all_sync(remote_agent_addresses)
+        for card in cards.values():
+            self.register_agent_card(card)
+        self._card_retry: asyncio.Task | None = None
 
     def register_agent_card(self, card: AgentCard):
         remote_connection = RemoteAgentConnections(card)
@@ -213,6 +212,13 @@ Current agent: {current_agent["active_agent"]}
         return {"active_agent": "None"}
 
     def before_model_callback(self, callback_context: CallbackContext, llm_request):
+        if self._unresolved and self._card_retry is None:
+            # Started here because callbacks run on the agent's event loop, so
+            # the retry registers cards there rather than from another thread.
+            self._card_retry = self._card_resolver.retry_in_background(
+                self._unresolved,
+                lambda _address, document: self.register_agent_card(AgentCard(**document)),
+            )
         state = callback_context.state
         if "session_active" not in state or not state["session_active"]:
             if "session_id" not in state:
@@ -279,7 +285,8 @@ Current agent: {current_agent["active_agent"]}
             # pushNotification=None,
             metadata={"conversation_id": sessionId},
         )
-        task = await client.send_task(request, self.task_callback)
+        with TRACER.span("host.send_task", attributes={"agent": agent_name}):
+            task = await client.send_task(request, self.task_callback)
         # Assume completion unless a state returns that isn't complete
         state["session_active"] = task.status.state not in [
             TaskState.COMPLETED,
@@ -1,4 +1,6 @@
+import logging
 import os
+import time
 import uuid
 from typing import List, Optional
 
@@ -8,10 +10,15 @@ from langchain_core.messages import AIMessage
 from langchain_core.tools import tool
 from langchain_groq import ChatGroq
 
+from card_resolver import AsyncA2ACardResolver
+from tracing import TRACER, inject_headers, inject_metadata
+
 os.environ["GROQ_API_KEY"] = "YOUR_GROQ_API_KEY"
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 
+logger = logging.getLogger(__name__)
+
 
 class AgentCapabilities:
     def __init__(
@@ -62,8 +69,10 @@ class RemoteAgentClient:
         url = f"{self.base_url}/.well-known/agent.json"
         resp = requests.get(url, timeout=10)
         resp.raise_for_status()
-        data = resp.json()
+        return self.load_agent_card(resp.json())
 
+    def load_agent_card(self, data: dict) -> AgentCard:
+        """Build the AgentCard from an already fetched agent.json document."""
         caps_data = data["capabilities"]
         caps = AgentCapabilities(**caps_data)
 
@@ -92,9 +101,13 @@ class RemoteAgentClient:
                 },
             },
         }
-        r = requests.post(self.base_url, json=payload, timeout=30)
-        r.raise_for_status()
-        resp = r.json()
+        with TRACER.span("host.send_task", attributes={"a2a.url": self.base_url}):
+            payload["params"]["metadata"] = inject_metadata(None)
+            r = requests.post(
+                self.base_url, json=payload, headers=inject_headers(), timeout=30
+            )
+            r.raise_for_status()
+            resp = r.json()
         if "error" in resp and resp["error"] is not None:
             raise RuntimeError(f"Remote agent error: {resp['error']}")
         return resp.get("result", {})
@@ -107,11 +120,40 @@ class HostAgent:
         self.clients = {}
         for addr in remote_addresses:
             self.clients[addr] = RemoteAgentClient(addr)
+        self._resolver = AsyncA2ACardResolver()
+        self._unresolved: List[str] = []
+        self._retry_delay = 2.0
+        self._retry_at = 0.0
 
     def initialize(self):
-        """Fetch agent cards for all addresses (synchronously)."""
-        for addr, client in self.clients.items():
-            client.fetch_agent_card()
+        """Fetch agent cards for all addresses concurrently.
+
+        Unreachable agents are skipped and picked up by retry_unresolved.
+        """
+        documents, self._unresolved = self._resolver.fetch_all_sync(self.clients.keys())
+        for addr, data in documents.items():
+            self._load_card(addr, data)
+        self._retry_at = time.monotonic() + self._retry_delay
+
+    def retry_unresolved(self, max_delay: float = 60.0):
+        """Fetch the cards that failed before, once their backoff has passed.
+
+        Called by the conversation loop between turns, so cards are only
+        loaded while no tool is reading ``clients``.
+        """
+        if not self._unresolved or time.monotonic() < self._retry_at:
+            return
+        documents, self._unresolved = self._resolver.fetch_all_sync(self._unresolved)
+        for addr, data in documents.items():
+            self._load_card(addr, data)
+        self._retry_delay = min(self._retry_delay * 2, max_delay)
+        self._retry_at = time.monotonic() + self._retry_delay
+
+    def _load_card(self, addr: str, data: dict):
+        try:
+            self.clients[addr].load_agent_card(data)
+        except (KeyError, TypeError) as exc:
+            logger.warning(f"Invalid agent card from {addr}: {exc}")
 
     def list_agents_info(self) -> list:
         """Return a list of {name, description, url, streaming} for each loaded agent."""
@@ -254,6 +296,7 @@ def run_agent(remote_url: str = "http://localhost:8000"):
             typer.echo("Goodbye!")
             break
 
+        host_agent.retry_unresolved()
         raw_result = react_agent.invoke(
             {"messages": [{"role": "user", "content": user_msg}]},
             config={"configurable": {"thread_id": "cli-session"}},
@@ -0,0 +1,414 @@
+"""Process-wide scheduler for chat-model calls.
+
+Every agent shares one scheduler, so the provider's rate limits are enforced
+once per model rather than once per agent. Each model has two token
+buckets: requests per minute and tokens per minute. A call reserves its
+estimated prompt tokens plus ``max_tokens`` up front, and the reservation
+is corrected with the real usage when the call returns. Waiting calls are
+admitted in priority order (interactive streams first, then everything
+else) and FIFO within a priority.
+
+Concurrency adapts AIMD-style to the provider's responses. It grows by
+1/limit per successful call and halves on every 429. A 429 also pauses the
+buckets for ``retry-after`` plus jitter, so queued callers do not retry in
+lockstep. The ``x-ratelimit-*`` headers Groq returns keep the buckets in
+sync with the provider's own accounting. They are fed in through httpx
+event hooks (see ``response_hooks``).
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterator, Mapping, Sequence
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from chat_wrapper import WrappedChatModel, message_text
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+NORMAL = 5
+
+_PRIORITY: ContextVar[int] = ContextVar("llm_priority", default=NORMAL)
+
+QUEUE_WAIT = REGISTRY.histogram(
+    "a2a_llm_queue_wait_seconds",
+    "Time chat-model calls waited for the scheduler, by model and priority.",
+    ("model", "priority"),
+)
+RATE_LIMITED = REGISTRY.counter(
+    "a2a_llm_rate_limited_total", "429 responses from the model provider.", ("model",)
+)
+
+
+@contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """Sets the priority of model calls made in this context."""
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def estimate_request_tokens(
+    messages: Sequence[BaseMessage], tools: list | None = None, max_tokens: int | None = None
+) -> int:
+    """Roughly four characters per token, plus the bound tool schemas and the output budget."""
+    chars = sum(len(message_text(m)) for m in messages)
+    chars += sum(len(str(tool)) for tool in tools or [])
+    return chars // 4 + (max_tokens or 0)
+
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """Parses Groq reset durations such as ``2m59.56s``, ``7.66s`` or ``120ms``."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    parts = _DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Returns (positive) or charges (negative) tokens after the fact."""
+        self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, remaining: float | None, reset_after: float | None, now: float):
+        if remaining is None:
+            return
+        self._refill(now)
+        self.level = min(self.level, remaining)
+        if remaining <= 0 and reset_after:
+            self.blocked_until = max(self.blocked_until, now + reset_after)
+
+
+@dataclass
+class ModelLimits:
+    requests_per_minute: float = 30
+    tokens_per_minute: float = 30000
+    max_concurrency: int = 8
+
+
+@dataclass
+class Permit:
+    model: str
+    tokens: int
+    priority: int
+    admitted_at: float
+
+
+class _Waiter:
+    def __init__(self, priority: int, seq: int, tokens: int, loop=None):
+        self.key = (priority, seq)
+        self.tokens = tokens
+        self.loop = loop
+        self.event = asyncio.Event() if loop is not None else threading.Event()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.key < other.key
+
+    def wake(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.event.set)
+        else:
+            self.event.set()
+
+
+class _ModelState:
+    def __init__(self, limits: ModelLimits):
+        self.limits = limits
+        self.requests = TokenBucket(limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute)
+        self.concurrency = float(limits.max_concurrency)
+        self.in_flight = 0
+        self.waiters: list[_Waiter] = []
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        limits: Mapping[str, ModelLimits] | None = None,
+        default_limits: ModelLimits | None = None,
+    ):
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits or ModelLimits()
+        self._models: dict[str, _ModelState] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        REGISTRY.register_collector("a2a_llm_scheduler", "Scheduler state by model.", self._collect)
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            state = self._models[model] = _ModelState(self.limits.get(model, self.default_limits))
+        return state
+
+    def _collect(self):
+        samples = []
+        for model, state in list(self._models.items()):
+            samples.append(({"model": model, "field": "in_flight"}, state.in_flight))
+            samples.append(({"model": model, "field": "waiting"}, len(state.waiters)))
+            samples.append(({"model": model, "field": "concurrency_limit"}, state.concurrency))
+        return samples
+
+    def _try_admit(self, state: _ModelState, waiter: _Waiter) -> float | None:
+        """Admits ``waiter`` if it is at the head of the queue and capacity allows.
+
+        Returns 0 when admitted, a delay in seconds when the buckets are empty,
+        or None when the waiter has to wait to be woken.
+        """
+        if state.waiters[0] is not waiter or state.in_flight >= int(state.concurrency):
+            return None
+        now = time.monotonic()
+        delay = max(state.requests.wait_time(1, now), state.tokens.wait_time(waiter.tokens, now))
+        if delay > 0:
+            return delay
+        state.requests.take(1)
+        state.tokens.take(waiter.tokens)
+        state.in_flight += 1
+        heapq.heappop(state.waiters)
+        if state.waiters:
+            state.waiters[0].wake()
+        return 0.0
+
+    def _enqueue(self, model: str, tokens: int, priority: int | None, loop=None):
+        priority = _PRIORITY.get() if priority is None else priority
+        waiter = _Waiter(priority, next(self._seq), tokens, loop)
+        with self._lock:
+            heapq.heappush(self._state(model).waiters, waiter)
+        return waiter, priority
+
+    def _abandon(self, model: str, waiter: _Waiter):
+        with self._lock:
+            state = self._state(model)
+            if waiter in state.waiters:
+                state.waiters.remove(waiter)
+                heapq.heapify(state.waiters)
+                if state.waiters:
+                    state.waiters[0].wake()
+
+    def acquire(self, model: str, tokens: int, priority: int | None = None) -> Permit:
+        start = time.monotonic()
+        waiter, priority = self._enqueue(model, tokens, priority)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._try_admit(self._state(model), waiter)
+                if delay == 0:
+                    break
+                waiter.event.wait(delay)
+                waiter.event.clear()
+        except BaseException:
+            self._abandon(model, waiter)
+            raise
+        return self._permit(model, tokens, priority, start)
+
+    async def acquire_async(self, model: str, tokens: int, priority: int | None = None) -> Permit:
+        start = time.monotonic()
+        waiter, priority = self._enqueue(model, tokens, priority, asyncio.get_running_loop())
+        try:
+            while True:
+                with self._lock:
+                    delay = self._try_admit(self._state(model), waiter)
+                if delay == 0:
+                    break
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                waiter.event.clear()
+        except BaseException:
+            self._abandon(model, waiter)
+            raise
+        return self._permit(model, tokens, priority, start)
+
+    def _permit(self, model: str, tokens: int, priority: int, start: float) -> Permit:
+        now = time.monotonic()
+        QUEUE_WAIT.observe(now - start, model, str(priority))
+        return Permit(model, tokens, priority, now)
+
+    def release(self, permit: Permit, used_tokens: int | None = None, ok: bool = True):
+        with self._lock:
+            state = self._state(permit.model)
+            state.in_flight -= 1
+            if used_tokens is not None:
+                state.tokens.adjust(permit.tokens - used_tokens)
+            if ok:
+                state.concurrency = min(
+                    state.limits.max_concurrency, state.concurrency + 1 / state.concurrency
+                )
+            if state.waiters:
+                state.waiters[0].wake()
+
+    def observe_response(self, model: str, status_code: int, headers: Mapping[str, str]):
+        """Feeds provider rate-limit headers and 429s back into the buckets."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(model)
+            remaining_requests = headers.get("x-ratelimit-remaining-requests")
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            state.requests.sync(
+                float(remaining_requests) if remaining_requests else None,
+                _parse_duration(headers.get("x-ratelimit-reset-requests")),
+                now,
+            )
+            state.tokens.sync(
+                float(remaining_tokens) if remaining_tokens else None,
+                _parse_duration(headers.get("x-ratelimit-reset-tokens")),
+                now,
+            )
+            if status_code == 429:
+                RATE_LIMITED.inc(model)
+                state.concurrency = max(1.0, state.concurrency / 2)
+                retry_after = _parse_duration(headers.get("retry-after")) or 1.0
+                pause_until = now + retry_after * (1 + random.uniform(0, 0.25))
+                state.requests.blocked_until = max(state.requests.blocked_until, pause_until)
+                logger.warning(
+                    f"Rate limited on {model}; concurrency now {int(state.concurrency)}, "
+                    f"pausing {pause_until - now:.1f}s"
+                )
+
+    def response_hooks(self, model: str) -> tuple[Callable, Callable]:
+        """Sync and async httpx response hooks that update this scheduler's view of ``model``."""
+
+        def _hook(response: httpx.Response):
+            self.observe_response(model, response.status_code, response.headers)
+
+        async def _async_hook(response: httpx.Response):
+            _hook(response)
+
+        return _hook, _async_hook
+
+
+class ScheduledChatModel(WrappedChatModel):
+    """Routes every call of ``inner`` through an LLMScheduler."""
+
+    inner: BaseChatModel
+    scheduler: LLMScheduler
+    model: str
+    max_tokens: int | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return f"scheduled-{self.inner._llm_type}"
+
+    def _estimate(self, messages, tools) -> int:
+        return estimate_request_tokens(messages, tools, self.max_tokens)
+
+    @staticmethod
+    def _used_tokens(message) -> int | None:
+        usage = getattr(message, "usage_metadata", None)
+        return usage.get("total_tokens") if usage else None
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs) -> ChatResult:
+        permit = self.scheduler.acquire(self.model, self._estimate(messages, tools))
+        message, ok = None, False
+        try:
+            message = self._call_inner(messages, stop, tools, tool_choice)
+            ok = True
+        finally:
+            self.scheduler.release(permit, self._used_tokens(message), ok)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs
+    ) -> ChatResult:
+        permit = await self.scheduler.acquire_async(self.model, self._estimate(messages, tools))
+        message, ok = None, False
+        try:
+            message = await self._acall_inner(messages, stop, tools, tool_choice)
+            ok = True
+        finally:
+            self.scheduler.release(permit, self._used_tokens(message), ok)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs):
+        permit = self.scheduler.acquire(self.model, self._estimate(messages, tools))
+        used, ok = None, False
+        try:
+            for chunk in self._stream_inner(messages, stop, tools, tool_choice):
+                used = self._used_tokens(chunk) or used
+                yield ChatGenerationChunk(message=chunk)
+            ok = True
+        finally:
+            self.scheduler.release(permit, used, ok)
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs
+    ):
+        permit = await self.scheduler.acquire_async(self.model, self._estimate(messages, tools))
+        used, ok = None, False
+        try:
+            async for chunk in self._astream_inner(messages, stop, tools, tool_choice):
+                used = self._used_tokens(chunk) or used
+                yield ChatGenerationChunk(message=chunk)
+            ok = True
+        finally:
+            self.scheduler.release(permit, used, ok)
+
+
+_scheduler: LLMScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Returns the process-wide scheduler, configured from ``A2A_LLM_RPM``,
+    ``A2A_LLM_TPM`` and ``A2A_LLM_MAX_CONCURRENCY``."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                default_limits=ModelLimits(
+                    requests_per_minute=float(os.getenv("A2A_LLM_RPM", "30")),
+                    tokens_per_minute=float(os.getenv("A2A_LLM_TPM", "30000")),
+                    max_concurrency=int(os.getenv("A2A_LLM_MAX_CONCURRENCY", "8")),
+                )
+            )
+        return _scheduler
@@ -0,0 +1,112 @@
+"""Event-loop lag monitor and blocking-call detector.
+
+A probe coroutine sleeps for ``interval`` and measures how late it wakes up.
+That delay is the scheduling lag every other callback on the loop suffers.
+A watchdog thread watches the probe's heartbeat. When the loop has not run
+the probe for longer than ``block_threshold``, some callback is blocking it.
+The watchdog then logs the loop thread's current stack, which points at the
+synchronous call (``agent.invoke``, ``graph.stream``, RS256 signing, ...)
+responsible.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LAG_QUANTILES = (0.5, 0.9, 0.99)
+
+BLOCKED_CALLBACKS = REGISTRY.counter(
+    "a2a_event_loop_blocked_total",
+    "Times a callback blocked the event loop longer than the threshold.",
+)
+BLOCKED_CALLBACKS.inc(amount=0)
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        interval: float = 0.1,
+        block_threshold: float = 0.25,
+        window: int = 1024,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self._lags: deque[float] = deque(maxlen=window)
+        self._last_tick = time.monotonic()
+        self._reported_tick: float | None = None
+        self._loop_thread_id: int | None = None
+        self._probe_task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+        REGISTRY.register_collector(
+            "a2a_event_loop_lag_seconds",
+            "Event-loop scheduling delay over the recent window, by quantile.",
+            self._collect_lag,
+        )
+
+    def start(self):
+        """Starts monitoring the running loop; call from inside it."""
+        if self._probe_task is not None:
+            return
+        self._stopped.clear()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+    async def _probe(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._lags.append(max(0.0, now - start - self.interval))
+            self._last_tick = now
+
+    def _watch(self):
+        poll = min(self.interval, self.block_threshold / 2)
+        while not self._stopped.wait(poll):
+            last_tick = self._last_tick
+            stalled = time.monotonic() - last_tick - self.interval
+            if stalled > self.block_threshold and self._reported_tick != last_tick:
+                self._reported_tick = last_tick
+                BLOCKED_CALLBACKS.inc()
+                self._log_blocking_stack(stalled)
+
+    def _log_blocking_stack(self, stalled: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>"
+        logger.warning(
+            f"Event loop blocked for {stalled * 1000:.0f}ms "
+            f"(threshold {self.block_threshold * 1000:.0f}ms); loop thread stack:\n{stack}"
+        )
+
+    def lag_percentiles(self) -> dict[float, float]:
+        lags = sorted(self._lags)
+        if not lags:
+            return {q: 0.0 for q in LAG_QUANTILES}
+        return {q: lags[min(len(lags) - 1, int(q * len(lags)))] for q in LAG_QUANTILES}
+
+    def _collect_lag(self):
+        samples = [
+            ({"quantile": str(q)}, value) for q, value in self.lag_percentiles().items()
+        ]
+        samples.append(({"quantile": "1"}, max(self._lags, default=0.0)))
+        return samples
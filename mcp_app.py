@@ -1,16 +1,67 @@
 
+import os
+
+import numpy as np
 from mcp.server.fastmcp import FastMCP # type: ignore
+from pydantic import BaseModel
+
+from rate_cache import ExchangeRateCache, RateTable
+from rate_history import RateHistory, default_directory
 
 mcp = FastMCP(name="MinimalServer", host="0.0.0.0", port=3000)
 
+# Platzhalter-Währungen, solange keine echte Kursquelle angebunden ist.
+PLACEHOLDER_CURRENCIES = (
+    "USD", "EUR", "GBP", "JPY", "INR", "CHF", "CAD", "AUD", "CNY",
+    "SEK", "NOK", "MXN", "BRL", "KRW", "SGD", "HKD", "ZAR",
+)
+
+
+# Kurshistorie auf der Platte, siehe rate_history.py.
+rate_history = RateHistory(default_directory())
+
+
+async def fetch_rates(base: str, currency_date: str) -> dict[str, float]:
+    """Upstream-Abfrage aller Kurse für eine Basiswährung an einem Datum.
+
+    Historische Kurse kommen aus der Kurshistorie. Sonst liefert sie statische
+    Placeholder-Daten; hier wird später die echte Kursquelle angebunden. Die
+    Placeholder-Daten sind als vorläufig markiert, damit der Cache sie nicht
+    dauerhaft für ein historisches Datum hält.
+    """
+    if currency_date != "latest":
+        rates = rate_history.table(base, currency_date)
+        if rates:
+            return rates
+    return RateTable(
+        {currency: 0.85 for currency in PLACEHOLDER_CURRENCIES if currency != base},
+        provisional=True,
+    )
+
+
+rate_cache = ExchangeRateCache(
+    fetch_rates,
+    latest_ttl=float(os.getenv("A2A_RATE_LATEST_TTL", "300")),
+    max_dates=int(os.getenv("A2A_RATE_CACHE_DATES", "10000")),
+)
+
+# Obergrenze für Umrechnungen pro Batch-Aufruf.
+MAX_BATCH_CONVERSIONS = int(os.getenv("A2A_RATE_MAX_BATCH", "1000"))
+
+
+class Conversion(BaseModel):
+    currency_from: str
+    currency_to: str
+    amount: float = 1.0
+
 
 @mcp.tool()
-def get_exchange_rate(
+async def get_exchange_rate(
     currency_from: str = "USD",
     currency_to: str = "EUR",
     currency_date: str = "latest",
 ):
-    """Dummy-Tool, das 1:1 eine statische Antwort zurückgibt, anstelle eines echten API-Calls.
+    """Liefert den Wechselkurs für ein Währungspaar, über den Kurs-Cache.
 
     Args:
         currency_from: Die Quellwährung (z.B. "USD").
@@ -18,16 +69,124 @@ def get_exchange_rate(
         currency_date: Das Datum für den Wechselkurs oder "latest". Standard "latest".
 
     Returns:
-        Ein Dictionary mit statischen Placeholder-Daten.
+        Ein Dictionary mit Basiswährung, Datum und Kurs.
     """
+    currency_from, currency_to = currency_from.upper(), currency_to.upper()
+    rate = await rate_cache.get_rate(currency_from, currency_to, currency_date)
+    if rate is None:
+        raise ValueError(f"No exchange rate for {currency_from}/{currency_to} on {currency_date}")
     return {
         "amount": 1,
         "base": currency_from,
         "date": currency_date,
-        "rates": {currency_to: 0.85},  # Beispiel-Rate
+        "rates": {currency_to: rate},
+    }
+
+
+@mcp.tool()
+async def get_exchange_rates_batch(
+    conversions: list[Conversion],
+    currency_date: str = "latest",
+):
+    """Rechnet viele Beträge über viele Währungspaare in einem Aufruf um.
+
+    Args:
+        conversions: Liste von Umrechnungen mit currency_from, currency_to und amount (Standard 1).
+        currency_date: Das Datum für die Wechselkurse oder "latest". Standard "latest".
+
+    Returns:
+        Ein Dictionary mit Datum, je Umrechnung Kurs und umgerechnetem Betrag
+        (None, wenn kein Kurs vorliegt) sowie der Liste fehlender Paare.
+    """
+    if len(conversions) > MAX_BATCH_CONVERSIONS:
+        raise ValueError(f"At most {MAX_BATCH_CONVERSIONS} conversions per call")
+    currencies_from = [c.currency_from.upper() for c in conversions]
+    currencies_to = [c.currency_to.upper() for c in conversions]
+    amounts = np.fromiter((c.amount for c in conversions), dtype=np.float64, count=len(conversions))
+    rates = await rate_cache.get_rates(currencies_from, currencies_to, currency_date)
+    converted = amounts * rates
+    known = ~np.isnan(rates)
+    return {
+        "date": currency_date,
+        "results": [
+            {
+                "currency_from": currency_from,
+                "currency_to": currency_to,
+                "amount": amount,
+                "rate": rate if ok else None,
+                "converted": value if ok else None,
+            }
+            for currency_from, currency_to, amount, rate, value, ok in zip(
+                currencies_from,
+                currencies_to,
+                amounts.tolist(),
+                rates.tolist(),
+                converted.tolist(),
+                known.tolist(),
+            )
+        ],
+        "missing": sorted(
+            {f"{currencies_from[i]}/{currencies_to[i]}" for i in np.flatnonzero(~known)}
+        ),
+    }
+
+
+def _history_stats(currency_from: str, currency_to: str, start_date: str, end_date: str) -> dict:
+    currency_from, currency_to = currency_from.upper(), currency_to.upper()
+    stats = rate_history.stats(currency_from, currency_to, start_date, end_date)
+    if stats is None:
+        raise ValueError(
+            f"No exchange rate history for {currency_from}/{currency_to} "
+            f"between {start_date} and {end_date}"
+        )
+    return {"base": currency_from, "target": currency_to, **stats}
+
+
+@mcp.tool()
+async def get_exchange_rate_average(
+    currency_from: str,
+    currency_to: str,
+    start_date: str,
+    end_date: str,
+):
+    """Liefert den durchschnittlichen Wechselkurs eines Währungspaars über einen Zeitraum.
+
+    Args:
+        currency_from: Die Quellwährung (z.B. "USD").
+        currency_to: Die Zielwährung (z.B. "EUR").
+        start_date: Erster Tag des Zeitraums (YYYY-MM-DD).
+        end_date: Letzter Tag des Zeitraums (YYYY-MM-DD), einschließlich.
+
+    Returns:
+        Ein Dictionary mit Durchschnittskurs und Anzahl der Tage mit Kurs.
+    """
+    stats = _history_stats(currency_from, currency_to, start_date, end_date)
+    return {
+        key: stats[key]
+        for key in ("base", "target", "first_date", "last_date", "days", "average")
     }
 
 
+@mcp.tool()
+async def get_exchange_rate_range(
+    currency_from: str,
+    currency_to: str,
+    start_date: str,
+    end_date: str,
+):
+    """Liefert Tiefst- und Höchstkurs eines Währungspaars über einen Zeitraum.
+
+    Args:
+        currency_from: Die Quellwährung (z.B. "USD").
+        currency_to: Die Zielwährung (z.B. "EUR").
+        start_date: Erster Tag des Zeitraums (YYYY-MM-DD).
+        end_date: Letzter Tag des Zeitraums (YYYY-MM-DD), einschließlich.
+
+    Returns:
+        Ein Dictionary mit Tiefst- und Höchstkurs samt Datum sowie dem Durchschnitt.
+    """
+    return _history_stats(currency_from, currency_to, start_date, end_date)
+
 
 if __name__ == "__main__":
     mcp.run(transport="sse")
@@ -0,0 +1,385 @@
+"""Long-lived MCP client sessions shared by all agents.
+
+Previously the tools were listed inside a throwaway MultiServerMCPClient, so
+every tool call had to set up the transport again. MCPSessionPool keeps
+``A2A_MCP_SESSIONS`` warm sessions (default 4) per server. Concurrent tool
+calls use different sessions; when all are busy, callers wait for one. Each
+session is owned by a supervisor task that reconnects with exponential
+backoff when the transport drops.
+
+The pool runs on its own event loop thread because tools are called from
+both places. The ReAct graph calls them synchronously from worker threads,
+and streaming runs call them from the server's loop. The tool list is
+cached and refreshed every ``A2A_MCP_REFRESH`` seconds (default 60), and
+immediately when a server sends ``notifications/tools/list_changed``. A
+fingerprint of names and schemas tells whether it actually changed. The
+LangChain tools route calls by name, so they keep working across reconnects
+and refreshes. When the list changes, the listeners registered with
+``on_tools_changed`` run; CurrencyAgent rebuilds its graph so the model sees
+the new tools.
+
+Transports: ``sse`` and, with an mcp release that ships it,
+``streamable_http``.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+TOOL_CALL_LATENCY = REGISTRY.histogram(
+    "a2a_mcp_tool_call_seconds",
+    "MCP tool call latency over pooled sessions, including the wait for a free session.",
+    ("server", "tool"),
+)
+RECONNECTS = REGISTRY.counter(
+    "a2a_mcp_reconnects_total",
+    "MCP sessions re-established after the transport failed.",
+    ("server",),
+)
+
+
+def _tool_fingerprint(tools: list) -> str:
+    payload = json.dumps(
+        [(tool.name, tool.description, tool.inputSchema) for tool in tools], sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _is_transport_error(error: BaseException) -> bool:
+    """Whether ``error`` means the session's streams are gone, not that the request failed.
+
+    Errors the server answered with (McpError) leave the session usable.
+    """
+    import anyio
+    import httpx
+
+    return isinstance(
+        error,
+        (
+            anyio.ClosedResourceError,
+            anyio.BrokenResourceError,
+            anyio.EndOfStream,
+            httpx.TransportError,
+            ConnectionError,
+        ),
+    )
+
+
+def _convert_result(result) -> tuple[Any, Optional[list]]:
+    """Mirrors langchain_mcp_adapters: text content, plus non-text content as the artifact."""
+    from mcp.types import TextContent
+
+    texts = [content.text for content in result.content if isinstance(content, TextContent)]
+    others = [content for content in result.content if not isinstance(content, TextContent)]
+    content = texts[0] if len(texts) == 1 else texts
+    if result.isError:
+        raise ToolException(content)
+    return content, others or None
+
+
+class _PooledSession:
+    """One MCP session, kept connected by its supervisor task."""
+
+    def __init__(self, pool: "MCPSessionPool", server: str, index: int):
+        self.pool = pool
+        self.server = server
+        self.index = index
+        self.session = None
+        self.generation = 0
+        self.broken = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def _transport(self):
+        config = self.pool.servers[self.server]
+        transport = config.get("transport", "sse")
+        if transport == "sse":
+            from mcp.client.sse import sse_client
+
+            return sse_client(
+                config["url"],
+                headers=config.get("headers"),
+                timeout=config.get("timeout", 5),
+                sse_read_timeout=config.get("sse_read_timeout", 300),
+            )
+        if transport == "streamable_http":
+            from mcp.client.streamable_http import streamablehttp_client
+
+            return streamablehttp_client(config["url"], headers=config.get("headers"))
+        raise ValueError(f"Unsupported MCP transport for {self.server}: {transport}")
+
+    async def _handle_message(self, message):
+        from mcp.types import ServerNotification, ToolListChangedNotification
+
+        if isinstance(message, ServerNotification) and isinstance(
+            message.root, ToolListChangedNotification
+        ):
+            asyncio.create_task(self.pool._refresh_tools(self.server))
+
+    async def _keepalive(self, session):
+        """Returns once the session is broken; a failed ping raises.
+
+        The SSE transport does not notice a server that went away, and
+        requests on such a session would otherwise hang until they time out.
+        """
+        while not self.broken.is_set():
+            try:
+                await asyncio.wait_for(self.broken.wait(), self.pool.ping_interval)
+            except asyncio.TimeoutError:
+                await asyncio.wait_for(session.send_ping(), self.pool.ping_timeout)
+
+    async def run(self, connected: asyncio.Event):
+        from mcp import ClientSession
+
+        backoff = self.pool.min_backoff
+        first = True
+        while not self.pool.closing:
+            try:
+                async with self._transport() as streams:
+                    async with ClientSession(
+                        streams[0], streams[1], message_handler=self._handle_message
+                    ) as session:
+                        await session.initialize()
+                        self.session = session
+                        self.generation += 1
+                        self.broken.clear()
+                        backoff = self.pool.min_backoff
+                        if not first:
+                            RECONNECTS.inc(self.server)
+                            logger.info(f"Reconnected MCP session {self.server}#{self.index}")
+                        first = False
+                        self.pool._release(self)
+                        connected.set()
+                        if self.server not in self.pool.fingerprints:
+                            asyncio.create_task(self.pool._refresh_tools(self.server))
+                        await self._keepalive(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                while isinstance(e, BaseExceptionGroup) and e.exceptions:
+                    e = e.exceptions[0]
+                logger.warning(f"MCP session {self.server}#{self.index} failed: {e!r}")
+            finally:
+                self.session = None
+            connected.set()
+            if self.pool.closing:
+                break
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.pool.max_backoff)
+
+
+class MCPSessionPool:
+    def __init__(
+        self,
+        servers: dict[str, dict[str, Any]],
+        sessions_per_server: int = 4,
+        refresh_interval: float = 60.0,
+        call_timeout: float = 30.0,
+        ping_interval: float = 10.0,
+        ping_timeout: float = 5.0,
+        min_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.servers = servers
+        self.sessions_per_server = max(1, sessions_per_server)
+        self.refresh_interval = refresh_interval
+        self.call_timeout = call_timeout
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.closing = False
+        self.fingerprints: dict[str, str] = {}
+        self._mcp_tools: dict[str, list] = {}
+        self._tools: dict[str, BaseTool] = {}
+        self._listeners: list[Callable[[str], None]] = []
+        self._sessions: dict[str, list[_PooledSession]] = {}
+        self._idle: dict[str, asyncio.Queue] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-pool", daemon=True)
+        self._started = False
+        self._start_lock = threading.Lock()
+        REGISTRY.register_collector(
+            "a2a_mcp_sessions",
+            "Connected MCP sessions per server.",
+            lambda: [
+                ({"server": server}, sum(1 for s in sessions if s.session is not None))
+                for server, sessions in self._sessions.items()
+            ],
+        )
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def start(self, timeout: float = 10.0):
+        """Connects all sessions and loads the tool lists; safe to call repeatedly."""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            self._thread.start()
+            self._submit(self._connect_all()).result(timeout)
+
+    async def _connect_all(self):
+        for server in self.servers:
+            self._idle[server] = asyncio.Queue()
+            sessions = [_PooledSession(self, server, i) for i in range(self.sessions_per_server)]
+            self._sessions[server] = sessions
+            connected = [asyncio.Event() for _ in sessions]
+            for session, event in zip(sessions, connected):
+                session.task = asyncio.create_task(session.run(event))
+            # Wait until the first connection attempt of each session has finished.
+            await asyncio.gather(*(event.wait() for event in connected))
+            if not any(session.session is not None for session in sessions):
+                logger.error(f"MCP server {server} is unreachable; retrying in the background")
+            else:
+                await self._refresh_tools(server)
+        if self.refresh_interval > 0:
+            asyncio.create_task(self._refresh_periodically())
+
+    async def _refresh_periodically(self):
+        while not self.closing:
+            await asyncio.sleep(self.refresh_interval)
+            for server in self.servers:
+                await self._refresh_tools(server)
+
+    async def _refresh_tools(self, server: str):
+        try:
+            result = await self._with_session(server, lambda session: session.list_tools())
+        except Exception as e:
+            logger.warning(f"Listing MCP tools on {server} failed: {e}")
+            return
+        fingerprint = _tool_fingerprint(result.tools)
+        if fingerprint == self.fingerprints.get(server):
+            return
+        if server in self.fingerprints:
+            logger.info(f"MCP tools on {server} changed ({fingerprint})")
+        self.fingerprints[server] = fingerprint
+        for tool in self._mcp_tools.get(server, []):
+            self._tools.pop(tool.name, None)
+        self._mcp_tools[server] = result.tools
+        for tool in result.tools:
+            self._tools[tool.name] = self._as_langchain_tool(server, tool)
+        for listener in self._listeners:
+            try:
+                listener(server)
+            except Exception as e:
+                logger.error(f"MCP tool change listener failed for {server}: {e}")
+
+    def _release(self, pooled: _PooledSession):
+        self._idle[pooled.server].put_nowait((pooled, pooled.generation))
+
+    async def _with_session(self, server: str, operation):
+        """Runs ``operation(session)`` on an idle session, retrying once after a transport error."""
+        failures = 0
+        while True:
+            pooled, generation = await asyncio.wait_for(self._idle[server].get(), self.call_timeout)
+            if pooled.session is None or generation != pooled.generation:
+                continue  # Queued before its connection dropped.
+            try:
+                result = await asyncio.wait_for(operation(pooled.session), self.call_timeout)
+            except asyncio.TimeoutError:
+                # The session may be stuck on a dead transport; reconnect to be safe.
+                pooled.broken.set()
+                raise
+            except Exception as e:
+                if not _is_transport_error(e):
+                    # The server answered (McpError) or the request was invalid;
+                    # the session is fine and the same call would fail again.
+                    self._release(pooled)
+                    raise
+                # The transport is gone; the supervisor reconnects and re-queues it.
+                pooled.broken.set()
+                failures += 1
+                if failures == 2:
+                    raise
+                continue
+            self._release(pooled)
+            return result
+
+    async def _call(self, server: str, name: str, arguments: dict[str, Any]):
+        with TOOL_CALL_LATENCY.time(server, name):
+            result = await self._with_session(
+                server, lambda session: session.call_tool(name, arguments)
+            )
+        return _convert_result(result)
+
+    async def acall_tool(self, server: str, name: str, arguments: dict[str, Any]):
+        return await asyncio.wrap_future(self._submit(self._call(server, name, arguments)))
+
+    def call_tool(self, server: str, name: str, arguments: dict[str, Any]):
+        return self._submit(self._call(server, name, arguments)).result()
+
+    def _as_langchain_tool(self, server: str, tool) -> BaseTool:
+        def call(**arguments):
+            return self.call_tool(server, tool.name, arguments)
+
+        async def acall(**arguments):
+            return await self.acall_tool(server, tool.name, arguments)
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description or "",
+            args_schema=tool.inputSchema,
+            func=call,
+            coroutine=acall,
+            response_format="content_and_artifact",
+        )
+
+    def get_tools(self) -> list[BaseTool]:
+        self.start()
+        if not self._tools:
+            raise ConnectionError(f"No MCP tools available from {', '.join(self.servers)}")
+        return list(self._tools.values())
+
+    def on_tools_changed(self, listener: Callable[[str], None]):
+        """Registers ``listener(server)``, called on the pool thread after a tool list change."""
+        self._listeners.append(listener)
+
+    def close(self, timeout: float = 5.0):
+        if not self._started or self.closing:
+            return
+        self.closing = True
+
+        async def _close():
+            tasks = [s.task for sessions in self._sessions.values() for s in sessions if s.task]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self._submit(_close()).result(timeout)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_pool: Optional[MCPSessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_mcp_pool(servers: dict[str, dict[str, Any]]) -> MCPSessionPool:
+    """Returns the process-wide pool, created for ``servers`` on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MCPSessionPool(
+                servers,
+                sessions_per_server=int(os.getenv("A2A_MCP_SESSIONS", "4")),
+                refresh_interval=float(os.getenv("A2A_MCP_REFRESH", "60")),
+            )
+        return _pool
+
+
+def close_mcp_pool():
+    """Closes the pool if one was started; registered as a server shutdown handler."""
+    if _pool is not None:
+        _pool.close()
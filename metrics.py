@@ -0,0 +1,213 @@
+"""Minimal Prometheus-style metrics.
+
+Counters and histograms are plain dicts keyed by label values. Updating one
+is a dict lookup and an in-place add, with no locks: the A2A server runs on a
+single event loop, and under the GIL a rare lost increment from a worker
+thread is an acceptable price for a hot path that stays this cheap. Values
+that already live elsewhere (task states, queue sizes) are read lazily by
+collectors at scrape time instead of being mirrored on every change.
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+Samples = Iterable[tuple[dict[str, str], float]]
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, key: tuple) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def _render_samples(self):
+        return [
+            f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}"
+            for key, value in list(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labelvalues: str, value: float):
+        self._values[labelvalues] = value
+
+    def dec(self, *labelvalues: str, amount: float = 1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        series = self._values.get(labelvalues)
+        if series is None:
+            series = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._values.get(labelvalues)
+        return int(sum(series[:-1])) if series else 0
+
+    def _render_samples(self):
+        lines = []
+        for key, series in list(self._values.items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += bucket_count
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class CollectedMetric(_Metric):
+    """A metric whose samples are produced by a callback at scrape time."""
+
+    def __init__(self, name, documentation, kind: str, collect: Callable[[], Samples]):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self.collect = collect
+
+    def _render_samples(self):
+        return [
+            f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+            for labels, value in self.collect()
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name, documentation, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, documentation, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames=labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames=labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames=labelnames, buckets=buckets
+        )
+
+    def register_collector(
+        self, name: str, documentation: str, collect: Callable[[], Samples], kind: str = "gauge"
+    ):
+        """Registers (or replaces) a callback-backed metric."""
+        self._metrics[name] = CollectedMetric(name, documentation, kind, collect)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Metrics shared by several modules are declared here so their names stay in one place.
+REQUESTS = REGISTRY.counter(
+    "a2a_requests_total", "JSON-RPC requests handled, by method and outcome.", ("method", "outcome")
+)
+REQUEST_LATENCY = REGISTRY.histogram(
+    "a2a_request_duration_seconds",
+    "Time until a JSON-RPC handler returned its response or stream.",
+    ("method",),
+)
+SSE_STREAMS_ACTIVE = REGISTRY.gauge(
+    "a2a_sse_streams_active", "SSE streams currently being served."
+)
+SSE_STREAMS_ACTIVE.set(value=0)
+AGENT_LATENCY = REGISTRY.histogram(
+    "a2a_agent_invocation_seconds",
+    "Specialized agent invocation latency, by MultiAgent route and mode.",
+    ("agent", "mode"),
+)
+AGENT_ERRORS = REGISTRY.counter(
+    "a2a_agent_errors_total", "Specialized agent invocations that raised.", ("agent", "mode")
+)
+PUSH_NOTIFICATION_LATENCY = REGISTRY.histogram(
+    "a2a_push_notification_seconds",
+    "Push-notification delivery latency, including signing.",
+    ("outcome",),
+)
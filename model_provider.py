@@ -0,0 +1,182 @@
+"""Pluggable chat-model and MCP-tool providers for the agents.
+
+``A2A_MODEL_PROVIDER`` selects the chat model: ``groq`` (default) or
+``fake``, the deterministic FakeChatModel from fakes.py, configured with
+``A2A_FAKE_LATENCY``, ``A2A_FAKE_TOKENS_PER_SECOND``,
+``A2A_FAKE_PREFILL_TOKENS_PER_SECOND``, ``A2A_FAKE_STATUS`` and
+``A2A_FAKE_SEED``. ``A2A_MCP_STUB=1`` makes CurrencyAgent use the in-process
+MCP tool stub (latency ``A2A_MCP_STUB_LATENCY``) instead of the SSE server.
+
+``A2A_CASSETTE=path`` with ``A2A_CASSETTE_MODE=record`` captures every model
+and MCP tool call to a cassette (see cassette.py). ``A2A_CASSETTE_MODE=replay``
+serves them back offline, at ``A2A_CASSETTE_TIMING=original`` (scaled by
+``A2A_CASSETTE_SPEED``) or ``fast``.
+
+Groq models go through the process-wide rate-limit-aware scheduler in
+llm_scheduler.py. ``A2A_LLM_SCHEDULER=0`` disables it, and ``1`` applies it
+to the fake model as well.
+
+Chat models are shared. ``get_chat_model`` returns one instance per model
+name and settings, and all Groq models with the same name share one pooled
+keep-alive HTTP client pair. That pair uses HTTP/2 when the ``h2`` package
+is installed. ``A2A_LLM_MAX_CONNECTIONS`` caps the pool size.
+"""
+
+import functools
+import importlib.util
+import os
+import threading
+from typing import Callable
+
+import httpx
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+DEFAULT_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+
+def model_provider() -> str:
+    return os.getenv("A2A_MODEL_PROVIDER", "groq").lower()
+
+
+def uses_mcp_stub() -> bool:
+    return os.getenv("A2A_MCP_STUB", "").lower() in ("1", "true", "yes")
+
+
+def cassette_mode() -> str | None:
+    if not os.getenv("A2A_CASSETTE"):
+        return None
+    return os.getenv("A2A_CASSETTE_MODE", "replay").lower()
+
+
+def scheduler_enabled(provider: str) -> bool:
+    setting = os.getenv("A2A_LLM_SCHEDULER", "auto").lower()
+    if setting == "auto":
+        return provider == "groq"
+    return setting in ("1", "true", "yes")
+
+
+def requires_api_key() -> bool:
+    return model_provider() == "groq" and cassette_mode() != "replay"
+
+
+@functools.lru_cache(maxsize=1)
+def get_cassette():
+    from cassette import Cassette
+
+    return Cassette(
+        os.environ["A2A_CASSETTE"],
+        mode=cassette_mode(),
+        timing=os.getenv("A2A_CASSETTE_TIMING", "original").lower(),
+        speed=float(os.getenv("A2A_CASSETTE_SPEED", "1.0")),
+    )
+
+
+_chat_models: dict[tuple, BaseChatModel] = {}
+_chat_models_lock = threading.Lock()
+
+
+def get_chat_model(model: str = DEFAULT_MODEL, **settings) -> BaseChatModel:
+    """Returns the shared chat model for ``model`` and ``settings``, creating it once."""
+    key = (
+        model_provider(),
+        cassette_mode(),
+        model,
+        tuple(sorted((name, repr(value)) for name, value in settings.items())),
+    )
+    with _chat_models_lock:
+        chat_model = _chat_models.get(key)
+        if chat_model is None:
+            chat_model = _chat_models[key] = _create_chat_model(model, **settings)
+        return chat_model
+
+
+@functools.lru_cache(maxsize=None)
+def get_http_clients(model: str) -> tuple[httpx.Client, httpx.AsyncClient]:
+    """One pooled sync/async client pair per model, shared by every agent."""
+    max_connections = int(os.getenv("A2A_LLM_MAX_CONNECTIONS", "64"))
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=120,
+    )
+    http2 = importlib.util.find_spec("h2") is not None
+    sync_hooks, async_hooks = [], []
+    if scheduler_enabled(model_provider()):
+        from llm_scheduler import get_llm_scheduler
+
+        sync_hook, async_hook = get_llm_scheduler().response_hooks(model)
+        sync_hooks.append(sync_hook)
+        async_hooks.append(async_hook)
+    return (
+        httpx.Client(limits=limits, http2=http2, event_hooks={"response": sync_hooks}),
+        httpx.AsyncClient(limits=limits, http2=http2, event_hooks={"response": async_hooks}),
+    )
+
+
+def _create_chat_model(model: str, **settings) -> BaseChatModel:
+    mode = cassette_mode()
+    if mode == "replay":
+        from cassette import CassetteChatModel
+
+        return CassetteChatModel(cassette=get_cassette())
+    chat_model = _build_chat_model(model, **settings)
+    if mode == "record":
+        from cassette import CassetteChatModel
+
+        return CassetteChatModel(cassette=get_cassette(), inner=chat_model)
+    return chat_model
+
+
+def _build_chat_model(model: str, **settings) -> BaseChatModel:
+    provider = model_provider()
+    if provider == "groq":
+        settings["http_client"], settings["http_async_client"] = get_http_clients(model)
+    if not scheduler_enabled(provider):
+        return _provider_chat_model(provider, model, **settings)
+
+    from llm_scheduler import ScheduledChatModel, get_llm_scheduler
+
+    return ScheduledChatModel(
+        inner=_provider_chat_model(provider, model, **settings),
+        scheduler=get_llm_scheduler(),
+        model=model,
+        max_tokens=settings.get("max_tokens"),
+    )
+
+
+def _provider_chat_model(provider: str, model: str, **settings) -> BaseChatModel:
+    if provider == "fake":
+        from fakes import FakeChatModel
+
+        return FakeChatModel(
+            latency=os.getenv("A2A_FAKE_LATENCY", "fixed:0"),
+            tokens_per_second=float(os.getenv("A2A_FAKE_TOKENS_PER_SECOND", "0")),
+            prefill_tokens_per_second=float(
+                os.getenv("A2A_FAKE_PREFILL_TOKENS_PER_SECOND", "0")
+            ),
+            structured_status=os.getenv("A2A_FAKE_STATUS", "completed"),
+            seed=int(os.getenv("A2A_FAKE_SEED", "0")),
+        )
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(model=model, **settings)
+    raise ValueError(f"Unknown model provider: {provider}")
+
+
+def get_mcp_stub_tools() -> list:
+    from fakes import make_stub_mcp_tools
+
+    return make_stub_mcp_tools(latency=os.getenv("A2A_MCP_STUB_LATENCY", "fixed:0"))
+
+
+def get_mcp_tools(fetch_remote_tools: Callable[[], list]) -> list:
+    """Returns the MCP tools: recorded, stubbed or fetched from the server."""
+    mode = cassette_mode()
+    if mode == "replay":
+        return get_cassette().replay_tools()
+    tools = get_mcp_stub_tools() if uses_mcp_stub() else fetch_remote_tools()
+    if mode == "record":
+        return get_cassette().record_tools(tools)
+    return tools
@@ -1,5 +1,8 @@
+import time
 from typing import Union
 from custom_types import Message, Task
+from metrics import AGENT_ERRORS, AGENT_LATENCY
+from tracing import TRACER
 from agent import CurrencyAgent
 from specialized_agents import DeepLearningAgent, DsaAgent, EmailWriterAgent, CodeGeneratorAgent, ImageGeneratorAgent, GameGeneratorAgent, RainformentAgent
 
@@ -15,6 +18,16 @@ class MultiAgent:
         self.deep_learning_agent = DeepLearningAgent()
         self.rainforment_agent = RainformentAgent()
         self.dsa_agent = DsaAgent()
+        self.agents = {
+            "currency": self.currency_agent,
+            "email": self.email_agent,
+            "code": self.code_agent,
+            "image": self.image_agent,
+            "game": self.game_agent,
+            "deep_learning": self.deep_learning_agent,
+            "rainforment": self.rainforment_agent,
+            "dsa": self.dsa_agent,
+        }
         
         
     def _detect_agent_type(self, message: Message) -> str:
@@ -42,54 +55,53 @@ class MultiAgent:
         # Default to email writer if can't determine
         return "email"
     
+    def _get_agent(self, agent_type: str):
+        return self.agents[agent_type]
+
     def invoke(self, query: str, session_id: str) -> Union[str, Task]:
         """Route the request to the appropriate agent and return its response."""
         message = Message(role="user", parts=[{"type": "text", "text": query}])
         agent_type = self._detect_agent_type(message)
-        
-        if agent_type == "currency":
-            return self.currency_agent.invoke(query, session_id)
-        elif agent_type == "email":
-            return self.email_agent.invoke(query, session_id)
-        elif agent_type == "code":
-            return self.code_agent.invoke(query, session_id)
-        elif agent_type == "image":
-            return self.image_agent.invoke(query, session_id)
-        elif agent_type == "game":
-            return self.game_agent.invoke(query, session_id)
-        elif agent_type == "deep_learning":
-            return self.deep_learning_agent.invoke(query, session_id)
-        elif agent_type == "rainforment":
-            return self.rainforment_agent.invoke(query, session_id)
-        elif agent_type == "dsa":
-            return self.dsa_agent.invoke(query, session_id)
-        
+        agent = self._get_agent(agent_type)
+
+        start = time.perf_counter()
+        try:
+            with TRACER.span("agent.route", attributes={"agent": agent_type}):
+                return agent.invoke(query, session_id)
+        except Exception:
+            AGENT_ERRORS.inc(agent_type, "invoke")
+            raise
+        finally:
+            AGENT_LATENCY.observe(time.perf_counter() - start, agent_type, "invoke")
+
+    def record_turn(self, query: str, session_id: str, response: dict):
+        """Records a turn answered elsewhere in the routed agent's session history."""
+        message = Message(role="user", parts=[{"type": "text", "text": query}])
+        self._get_agent(self._detect_agent_type(message)).record_turn(query, session_id, response)
+
+    def has_history(self, query: str, session_id: str) -> bool:
+        """Whether the agent this query routes to has earlier turns of the session."""
+        message = Message(role="user", parts=[{"type": "text", "text": query}])
+        return self._get_agent(self._detect_agent_type(message)).has_history(query, session_id)
+
     async def stream(self, query: str, session_id: str):
         """Stream responses from the appropriate agent."""
         message = Message(role="user", parts=[{"type": "text", "text": query}])
         agent_type = self._detect_agent_type(message)
-        
-        if agent_type == "currency":
-            async for response in self.currency_agent.stream(query, session_id):
-                yield response
-        elif agent_type == "email":
-            async for response in self.email_agent.stream(query, session_id):
-                yield response
-        elif agent_type == "code":
-            async for response in self.code_agent.stream(query, session_id):
-                yield response
-        elif agent_type == "image":
-            async for response in self.image_agent.stream(query, session_id):
-                yield response
-        elif agent_type == "game":
-            async for response in self.game_agent.stream(query, session_id):
-                yield response
-        elif agent_type == "deep_learning":
-            async for response in self.deep_learning_agent.stream(query, session_id):
-                yield response
-        elif agent_type == "rainforment":
-            async for response in self.rainforment_agent.stream(query, session_id):
-                yield response
-        elif agent_type == "dsa":
-            async for response in self.dsa_agent.stream(query, session_id):
+        agent = self._get_agent(agent_type)
+
+        start = time.perf_counter()
+        # The span is not made current: this generator may be resumed or closed
+        # from other contexts, where resetting the context variable would fail.
+        span = TRACER.start_span("agent.route", attributes={"agent": agent_type})
+        try:
+            async for response in agent.stream(query, session_id):
                 yield response
+        except BaseException as e:
+            span.record_exception(e)
+            if isinstance(e, Exception):
+                AGENT_ERRORS.inc(agent_type, "stream")
+            raise
+        finally:
+            TRACER.end_span(span)
+            AGENT_LATENCY.observe(time.perf_counter() - start, agent_type, "stream")
@@ -0,0 +1,138 @@
+"""Statistical sampling profiler for the live server process.
+
+A background thread wakes every ``interval`` seconds and records:
+
+* the Python stack of every thread (``sys._current_frames``), and
+* the await chain of every pending asyncio task on the server's loop. This
+  attributes wall time to the coroutines that are waiting, which a thread
+  sampler alone would report as the loop idling in ``select``.
+
+Samples are aggregated into collapsed-stack format ("frame;frame;frame N"),
+which flamegraph.pl, speedscope and inferno read directly.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 300
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename.rsplit("/", 1)[-1]
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def _thread_stack(frame: FrameType) -> list[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _task_stack(task: asyncio.Task) -> list[str]:
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = (
+            getattr(awaitable, "cr_frame", None)
+            or getattr(awaitable, "ag_frame", None)
+            or getattr(awaitable, "gi_frame", None)
+        )
+        if frame is None:
+            stack.append(type(awaitable).__name__)
+            break
+        stack.append(_frame_label(frame))
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "ag_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+        )
+    return stack
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        interval: float = 0.005,
+        loop: asyncio.AbstractEventLoop | None = None,
+        include_threads: bool = True,
+        include_tasks: bool = True,
+    ):
+        self.interval = interval
+        self.loop = loop
+        self.include_threads = include_threads
+        self.include_tasks = include_tasks
+        self.samples: Counter[str] = Counter()
+        self.sample_count = 0
+
+    def _sample(self, own_thread_id: int):
+        if self.include_threads:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                stack = [f"thread:{names.get(thread_id, thread_id)}"] + _thread_stack(frame)
+                self.samples[";".join(stack)] += 1
+
+        if self.include_tasks and self.loop is not None and not self.loop.is_closed():
+            try:
+                tasks = asyncio.all_tasks(self.loop)
+            except RuntimeError:
+                return
+            for task in tasks:
+                if task.done():
+                    continue
+                stack = [f"task:{task.get_name()}"] + _task_stack(task)
+                self.samples[";".join(stack)] += 1
+
+    def run(self, seconds: float) -> str:
+        """Samples for ``seconds`` and returns the collapsed stacks."""
+        seconds = min(seconds, MAX_PROFILE_SECONDS)
+        own_thread_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        next_tick = time.monotonic()
+        while time.monotonic() < deadline:
+            self._sample(own_thread_id)
+            self.sample_count += 1
+            next_tick += self.interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+        logger.info(f"Profiled {self.sample_count} samples over {seconds}s")
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+async def profile(
+    seconds: float,
+    interval: float = 0.005,
+    include_threads: bool = True,
+    include_tasks: bool = True,
+) -> str:
+    """Profiles the running process from a worker thread without blocking the loop."""
+    profiler = SamplingProfiler(
+        interval=interval,
+        loop=asyncio.get_running_loop(),
+        include_threads=include_threads,
+        include_tasks=include_tasks,
+    )
+    return await asyncio.to_thread(profiler.run, seconds)
+
+
+async def profile_to_file(seconds: float, path: str, interval: float = 0.005):
+    collapsed = await profile(seconds, interval)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(collapsed)
+    logger.info(f"Wrote collapsed-stack profile to {path}")
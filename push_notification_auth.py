@@ -12,6 +12,8 @@ from jwt import PyJWK, PyJWKClient
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
+from metrics import PUSH_NOTIFICATION_LATENCY
+
 logger = logging.getLogger(__name__)
 AUTH_HEADER_PREFIX = "Bearer "
 
@@ -86,17 +88,21 @@ class PushNotificationSenderAuth(PushNotificationAuth):
         )
 
     async def send_push_notification(self, url: str, data: dict[str, Any]):
+        start = time.perf_counter()
+        outcome = "error"
         jwt_token = self._generate_jwt(data)
         headers = {"Authorization": f"Bearer {jwt_token}"}
         async with httpx.AsyncClient(timeout=10) as client:
             try:
                 response = await client.post(url, json=data, headers=headers)
                 response.raise_for_status()
+                outcome = "ok"
                 logger.info(f"Push-notification sent for URL: {url}")
             except Exception as e:
                 logger.warning(
                     f"Error during sending push-notification for URL {url}: {e}"
                 )
+        PUSH_NOTIFICATION_LATENCY.observe(time.perf_counter() - start, outcome)
 
 
 class PushNotificationReceiverAuth(PushNotificationAuth):
@@ -0,0 +1,240 @@
+"""Exchange-rate cache for the MCP server.
+
+Upstream rate APIs return whole tables, one per ``(base, date)``. The cache
+merges them into one RateEngine row per date (see rate_engine.py). A pair is
+answered locally if any cached table of that date quotes both currencies,
+whether as a direct, inverse or cross rate; all three are the same single
+division. Otherwise the ``currency_from`` table is fetched, shared by all
+concurrent lookups that need it.
+
+Rows for past dates never change, so they are only evicted when the cache
+is full (least recently used first). Each table behind a row keeps its own
+expiry: tables for "latest" and today expire ``latest_ttl`` seconds after
+they were fetched, and the row is rebuilt from the tables that remain. So do
+provisional tables, i.e. stand-in data returned because the source had
+nothing for the date; a real table for that date replaces them.
+
+A cached table is also a negative answer: a pair its base does not quote is
+a settled miss until the table expires, not a reason to fetch it again.
+
+The cache is shared by the tool calls of several threads and event loops,
+so the rows, tables and stats are only touched under ``_lock``; fetches run
+outside it.
+"""
+
+import asyncio
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Sequence
+
+import numpy as np
+
+from rate_engine import RateEngine
+
+
+class RateTable(dict):
+    """A table returned by ``fetch_rates``; plain dicts count as real data."""
+
+    def __init__(self, rates: dict[str, float], provisional: bool = False):
+        super().__init__(rates)
+        self.provisional = provisional
+
+
+FetchRates = Callable[[str, str], Awaitable[dict[str, float]]]
+
+
+def _is_historical(date: str) -> bool:
+    try:
+        return datetime.date.fromisoformat(date) < datetime.datetime.now(datetime.timezone.utc).date()
+    except ValueError:
+        return False
+
+
+class _Fetched:
+    __slots__ = ("rates", "expires", "provisional")
+
+    def __init__(self, rates: dict[str, float], expires: float, provisional: bool):
+        self.rates = rates
+        self.expires = expires
+        self.provisional = provisional
+
+
+class ExchangeRateCache:
+    def __init__(
+        self,
+        fetch_rates: FetchRates,
+        latest_ttl: float = 300.0,
+        max_dates: int = 10000,
+    ):
+        self.fetch_rates = fetch_rates
+        self.latest_ttl = latest_ttl
+        self.max_dates = max_dates
+        self.engine = RateEngine()
+        self.stats = {"hits": 0, "misses": 0, "fetches": 0, "coalesced": 0}
+        # The tables behind each date's row, in fetch order.
+        self._dates: OrderedDict[str, dict[str, _Fetched]] = OrderedDict()
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, date: str) -> Optional[dict[str, _Fetched]]:
+        """The unexpired tables for ``date``, rebuilding its row if some expired."""
+        tables = self._dates.get(date)
+        if tables is None:
+            return None
+        now = time.monotonic()
+        expired = [base for base, table in tables.items() if table.expires <= now]
+        if expired:
+            for base in expired:
+                del tables[base]
+            if not tables:
+                self._drop(date)
+                return None
+            self._rebuild(date, tables)
+        self._dates.move_to_end(date)
+        return tables
+
+    def _rebuild(self, date: str, tables: dict[str, _Fetched]):
+        self.engine.drop(date)
+        for base, table in tables.items():
+            self.engine.update(date, base, table.rates)
+
+    def _drop(self, date: str):
+        self._dates.pop(date, None)
+        self.engine.drop(date)
+
+    def _store(self, base: str, date: str, rates: dict[str, float]):
+        provisional = getattr(rates, "provisional", False)
+        tables = self._live(date)
+        if tables is None:
+            tables = self._dates[date] = {}
+        # A re-fetched table replaces the old one rather than only filling its gaps.
+        rebuild = base in tables
+        if not provisional and any(table.provisional for table in tables.values()):
+            # Real quotes replace the stand-in data too.
+            for stale in [b for b, table in tables.items() if table.provisional]:
+                del tables[stale]
+            rebuild = True
+        ttl = float("inf") if _is_historical(date) and not provisional else self.latest_ttl
+        tables[base] = _Fetched(rates, time.monotonic() + ttl, provisional)
+        if rebuild:
+            self._rebuild(date, tables)
+        else:
+            self.engine.update(date, base, rates)
+        while len(self._dates) > self.max_dates:
+            self._drop(next(iter(self._dates)))
+
+    def _settled(self, base: str, date: str) -> bool:
+        """Whether the live ``base`` table is cached, so pairs it lacks are known misses."""
+        with self._lock:
+            tables = self._live(date)
+            settled = tables is not None and base in tables
+            if settled:
+                self.stats["misses"] += 1
+            return settled
+
+    def cached_rate(self, currency_from: str, currency_to: str, date: str) -> Optional[float]:
+        """Returns the rate if it can be derived from cached tables, without fetching."""
+        with self._lock:
+            if self._live(date) is None:
+                return None
+            rate = self.engine.rate(currency_from, currency_to, date)
+            if rate is not None:
+                self.stats["hits"] += 1
+            return rate
+
+    async def _fetch(self, base: str, date: str) -> dict[str, float]:
+        key = (base, date)
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        # In-process stubs call the tool from several event loops; only share within one.
+        if future is not None and future.get_loop() is loop:
+            with self._lock:
+                self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+        future = self._inflight[key] = loop.create_future()
+        try:
+            with self._lock:
+                self.stats["fetches"] += 1
+            rates = await self.fetch_rates(base, date)
+            with self._lock:
+                self._store(base, date, rates)
+            future.set_result(rates)
+            return rates
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved, in case no other caller was waiting.
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def get_rate(self, currency_from: str, currency_to: str, date: str) -> Optional[float]:
+        if currency_from == currency_to:
+            return 1.0
+        rate = self.cached_rate(currency_from, currency_to, date)
+        if rate is not None:
+            return rate
+        if self._settled(currency_from, date):
+            return None
+        rates = await self._fetch(currency_from, date)
+        rate = rates.get(currency_to)
+        if rate is None:
+            # Other cached tables of the date may still link the pair.
+            with self._lock:
+                rate = self.engine.rate(currency_from, currency_to, date)
+        return rate
+
+    async def get_rates(
+        self, currencies_from: Sequence[str], currencies_to: Sequence[str], date: str
+    ) -> np.ndarray:
+        """Rates for many pairs at once; NaN where no table has one.
+
+        Fetches only the tables the cached row cannot answer from, and never
+        a table that is already cached. One table usually covers many pairs,
+        so it fetches one base at a time and looks again before fetching the
+        next.
+        """
+        same = np.fromiter(
+            (a == b for a, b in zip(currencies_from, currencies_to)),
+            dtype=bool,
+            count=len(currencies_from),
+        )
+        tried: set[str] = set()
+        while True:
+            with self._lock:
+                tables = self._live(date) or {}
+                if tables:
+                    rates = self.engine.rates(currencies_from, currencies_to, date)
+                else:
+                    rates = np.full(len(currencies_from), np.nan)
+                cached = set(tables)
+            rates[same] = 1.0
+            unknown = np.isnan(rates)
+            missing = (currencies_from[i] for i in np.flatnonzero(unknown))
+            base = next(
+                (currency for currency in missing if currency not in tried and currency not in cached),
+                None,
+            )
+            if base is None:
+                misses = int(np.count_nonzero(unknown))
+                with self._lock:
+                    self.stats["hits"] += len(rates) - misses
+                    self.stats["misses"] += misses
+                return rates
+            tried.add(base)
+            try:
+                await self._fetch(base, date)
+            except Exception:
+                # Leave the pairs of this base as NaN; the others may still resolve.
+                continue
+
+    def clear(self):
+        with self._lock:
+            for date in list(self._dates):
+                self._drop(date)
@@ -0,0 +1,133 @@
+"""Dense cross-rate matrix for the MCP server.
+
+Each date is a row of a float64 matrix with one column per currency. A row
+holds how many units of each currency one unit of the row's base buys; which
+currency is the base does not matter. The rate from ``a`` to ``b`` is
+``row[b] / row[a]``, so any cross rate is a single division and a batch of
+conversions is one gather plus one divide. Unknown quotes are NaN.
+
+Tables fetched for different bases on the same date are merged into the row
+by rescaling them through a currency both quote, the table's base if the row
+has it. The newer table wins: its quotes replace the row's, while the row's
+other currencies keep their rates to that shared currency. A table that
+shares no currency with the date's rows cannot be put on their scale; it
+starts another row for the date, and is folded in once a later table links
+the two.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class RateEngine:
+    def __init__(self, row_capacity: int = 64, column_capacity: int = 64):
+        self._columns: dict[str, int] = {}
+        self._rows: dict[str, list[int]] = {}
+        self._free_rows: list[int] = []
+        self._used_rows = 0
+        self._matrix = np.full((row_capacity, column_capacity), np.nan)
+
+    @property
+    def currencies(self) -> list[str]:
+        return list(self._columns)
+
+    def _column(self, currency: str) -> int:
+        column = self._columns.get(currency)
+        if column is None:
+            column = self._columns[currency] = len(self._columns)
+            if column >= self._matrix.shape[1]:
+                grown = np.full((self._matrix.shape[0], self._matrix.shape[1] * 2), np.nan)
+                grown[:, : self._matrix.shape[1]] = self._matrix
+                self._matrix = grown
+        return column
+
+    def _new_row(self, date: str) -> int:
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = self._used_rows
+            self._used_rows += 1
+            if row >= self._matrix.shape[0]:
+                grown = np.full((self._matrix.shape[0] * 2, self._matrix.shape[1]), np.nan)
+                grown[: self._matrix.shape[0]] = self._matrix
+                self._matrix = grown
+        self._rows.setdefault(date, []).append(row)
+        return row
+
+    def _free_row(self, date: str, row: int):
+        self._rows[date].remove(row)
+        self._matrix[row] = np.nan
+        self._free_rows.append(row)
+
+    def update(self, date: str, base: str, rates: dict[str, float]):
+        """Merges a table of ``base -> currency`` rates into the rows for ``date``."""
+        if not rates:
+            return
+        columns = np.fromiter(
+            (self._column(c) for c in (base, *rates)), dtype=np.intp, count=len(rates) + 1
+        )
+        values = np.fromiter((1.0, *rates.values()), dtype=np.float64, count=len(rates) + 1)
+        target = None
+        for row in list(self._rows.get(date, ())):
+            existing = self._matrix[row, columns]
+            known = ~np.isnan(existing)
+            if not known.any():
+                continue
+            shared = np.flatnonzero(known)[0]
+            if target is None:
+                # Express the table in this row's scale; its quotes are the fresher ones.
+                target = row
+                values *= existing[shared] / values[shared]
+                self._matrix[row, columns] = values
+            else:
+                # The table links this row to the target; fold it in, keeping the target's quotes.
+                other = self._matrix[row] * (values[shared] / existing[shared])
+                merged = self._matrix[target]
+                gaps = np.isnan(merged)
+                merged[gaps] = other[gaps]
+                self._free_row(date, row)
+        if target is None:
+            row = self._new_row(date)
+            self._matrix[row, columns] = values
+
+    def drop(self, date: str):
+        for row in self._rows.pop(date, ()):
+            self._matrix[row] = np.nan
+            self._free_rows.append(row)
+
+    def has_date(self, date: str) -> bool:
+        return date in self._rows
+
+    def rate(self, currency_from: str, currency_to: str, date: str) -> Optional[float]:
+        column_from = self._columns.get(currency_from)
+        column_to = self._columns.get(currency_to)
+        if column_from is None or column_to is None:
+            return None
+        for row in self._rows.get(date, ()):
+            rate = self._matrix[row, column_to] / self._matrix[row, column_from]
+            if not np.isnan(rate):
+                return float(rate)
+        return None
+
+    def rates(
+        self, currencies_from: Sequence[str], currencies_to: Sequence[str], date: str
+    ) -> np.ndarray:
+        """Rates for many pairs at once; NaN where a pair cannot be derived."""
+        result = np.full(len(currencies_from), np.nan)
+        rows = self._rows.get(date)
+        if not rows:
+            return result
+        # Unknown currencies map to an all-NaN column past the known ones.
+        missing = len(self._columns)
+        index_from = np.fromiter(
+            (self._columns.get(c, missing) for c in currencies_from), dtype=np.intp
+        )
+        index_to = np.fromiter((self._columns.get(c, missing) for c in currencies_to), dtype=np.intp)
+        for row in rows:
+            quotes = np.append(self._matrix[row, :missing], np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rates = quotes[index_to] / quotes[index_from]
+            gaps = np.isnan(result)
+            result[gaps] = rates[gaps]
+        return result
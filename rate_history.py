@@ -0,0 +1,269 @@
+"""Memory-mapped exchange-rate history for the MCP server.
+
+Each currency is one file of raw float32 values, ``<CURRENCY>.f32``, with one
+value per calendar day from the store's start date onwards. A value is how
+many units of the currency one unit of the store's base currency (default
+USD) bought that day. Days without a quote are NaN. A lookup by date is
+therefore a single offset, ``(date - start).days * 4``, into a memory-mapped
+file. Range queries slice the mapping, so only the pages of that period are
+read, never the whole history.
+
+meta.json next to the series records the base currency and start date.
+
+Import a CSV with a ``date`` column and one column per currency, or append a
+day:
+
+    python rate_history.py import rates.csv --dir rate_history
+    python rate_history.py append 2024-03-01 EUR=0.9231 GBP=0.7902
+"""
+
+import csv
+import datetime
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import click
+import numpy as np
+
+VALUE = np.dtype(np.float32)
+
+
+def default_directory() -> str:
+    """``A2A_RATE_HISTORY_DIR``, or rate_history/ next to this module."""
+    return os.getenv(
+        "A2A_RATE_HISTORY_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "rate_history"),
+    )
+
+
+class RateHistory:
+    def __init__(self, directory: str, base: str = "USD"):
+        self.directory = Path(directory)
+        self.base = base
+        self.start: Optional[datetime.date] = None
+        self._series: dict[str, np.memmap] = {}
+        self._lock = threading.Lock()
+        self._loaded()
+
+    def _loaded(self) -> bool:
+        """Whether the store exists, reading meta.json once another writer has created it."""
+        if self.start is not None:
+            return True
+        meta = self.directory / "meta.json"
+        if not meta.exists():
+            return False
+        with open(meta, encoding="utf-8") as f:
+            data = json.load(f)
+        self.base = data["base"]
+        self.start = datetime.date.fromisoformat(data["start"])
+        return True
+
+    def _path(self, currency: str) -> Path:
+        return self.directory / f"{currency}.f32"
+
+    def _index(self, date: str) -> int:
+        return (datetime.date.fromisoformat(date) - self.start).days
+
+    def _date(self, index: int) -> str:
+        return (self.start + datetime.timedelta(days=index)).isoformat()
+
+    @property
+    def currencies(self) -> list[str]:
+        if not self.directory.exists():
+            return []
+        return sorted({self.base, *(path.stem for path in self.directory.glob("*.f32"))})
+
+    def _open(self, currency: str, length: int) -> Optional[np.memmap]:
+        """The mapping for ``currency``, remapped if another writer grew the file past it."""
+        series = self._series.get(currency)
+        if series is not None and len(series) >= length:
+            return series
+        try:
+            size = self._path(currency).stat().st_size // VALUE.itemsize
+        except FileNotFoundError:
+            return None
+        if size == 0:
+            return None
+        if series is None or size > len(series):
+            series = self._series[currency] = np.memmap(
+                self._path(currency), dtype=VALUE, mode="r", shape=(size,)
+            )
+        return series
+
+    def _values(self, currency: str, lo: int, hi: int) -> np.ndarray:
+        """Values for days ``[lo, hi)``, NaN outside the stored range."""
+        if currency == self.base:
+            return np.ones(hi - lo, dtype=np.float64)
+        values = np.full(hi - lo, np.nan)
+        series = self._open(currency, hi)
+        if series is not None:
+            start, end = max(lo, 0), min(hi, len(series))
+            if end > start:
+                values[start - lo : end - lo] = series[start:end]
+        return values
+
+    def rate(self, currency_from: str, currency_to: str, date: str) -> Optional[float]:
+        if not self._loaded():
+            return None
+        try:
+            index = self._index(date)
+        except ValueError:
+            return None
+        if index < 0:
+            return None
+        rate = self._values(currency_to, index, index + 1)[0] / self._values(
+            currency_from, index, index + 1
+        )[0]
+        return None if np.isnan(rate) else float(rate)
+
+    def table(self, base: str, date: str) -> Optional[dict[str, float]]:
+        """All rates for ``base`` on ``date``, or None if the store has no quote for it."""
+        if not self._loaded():
+            return None
+        try:
+            index = self._index(date)
+        except ValueError:
+            return None
+        if index < 0:
+            return None
+        base_value = self._values(base, index, index + 1)[0]
+        if np.isnan(base_value):
+            return None
+        rates = {}
+        for currency in self.currencies:
+            value = self._values(currency, index, index + 1)[0]
+            if currency != base and not np.isnan(value):
+                rates[currency] = float(value / base_value)
+        return rates
+
+    def series(
+        self, currency_from: str, currency_to: str, start_date: str, end_date: str
+    ) -> tuple[int, np.ndarray]:
+        """Daily rates from ``start_date`` to ``end_date`` inclusive, with the index of the first day."""
+        if not self._loaded():
+            return 0, np.empty(0)
+        try:
+            lo = max(self._index(start_date), 0)
+            hi = self._index(end_date) + 1
+        except ValueError:
+            return 0, np.empty(0)
+        if hi <= lo:
+            return lo, np.empty(0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return lo, self._values(currency_to, lo, hi) / self._values(currency_from, lo, hi)
+
+    def stats(
+        self, currency_from: str, currency_to: str, start_date: str, end_date: str
+    ) -> Optional[dict]:
+        """Average, minimum and maximum over the days with a quote in the period."""
+        lo, rates = self.series(currency_from, currency_to, start_date, end_date)
+        quoted = np.flatnonzero(~np.isnan(rates))
+        if len(quoted) == 0:
+            return None
+        values = rates[quoted]
+        low, high = int(np.argmin(values)), int(np.argmax(values))
+        return {
+            "days": len(quoted),
+            "first_date": self._date(lo + int(quoted[0])),
+            "last_date": self._date(lo + int(quoted[-1])),
+            "average": float(values.mean()),
+            "min": float(values[low]),
+            "min_date": self._date(lo + int(quoted[low])),
+            "max": float(values[high]),
+            "max_date": self._date(lo + int(quoted[high])),
+        }
+
+    def _write_meta(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"base": self.base, "start": self.start.isoformat()}, f)
+
+    def _write(self, currency: str, indexes: np.ndarray, values: np.ndarray):
+        path = self._path(currency)
+        with open(path, "ab") as f:
+            size = f.tell() // VALUE.itemsize
+            length = int(indexes.max()) + 1
+            if length > size:
+                f.write(np.full(length - size, np.nan, dtype=VALUE).tobytes())
+        series = np.memmap(path, dtype=VALUE, mode="r+", shape=(max(size, length),))
+        series[indexes] = values
+        series.flush()
+        del series
+        self._series.pop(currency, None)
+
+    def extend(self, dates: list[str], tables: dict[str, list[float]]):
+        """Stores ``tables[currency][i]`` for ``dates[i]``; NaN entries are skipped.
+
+        Existing days are overwritten. Dates before the start of a non-empty
+        store are rejected, so the offsets of stored values never change.
+        """
+        if not dates:
+            return
+        with self._lock:
+            if not self._loaded():
+                self.start = min(datetime.date.fromisoformat(date) for date in dates)
+                self._write_meta()
+            indexes = np.fromiter((self._index(date) for date in dates), dtype=np.int64)
+            if indexes.min() < 0:
+                raise ValueError(f"Dates before {self.start} cannot be added to the history")
+            for currency, values in tables.items():
+                if currency == self.base:
+                    continue
+                values = np.asarray(values, dtype=VALUE)
+                quoted = ~np.isnan(values)
+                if quoted.any():
+                    self._write(currency, indexes[quoted], values[quoted])
+
+    def append(self, date: str, rates: dict[str, float]):
+        """Stores one day of ``base -> currency`` rates."""
+        self.extend([date], {currency: [rate] for currency, rate in rates.items()})
+
+    def load_csv(self, path: str):
+        """Imports a CSV with a ``date`` column and one rate column per currency."""
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        if not rows:
+            return
+        currencies = [name for name in rows[0] if name != "date"]
+        self.extend(
+            [row["date"] for row in rows],
+            {
+                currency.upper(): [float(row[currency]) if row[currency] else np.nan for row in rows]
+                for currency in currencies
+            },
+        )
+
+
+@click.group()
+def main():
+    pass
+
+
+@main.command("import")
+@click.argument("path")
+@click.option("--dir", "directory", default=default_directory)
+@click.option("--base", default="USD", help="Base currency of a new store.")
+def import_csv(path, directory, base):
+    history = RateHistory(directory, base=base)
+    history.load_csv(path)
+    click.echo(f"{directory}: {', '.join(history.currencies)} since {history.start}")
+
+
+@main.command()
+@click.argument("date")
+@click.argument("rates", nargs=-1, required=True)
+@click.option("--dir", "directory", default=default_directory)
+@click.option("--base", default="USD", help="Base currency of a new store.")
+def append(date, rates, directory, base):
+    """Appends RATES given as CURRENCY=VALUE for DATE."""
+    history = RateHistory(directory, base=base)
+    history.append(
+        date, {currency.upper(): float(value) for currency, value in (r.split("=", 1) for r in rates)}
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Opt-in exact-match cache for specialized agent answers.
+
+Enable with ``A2A_RESPONSE_CACHE=1``. Size and lifetime are set with
+``A2A_RESPONSE_CACHE_SIZE`` (entries, default 1024) and
+``A2A_RESPONSE_CACHE_TTL`` (seconds, default 3600). Only completed answers
+to the first turn of a session are cached. Follow-up turns depend on the
+conversation, so they always go to the model.
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any
+
+from metrics import REGISTRY
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "a2a_response_cache_requests_total",
+    "Response cache lookups, by agent and result (hit, semantic_hit, miss or bypass).",
+    ("agent", "result"),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    return _WHITESPACE.sub(" ", query).strip().casefold()
+
+
+def cache_namespace(agent_id: str, system_instruction: str) -> str:
+    """Scopes keys to an agent and its prompt, so prompt edits invalidate old answers."""
+    return f"{agent_id}:{zlib.crc32(system_instruction.encode()):08x}"
+
+
+class ResponseCache:
+    """LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        REGISTRY.register_collector(
+            "a2a_response_cache_entries",
+            "Entries in the agent response cache.",
+            lambda: [({}, len(self._entries))],
+        )
+
+    def get(self, namespace: str, query: str) -> Any | None:
+        key = (namespace, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, namespace: str, query: str, value: Any):
+        key = (namespace, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Returns the process-wide cache, or None when caching is disabled."""
+    global _cache
+    if os.getenv("A2A_RESPONSE_CACHE", "").lower() not in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                max_entries=int(os.getenv("A2A_RESPONSE_CACHE_SIZE", "1024")),
+                ttl=float(os.getenv("A2A_RESPONSE_CACHE_TTL", "3600")),
+            )
+        return _cache
@@ -0,0 +1,200 @@
+"""Near-duplicate response cache for specialized agents.
+
+Queries are embedded offline by hashing word unigrams and character 3- to
+5-grams into a fixed-size signed vector. No model download is needed, and
+embedding takes about 0.1 ms per query. Vectors live in one preallocated
+float32 matrix used as a ring buffer. A lookup is a single matrix-vector
+product masked to the agent's namespace and unexpired slots. At the default
+size of 2048 entries, the exact scan takes well under a millisecond, so an
+approximate index would add complexity without paying for itself (see
+bench_semantic_cache.py).
+
+A hit needs a cosine similarity of at least the threshold. Queries are
+embedded without filler words such as "please" or "can you", so padding does
+not lower the similarity of a true paraphrase, while a changed modifier
+("ascending" versus "descending", "Python" versus "Java") scores well below
+the default of 0.9. Similarity cannot see which amount or which direction
+was asked for: "convert 100 USD to EUR" and "convert 100 EUR to USD" embed
+identically. A hit therefore also needs the same numbers and currency codes
+in the same order as the cached query.
+
+Enable with ``A2A_SEMANTIC_CACHE=1``. Tune it with
+``A2A_SEMANTIC_CACHE_THRESHOLD`` (cosine similarity, default 0.9),
+``A2A_SEMANTIC_CACHE_SIZE`` (entries, default 2048) and
+``A2A_SEMANTIC_CACHE_TTL`` (seconds, default 3600).
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+from currency_fast_path import CURRENCY_CODES
+from metrics import REGISTRY
+from response_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+
+# Words that do not change what is being asked.
+FILLER_WORDS = frozenset(
+    """
+    a an the please pls kindly can could would will you me i my we our us
+    hey hi hello thanks thank just quickly briefly now
+    """.split()
+)
+
+
+# Currency codes that are also everyday words are not treated as codes.
+_WORD_CODES = {"ALL", "BAM", "BOB", "CUP", "GEL", "MAD", "PEN", "SOS", "TOP", "TRY"}
+_CODES = frozenset(code.lower() for code in CURRENCY_CODES - _WORD_CODES)
+_ANCHOR = re.compile(r"\d[\d,]*(?:\.\d+)?|\b[a-z]{3}\b")
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def content_words(text: str) -> tuple[str, ...]:
+    """The words that carry the query's meaning, in order, with plurals folded."""
+    return tuple(
+        _stem(word) for word in _TOKEN.findall(normalize_query(text)) if word not in FILLER_WORDS
+    )
+
+
+def anchors(text: str) -> tuple[str, ...]:
+    """The numbers and currency codes of a query, in order."""
+    found = []
+    for token in _ANCHOR.findall(normalize_query(text)):
+        if token[0].isdigit():
+            found.append(token.replace(",", ""))
+        elif token in _CODES:
+            found.append(token)
+    return tuple(found)
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 512, ngram_range: tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> Counter:
+        words = _TOKEN.findall(normalize_query(text))
+        features = Counter(f"w:{word}" for word in words)
+        low, high = self.ngram_range
+        for word in words:
+            padded = f" {word} "
+            for n in range(low, high + 1):
+                for i in range(len(padded) - n + 1):
+                    features[padded[i : i + n]] += 1
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            h = zlib.crc32(feature.encode())
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % self.dim] += sign * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_entries: int = 2048,
+        ttl: float = 3600.0,
+        embedder: HashingEmbedder | None = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder or HashingEmbedder()
+        self._vectors = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self._namespaces = np.full(max_entries, -1, dtype=np.int32)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._values: list[Any] = [None] * max_entries
+        self._anchors: list[tuple[str, ...] | None] = [None] * max_entries
+        self._namespace_ids: dict[str, int] = {}
+        self._next_slot = 0
+        self._lock = threading.Lock()
+        REGISTRY.register_collector(
+            "a2a_semantic_cache_entries",
+            "Live entries in the semantic response cache.",
+            lambda: [({}, int(np.count_nonzero(self._namespaces >= 0)))],
+        )
+
+    def lookup(self, namespace: str, query: str) -> tuple[Any, float] | None:
+        """Returns the closest cached value above the threshold with the same anchors."""
+        namespace_id = self._namespace_ids.get(namespace)
+        if namespace_id is None:
+            return None
+        vector = self.embedder.embed(" ".join(content_words(query)))
+        key = anchors(query)
+        with self._lock:
+            scores = self._vectors @ vector
+            live = (self._namespaces == namespace_id) & (self._expires > time.monotonic())
+            scores[~live] = -1.0
+            candidates = np.flatnonzero(scores >= self.threshold)
+            for slot in candidates[np.argsort(-scores[candidates])]:
+                if self._anchors[slot] == key:
+                    return self._values[slot], float(scores[slot])
+            return None
+
+    def get(self, namespace: str, query: str) -> Any | None:
+        match = self.lookup(namespace, query)
+        if match is None:
+            return None
+        logger.debug(f"Semantic cache hit for {namespace} (similarity {match[1]:.3f})")
+        return match[0]
+
+    def put(self, namespace: str, query: str, value: Any):
+        vector = self.embedder.embed(" ".join(content_words(query)))
+        key = anchors(query)
+        with self._lock:
+            namespace_id = self._namespace_ids.setdefault(namespace, len(self._namespace_ids))
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.max_entries
+            self._vectors[slot] = vector
+            self._namespaces[slot] = namespace_id
+            self._expires[slot] = time.monotonic() + self.ttl
+            self._values[slot] = value
+            self._anchors[slot] = key
+
+    def clear(self):
+        with self._lock:
+            self._namespaces[:] = -1
+            self._expires[:] = 0.0
+            self._values = [None] * self.max_entries
+            self._anchors = [None] * self.max_entries
+            self._next_slot = 0
+
+
+_cache: SemanticCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache | None:
+    """Returns the process-wide cache, or None when it is disabled."""
+    global _cache
+    if os.getenv("A2A_SEMANTIC_CACHE", "").lower() not in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache(
+                threshold=float(os.getenv("A2A_SEMANTIC_CACHE_THRESHOLD", "0.9")),
+                max_entries=int(os.getenv("A2A_SEMANTIC_CACHE_SIZE", "2048")),
+                ttl=float(os.getenv("A2A_SEMANTIC_CACHE_TTL", "3600")),
+            )
+        return _cache
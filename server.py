@@ -1,15 +1,20 @@
+import asyncio
+import hashlib
+import hmac
 import json
 import logging
-from typing import Any, AsyncIterable, Union
+import time
+from typing import Any, AsyncIterable, Mapping, Union
 
+import orjson
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from pydantic import ValidationError
 from sse_starlette.sse import EventSourceResponse
 
 from abc_task_manager import TaskManager
+from admission import AdmissionController, AdmissionRejected, AdmissionTicket
 from custom_types import (
-    A2ARequest,
     AgentCard,
     CancelTaskRequest,
     GetTaskPushNotificationRequest,
@@ -17,15 +22,43 @@ from custom_types import (
     InternalError,
     InvalidRequestError,
     JSONParseError,
+    JSONRPCError,
+    JSONRPCRequest,
     JSONRPCResponse,
+    MethodNotFoundError,
     SendTaskRequest,
     SendTaskStreamingRequest,
+    ServerOverloadedError,
     SetTaskPushNotificationRequest,
     TaskResubscriptionRequest,
 )
+from loop_monitor import LoopLagMonitor
+from metrics import CONTENT_TYPE, REGISTRY, REQUEST_LATENCY, REQUESTS
+from profiler import MAX_PROFILE_SECONDS, profile
+from tracing import TRACER, extract
 
 logger = logging.getLogger(__name__)
 
+# JSON-RPC method -> (request model, TaskManager coroutine name)
+METHOD_HANDLERS: dict[str, tuple[type[JSONRPCRequest], str]] = {
+    "tasks/get": (GetTaskRequest, "on_get_task"),
+    "tasks/send": (SendTaskRequest, "on_send_task"),
+    "tasks/sendSubscribe": (SendTaskStreamingRequest, "on_send_task_subscribe"),
+    "tasks/cancel": (CancelTaskRequest, "on_cancel_task"),
+    "tasks/pushNotification/set": (
+        SetTaskPushNotificationRequest,
+        "on_set_task_push_notification",
+    ),
+    "tasks/pushNotification/get": (
+        GetTaskPushNotificationRequest,
+        "on_get_task_push_notification",
+    ),
+    "tasks/resubscribe": (TaskResubscriptionRequest, "on_resubscribe_to_task"),
+}
+
+# Methods answered with an SSE stream; these cannot be part of a batch.
+STREAMING_METHODS = frozenset({"tasks/sendSubscribe", "tasks/resubscribe"})
+
 
 class A2AServer:
     def __init__(
@@ -35,11 +68,24 @@ class A2AServer:
         endpoint: str = "/",
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        agent_card_max_age: int = 300,
+        batch_concurrency: int = 16,
+        max_batch_size: int = 1000,
+        admission: AdmissionController | None = None,
+        loop_monitor: LoopLagMonitor | None = None,
+        admin_token: str | None = None,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.task_manager = task_manager
+        self.agent_card_max_age = agent_card_max_age
+        self.batch_concurrency = batch_concurrency
+        self.max_batch_size = max_batch_size
+        self.admission = admission
+        self.loop_monitor = loop_monitor or LoopLagMonitor()
+        self.admin_token = admin_token
+        self._profile_lock = asyncio.Lock()
         self.agent_card = agent_card
 
         # Erstelle eine FastAPI-App für automatische Dokumentation (/docs, /redoc, etc.)
@@ -57,6 +103,44 @@ class A2AServer:
             methods=["GET"],
             response_model=None,
         )
+        self.app.add_api_route("/metrics", self._get_metrics, methods=["GET"])
+        self.app.add_event_handler("startup", self.loop_monitor.start)
+        if self.admin_token:
+            # Admin-Endpunkte nur mit konfiguriertem Token
+            self.app.add_api_route(
+                "/admin/profile", self._get_profile, methods=["GET"]
+            )
+        self.app.add_event_handler("shutdown", self.loop_monitor.stop)
+        if self.admission is not None:
+            self.app.add_api_route(
+                "/admission", self._get_admission_stats, methods=["GET"]
+            )
+            self._register_admission_metrics()
+
+    @property
+    def agent_card(self) -> AgentCard:
+        return self._agent_card
+
+    @agent_card.setter
+    def agent_card(self, agent_card: AgentCard):
+        self._agent_card = agent_card
+        self.refresh_agent_card()
+
+    def refresh_agent_card(self):
+        """Re-serializes the AgentCard.
+
+        Called automatically when the card is replaced; call it explicitly after
+        mutating the current card in place.
+        """
+        if self._agent_card is None:
+            self._agent_card_payload = None
+            self._agent_card_etag = None
+            return
+        self._agent_card_payload = self._agent_card.model_dump_json(
+            exclude_none=True
+        ).encode()
+        digest = hashlib.sha256(self._agent_card_payload).hexdigest()
+        self._agent_card_etag = f'"{digest[:32]}"'
 
     def start(self):
         if self.agent_card is None:
@@ -67,61 +151,276 @@ class A2AServer:
 
         uvicorn.run(self.app, host=self.host, port=self.port)
 
-    async def _get_agent_card(self, request: Request) -> JSONResponse:
-        # Liefert die AgentCard als JSON zurück.
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    def _register_admission_metrics(self):
+        admission = self.admission
+        REGISTRY.register_collector(
+            "a2a_admission_active",
+            "Requests currently holding a global admission slot.",
+            lambda: [({}, admission.stats()["active"])],
+        )
+        REGISTRY.register_collector(
+            "a2a_admission_queue_depth",
+            "Requests waiting for an admission slot, by method.",
+            lambda: [
+                ({"method": method}, stats["queue_depth"])
+                for method, stats in admission.stats()["methods"].items()
+            ],
+        )
+        REGISTRY.register_collector(
+            "a2a_admission_shed_total",
+            "Requests shed by admission control, by saturated scope.",
+            lambda: [({"scope": scope}, count) for scope, count in admission.shed.items()],
+            kind="counter",
+        )
+
+    async def _get_metrics(self, request: Request) -> PlainTextResponse:
+        return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    def _is_admin(self, request: Request) -> bool:
+        auth_header = request.headers.get("authorization", "")
+        token = auth_header[len("Bearer ") :] if auth_header.startswith("Bearer ") else ""
+        return bool(token) and hmac.compare_digest(token, self.admin_token)
+
+    async def _get_profile(self, request: Request) -> Response:
+        """Samples the live process and returns collapsed stacks for flamegraphs.
+
+        Query parameters: ``seconds`` (default 10), ``interval_ms`` (default 5)
+        and ``mode`` (``all``, ``threads`` or ``tasks``).
+        """
+        if not self._is_admin(request):
+            return JSONResponse({"error": "unauthorized"}, status_code=401)
+        try:
+            seconds = float(request.query_params.get("seconds", 10))
+            interval = float(request.query_params.get("interval_ms", 5)) / 1000
+        except ValueError:
+            return JSONResponse({"error": "invalid parameters"}, status_code=400)
+        mode = request.query_params.get("mode", "all")
+        if mode not in ("all", "threads", "tasks"):
+            return JSONResponse({"error": f"invalid mode: {mode}"}, status_code=400)
+        if not 0 < seconds <= MAX_PROFILE_SECONDS or interval <= 0:
+            return JSONResponse({"error": "invalid parameters"}, status_code=400)
+        if self._profile_lock.locked():
+            return JSONResponse({"error": "profile already running"}, status_code=409)
+
+        async with self._profile_lock:
+            collapsed = await profile(
+                seconds,
+                interval,
+                include_threads=mode in ("all", "threads"),
+                include_tasks=mode in ("all", "tasks"),
+            )
+        return PlainTextResponse(
+            collapsed,
+            headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'},
+        )
+
+    async def _get_admission_stats(self, request: Request) -> JSONResponse:
+        return JSONResponse(self.admission.stats())
+
+    async def _get_agent_card(self, request: Request) -> Response:
+        # Liefert die vorab serialisierte AgentCard zurück, inkl. ETag/304.
+        headers = {
+            "ETag": self._agent_card_etag,
+            "Cache-Control": f"public, max-age={self.agent_card_max_age}",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and self._etag_matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=self._agent_card_payload,
+            media_type="application/json",
+            headers=headers,
+        )
+
+    def _etag_matches(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == self._agent_card_etag:
+                return True
+        return False
 
     async def _process_request(
         self, request: Request
-    ) -> Union[JSONResponse, EventSourceResponse]:
+    ) -> Union[Response, EventSourceResponse]:
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
-
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.on_send_task_subscribe(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.on_cancel_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.on_set_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.on_get_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.on_resubscribe_to_task(
-                    json_rpc_request
-                )
-            else:
-                logger.warning(f"Unexpected request type: {type(json_rpc_request)}")
-                raise ValueError(f"Unexpected request type: {type(json_rpc_request)}")
+            raw_body = await request.body()
+            body = orjson.loads(raw_body)
+            if isinstance(body, list):
+                return await self._process_batch(body, request.headers)
+            if not isinstance(body, dict):
+                return self._create_error_response(None, InvalidRequestError())
 
+            result = await self._dispatch(body, raw_body, request.headers)
+            if isinstance(result, JSONRPCError):
+                return self._create_error_response(body.get("id"), result)
             return self._create_response(result)
 
+        except AdmissionRejected as e:
+            return self._create_overloaded_response(body.get("id"), e)
         except Exception as e:
             return self._handle_exception(e)
 
-    def _handle_exception(self, e: Exception) -> JSONResponse:
+    async def _dispatch(
+        self,
+        body: dict[str, Any],
+        raw_body: bytes | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> Any:
+        """Validates a single JSON-RPC call and runs its TaskManager handler.
+
+        Returns the handler result, or a JSONRPCError if the method is unknown.
+        Raises AdmissionRejected when the admission controller sheds the call.
+        """
+        method = body.get("method")
+        if not isinstance(method, str) or method not in METHOD_HANDLERS:
+            REQUESTS.inc("unknown", "method_not_found")
+            return MethodNotFoundError()
+
+        params = body.get("params")
+        metadata = params.get("metadata") if isinstance(params, dict) else None
+        parent = extract(headers, metadata if isinstance(metadata, dict) else None)
+
+        start = time.perf_counter()
+        outcome = "exception"
+        with TRACER.span(
+            f"a2a.server {method}", parent=parent, attributes={"rpc.method": method}
+        ) as span:
+            try:
+                result = await self._run_handler(method, body, raw_body)
+                outcome = "error" if getattr(result, "error", None) else "ok"
+                return result
+            except AdmissionRejected:
+                outcome = "shed"
+                raise
+            finally:
+                span.set_attribute("rpc.outcome", outcome)
+                REQUEST_LATENCY.observe(time.perf_counter() - start, method)
+                REQUESTS.inc(method, outcome)
+
+    async def _run_handler(
+        self, method: str, body: dict[str, Any], raw_body: bytes | None
+    ) -> Any:
+        request_model, handler_name = METHOD_HANDLERS[method]
+        if raw_body is not None:
+            json_rpc_request = request_model.model_validate_json(raw_body)
+        else:
+            json_rpc_request = request_model.model_validate(body)
+
+        handler = getattr(self.task_manager, handler_name)
+        if self.admission is None or not self.admission.applies_to(method):
+            return await handler(json_rpc_request)
+
+        session_id = getattr(json_rpc_request.params, "sessionId", None)
+        ticket = await self.admission.acquire(method, session_id)
+        try:
+            result = await handler(json_rpc_request)
+        except BaseException:
+            ticket.release()
+            raise
+        if isinstance(result, AsyncIterable):
+            # Streaming responses keep their slot until the stream is finished.
+            return self._release_after_stream(result, ticket)
+        ticket.release()
+        return result
+
+    async def _release_after_stream(
+        self, stream: AsyncIterable, ticket: AdmissionTicket
+    ) -> AsyncIterable:
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            ticket.release()
+
+    async def _process_batch(
+        self, batch: list[Any], headers: Mapping[str, str] | None = None
+    ) -> Response:
+        if not batch or len(batch) > self.max_batch_size:
+            return self._create_error_response(
+                None,
+                InvalidRequestError(
+                    message=f"Batch must contain 1 to {self.max_batch_size} requests"
+                ),
+            )
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run_one(item: Any) -> JSONRPCResponse:
+            if not isinstance(item, dict):
+                return JSONRPCResponse(id=None, error=InvalidRequestError())
+            request_id = item.get("id")
+            if not isinstance(request_id, (int, str)):
+                request_id = None
+            method = item.get("method")
+            if not isinstance(method, str):
+                return JSONRPCResponse(id=request_id, error=InvalidRequestError())
+            if method in STREAMING_METHODS:
+                return JSONRPCResponse(
+                    id=request_id,
+                    error=InvalidRequestError(
+                        message="Streaming methods are not supported in batch requests"
+                    ),
+                )
+            async with semaphore:
+                try:
+                    result = await self._dispatch(item, headers=headers)
+                except AdmissionRejected:
+                    return JSONRPCResponse(
+                        id=request_id, error=ServerOverloadedError()
+                    )
+                except Exception as e:
+                    return JSONRPCResponse(
+                        id=request_id, error=self._error_for_exception(e)
+                    )
+            if isinstance(result, JSONRPCError):
+                return JSONRPCResponse(id=request_id, error=result)
+            if not isinstance(result, JSONRPCResponse):
+                logger.error(f"Unexpected batch result type: {type(result)}")
+                return JSONRPCResponse(id=request_id, error=InternalError())
+            return result
+
+        responses = await asyncio.gather(*(run_one(item) for item in batch))
+        content = b"[" + b",".join(
+            response.model_dump_json(exclude_none=True).encode()
+            for response in responses
+        ) + b"]"
+        return Response(content=content, media_type="application/json")
+
+    def _error_for_exception(self, e: Exception) -> JSONRPCError:
         if isinstance(e, json.decoder.JSONDecodeError):
-            json_rpc_error = JSONParseError()
+            return JSONParseError()
         elif isinstance(e, ValidationError):
-            json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
+            return InvalidRequestError(data=json.loads(e.json()))
         else:
             logger.error(f"Unhandled exception: {e}")
-            json_rpc_error = InternalError()
+            return InternalError()
+
+    def _handle_exception(self, e: Exception) -> JSONResponse:
+        return self._create_error_response(None, self._error_for_exception(e))
 
-        response = JSONRPCResponse(id=None, error=json_rpc_error)
+    def _create_error_response(
+        self, request_id: int | str | None, error: JSONRPCError
+    ) -> JSONResponse:
+        response = JSONRPCResponse(id=request_id, error=error)
         return JSONResponse(response.model_dump(exclude_none=True), status_code=400)
 
-    def _create_response(self, result: Any) -> Union[JSONResponse, EventSourceResponse]:
+    def _create_overloaded_response(
+        self, request_id: int | str | None, rejection: AdmissionRejected
+    ) -> JSONResponse:
+        response = JSONRPCResponse(
+            id=request_id, error=ServerOverloadedError(data={"scope": rejection.scope})
+        )
+        return JSONResponse(
+            response.model_dump(exclude_none=True),
+            status_code=429,
+            headers={"Retry-After": str(max(1, round(rejection.retry_after)))},
+        )
+
+    def _create_response(self, result: Any) -> Union[Response, EventSourceResponse]:
         if isinstance(result, AsyncIterable):
 
             async def event_generator(
@@ -132,7 +431,10 @@ class A2AServer:
 
             return EventSourceResponse(event_generator(result))
         elif isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            return Response(
+                content=result.model_dump_json(exclude_none=True),
+                media_type="application/json",
+            )
         else:
             logger.error(f"Unexpected result type: {type(result)}")
             raise ValueError(f"Unexpected result type: {type(result)}")
\ No newline at end of file
@@ -2,40 +2,98 @@ import asyncio
 from typing import Any, AsyncIterable, Dict, Literal
 from SUPPORTED_CONTENT_TYPES import SUPPORTED_CONTENT_TYPES
 from langchain_core.messages import AIMessage, ToolMessage
-from langchain_groq import ChatGroq
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 from pydantic import BaseModel
 
-memory = MemorySaver()
+from agent_history import SessionHistoryMixin
+from checkpointer import agent_checkpointer
+from context_compaction import CompactedAgentState, get_context_compactor
+from model_provider import get_chat_model
+from response_cache import CACHE_REQUESTS, cache_namespace, get_response_cache
+from semantic_cache import get_semantic_cache
+from tracing import TRACING_CALLBACK
 
 class ResponseFormat(BaseModel):
     """Respond to the user in this format."""
     status: Literal["input_required", "completed", "error"] = "input_required"
     message: str
 
-class BaseAgent:
+class BaseAgent(SessionHistoryMixin):
+    response_format = ResponseFormat
+
     def __init__(self):
-        self.model = ChatGroq(model="meta-llama/llama-4-scout-17b-16e-instruct", max_tokens=2048)
+        self.model = get_chat_model(max_tokens=2048)
         self.graph = create_react_agent(
             self.model,
             tools=[],  # Each agent will define its own tools
-            checkpointer=memory,
+            checkpointer=agent_checkpointer(type(self).__name__),
             prompt=self.SYSTEM_INSTRUCTION,
             response_format=ResponseFormat,
+            pre_model_hook=get_context_compactor(self.model, type(self).__name__),
+            state_schema=CompactedAgentState,
         )
+        self.response_cache = get_response_cache()
+        self.semantic_cache = get_semantic_cache()
+        self.cache_namespace = cache_namespace(type(self).__name__, self.SYSTEM_INSTRUCTION)
+
+    def _lookup_cache(self, query, config):
+        """Returns (cached response, whether to store the fresh one)."""
+        if self.response_cache is None and self.semantic_cache is None:
+            return None, False
+        agent = type(self).__name__
+        if self.graph.get_state(config).values.get("messages"):
+            CACHE_REQUESTS.inc(agent, "bypass")
+            return None, False
+        response, result = None, "miss"
+        if self.response_cache is not None:
+            response, result = self.response_cache.get(self.cache_namespace, query), "hit"
+        if response is None and self.semantic_cache is not None:
+            response, result = self.semantic_cache.get(self.cache_namespace, query), "semantic_hit"
+        if response is None:
+            CACHE_REQUESTS.inc(agent, "miss")
+            return None, True
+        CACHE_REQUESTS.inc(agent, result)
+        # Keep the session history as if the model had answered, so follow-ups see it.
+        self.record_turn(query, config["configurable"]["thread_id"], response)
+        return response, False
+
+    def _store_in_cache(self, query, response):
+        if not response["is_task_complete"]:
+            return
+        if self.response_cache is not None:
+            self.response_cache.put(self.cache_namespace, query, response)
+        if self.semantic_cache is not None:
+            self.semantic_cache.put(self.cache_namespace, query, response)
 
     def invoke(self, query, sessionId) -> str:
-        config = {"configurable": {"thread_id": sessionId}}
-        self.graph.invoke({"messages": [("user", query)]}, config)
-        return self.get_agent_response(config)
+        config = {
+            "configurable": {"thread_id": sessionId},
+            "callbacks": [TRACING_CALLBACK],
+        }
+        cached, cacheable = self._lookup_cache(query, config)
+        if cached is not None:
+            return cached
+        state = self.graph.invoke({"messages": [("user", query)]}, config)
+        response = self._response_from_state(state)
+        if cacheable:
+            self._store_in_cache(query, response)
+        return response
 
     async def stream(self, query, sessionId) -> AsyncIterable[Dict[str, Any]]:
         inputs = {"messages": [("user", query)]}
-        config = {"configurable": {"thread_id": sessionId}}
+        config = {
+            "configurable": {"thread_id": sessionId},
+            "callbacks": [TRACING_CALLBACK],
+        }
+        # Reads and may write the checkpoint; keep it off the loop.
+        cached, cacheable = await asyncio.to_thread(self._lookup_cache, query, config)
+        if cached is not None:
+            yield cached
+            return
 
-        for item in self.graph.stream(inputs, config, stream_mode="values"):
-            message = item["messages"][-1]
+        state = {}
+        for state in self.graph.stream(inputs, config, stream_mode="values"):
+            message = state["messages"][-1]
             if (
                 isinstance(message, AIMessage)
                 and message.tool_calls
@@ -53,11 +111,17 @@ class BaseAgent:
                     "content": self.processing_message,
                 }
 
-        yield self.get_agent_response(config)
+        response = self._response_from_state(state)
+        if cacheable:
+            self._store_in_cache(query, response)
+        yield response
 
     def get_agent_response(self, config):
-        current_state = self.graph.get_state(config)
-        structured_response = current_state.values.get("structured_response")
+        """Reads the response back from the checkpoint, for inspection outside a run."""
+        return self._response_from_state(self.graph.get_state(config).values)
+
+    def _response_from_state(self, state):
+        structured_response = state.get("structured_response")
         if structured_response and isinstance(structured_response, ResponseFormat):
             if structured_response.status == "input_required":
                 return {
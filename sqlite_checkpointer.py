@@ -0,0 +1,96 @@
+"""SQLite-backed bounded checkpointer (requires langgraph-checkpoint-sqlite).
+
+It keeps the newest ``max_checkpoints_per_thread`` checkpoints of each
+thread and deletes threads idle for longer than ``session_ttl``. The idle
+clock survives restarts. SqliteSaver is synchronous only, which matches how
+the agents drive their graphs (``graph.invoke`` / ``graph.stream``).
+"""
+
+import logging
+import sqlite3
+import time
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from checkpointer import EVICTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedSqliteSaver(SqliteSaver):
+    def __init__(
+        self,
+        path: str,
+        max_checkpoints_per_thread: int = 3,
+        session_ttl: float = 3600.0,
+        sweep_interval: float = 60.0,
+    ):
+        super().__init__(sqlite3.connect(path, check_same_thread=False))
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.session_ttl = session_ttl
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS thread_activity_last_access
+                ON thread_activity (last_access);
+            """
+        )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        now = time.time()
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_activity (thread_id, last_access) VALUES (?, ?)",
+                (thread_id, now),
+            )
+            keep = (
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT ?"
+            )
+            cur.execute(
+                f"DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                f"AND checkpoint_id NOT IN ({keep})",
+                (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.max_checkpoints_per_thread),
+            )
+            if cur.rowcount:
+                cur.execute(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id "
+                    "NOT IN (SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?)",
+                    (thread_id, checkpoint_ns, thread_id, checkpoint_ns),
+                )
+            if now - self._last_sweep >= self.sweep_interval:
+                self._last_sweep = now
+                self._sweep(cur, now)
+        return result
+
+    def _sweep(self, cur: sqlite3.Cursor, now: float):
+        cutoff = now - self.session_ttl
+        cur.execute("SELECT thread_id FROM thread_activity WHERE last_access < ?", (cutoff,))
+        expired = [(row[0],) for row in cur.fetchall()]
+        if not expired:
+            return
+        for table in ("checkpoints", "writes", "thread_activity"):
+            cur.executemany(f"DELETE FROM {table} WHERE thread_id = ?", expired)
+        EVICTIONS.inc("ttl", amount=len(expired))
+        logger.info(f"Evicted {len(expired)} idle conversation threads")
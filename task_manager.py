@@ -1,7 +1,7 @@
 import asyncio
 import logging
 import traceback
-from typing import AsyncIterable, Union
+from typing import AsyncIterable, AsyncIterator, Callable, Union
 
 import utils as utils
 from abc_task_manager import InMemoryTaskManager
@@ -26,25 +26,191 @@ from custom_types import (
     TaskStatusUpdateEvent,
     TextPart,
 )
+from llm_scheduler import INTERACTIVE, llm_priority
+from metrics import REGISTRY
 from push_notification_auth import PushNotificationSenderAuth
+from response_cache import normalize_query
+from tracing import TRACER
 
 logger = logging.getLogger(__name__)
 
+COALESCED_REQUESTS = REGISTRY.counter(
+    "a2a_coalesced_requests_total",
+    "First-turn agent queries that started a run (leader) or joined one (follower).",
+    ("role",),
+)
+
+
+class _Flight:
+    """One agent run shared by identical first-turn queries that are in flight together."""
+
+    def __init__(self):
+        self.items: list[dict] = []
+        self.error: Exception | None = None
+        self.task: asyncio.Task | None = None
+        self._queues: list[asyncio.Queue] = []
+
+    def subscribe(self) -> asyncio.Queue:
+        # Replays what the run already produced, so late joiners see every event.
+        queue = asyncio.Queue()
+        for item in self.items:
+            queue.put_nowait(item)
+        self._queues.append(queue)
+        return queue
+
+    def publish(self, item: dict):
+        self.items.append(item)
+        for queue in self._queues:
+            queue.put_nowait(item)
+
+    def finish(self, error: Exception | None = None):
+        self.error = error
+        for queue in self._queues:
+            queue.put_nowait(None)
+
+    async def results(self, queue: asyncio.Queue) -> AsyncIterator[dict]:
+        while (item := await queue.get()) is not None:
+            yield item
+        if self.error is not None:
+            raise self.error
+
 
 class AgentTaskManager(InMemoryTaskManager):
     def __init__(
-        self, agent: CurrencyAgent, notification_sender_auth: PushNotificationSenderAuth
+        self,
+        agent: CurrencyAgent,
+        notification_sender_auth: PushNotificationSenderAuth,
+        coalesce_requests: bool = True,
     ):
         super().__init__()
         self.agent = agent
         self.notification_sender_auth = notification_sender_auth
+        self.coalesce_requests = coalesce_requests
+        self._flights: dict[str, _Flight] = {}
+
+    async def _has_history(self, query: str, session_id: str) -> bool:
+        """Whether the agent's checkpointer still holds the session's earlier turns."""
+        has_history = getattr(self.agent, "has_history", None)
+        if has_history is None:
+            return False
+        # A checkpoint read; keep it off the loop like agent.invoke.
+        return await asyncio.to_thread(has_history, query, session_id)
+
+    async def _coalescing_key(self, task_send_params: TaskSendParams) -> str | None:
+        """Returns the key under which identical first-turn queries share one run.
+
+        Must be called before the task is upserted. Queries with session
+        history depend on that history, so they never coalesce.
+        """
+        if not self.coalesce_requests or task_send_params.id in self.tasks:
+            return None
+        try:
+            query = self._get_user_query(task_send_params)
+        except ValueError:
+            return None
+        if await self._has_history(query, task_send_params.sessionId):
+            return None
+        return normalize_query(query)
+
+    def _join_flight(
+        self, key: str, start: Callable[[], AsyncIterable[dict]]
+    ) -> tuple[_Flight, asyncio.Queue, bool]:
+        flight = self._flights.get(key)
+        if flight is not None:
+            COALESCED_REQUESTS.inc("follower")
+            return flight, flight.subscribe(), False
+
+        flight = self._flights[key] = _Flight()
+        queue = flight.subscribe()
+        COALESCED_REQUESTS.inc("leader")
+        flight.task = asyncio.create_task(self._run_flight(key, flight, start()))
+        return flight, queue, True
+
+    async def _run_flight(self, key: str, flight: _Flight, items: AsyncIterable[dict]):
+        error = None
+        try:
+            async for item in items:
+                flight.publish(item)
+        except asyncio.CancelledError:
+            # Followers are not cancelled themselves; end their streams with an error.
+            error = RuntimeError("The shared agent run was cancelled")
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            self._flights.pop(key, None)
+            flight.finish(error)
+
+    async def _coalesced(
+        self,
+        key: str,
+        query: str,
+        session_id: str,
+        start: Callable[[], AsyncIterable[dict]],
+    ) -> AsyncIterator[dict]:
+        flight, queue, is_leader = self._join_flight(key, start)
+        last_item = None
+        async for item in flight.results(queue):
+            last_item = item
+            yield item
+        if not is_leader and last_item is not None:
+            await self._record_shared_turn(query, session_id, last_item)
+
+    async def _record_shared_turn(self, query: str, session_id: str, response: dict):
+        """Gives a follower's session the history its own run would have left."""
+        record_turn = getattr(self.agent, "record_turn", None)
+        if record_turn is None:
+            return
+        try:
+            # A checkpoint write; keep it off the loop like agent.invoke.
+            await asyncio.to_thread(record_turn, query, session_id, response)
+        except Exception as e:
+            logger.warning(f"Could not record shared turn for session {session_id}: {e}")
+
+    async def _agent_stream(
+        self, task_send_params: TaskSendParams, query: str, key: str | None
+    ) -> AsyncIterator[dict]:
+        session_id = task_send_params.sessionId
+        if key is None:
+            async for item in self.agent.stream(query, session_id):
+                yield item
+            return
+        async for item in self._coalesced(
+            key, query, session_id, lambda: self.agent.stream(query, session_id)
+        ):
+            yield item
 
-    async def _run_streaming_agent(self, request: SendTaskStreamingRequest):
+    async def _agent_invoke(
+        self, task_send_params: TaskSendParams, query: str, key: str | None
+    ) -> dict:
+        session_id = task_send_params.sessionId
+        if key is None:
+            return await asyncio.to_thread(self.agent.invoke, query, session_id)
+
+        async def _invoke():
+            yield await asyncio.to_thread(self.agent.invoke, query, session_id)
+
+        response = None
+        async for response in self._coalesced(key, query, session_id, _invoke):
+            pass
+        return response
+
+    async def _run_streaming_agent(
+        self, request: SendTaskStreamingRequest, key: str | None = None
+    ):
         task_send_params: TaskSendParams = request.params
+        with TRACER.span(
+            "task_manager.stream", attributes={"task.id": task_send_params.id}
+        ), llm_priority(INTERACTIVE):
+            await self._stream_agent_events(task_send_params, key)
+
+    async def _stream_agent_events(
+        self, task_send_params: TaskSendParams, key: str | None = None
+    ):
         query = self._get_user_query(task_send_params)
 
         try:
-            async for item in self.agent.stream(query, task_send_params.sessionId):
+            async for item in self._agent_stream(task_send_params, query, key):
                 is_task_complete = item["is_task_complete"]
                 require_user_input = item["require_user_input"]
                 artifact = None
@@ -139,6 +305,7 @@ class AgentTaskManager(InMemoryTaskManager):
                     ),
                 )
 
+        key = await self._coalescing_key(request.params)
         await self.upsert_task(request.params)
         task = await self.update_store(
             request.params.id, TaskStatus(state=TaskState.WORKING), None
@@ -148,7 +315,10 @@ class AgentTaskManager(InMemoryTaskManager):
         task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
         try:
-            agent_response = self.agent.invoke(query, task_send_params.sessionId)
+            with TRACER.span(
+                "task_manager.invoke", attributes={"task.id": task_send_params.id}
+            ):
+                agent_response = await self._agent_invoke(task_send_params, query, key)
         except Exception as e:
             logger.error(f"Error invoking agent: {e}")
             raise ValueError(f"Error invoking agent: {e}")
@@ -162,6 +332,7 @@ class AgentTaskManager(InMemoryTaskManager):
             if error:
                 return error
 
+            key = await self._coalescing_key(request.params)
             await self.upsert_task(request.params)
 
             if request.params.pushNotification:
@@ -178,7 +349,7 @@ class AgentTaskManager(InMemoryTaskManager):
             task_send_params: TaskSendParams = request.params
             sse_event_queue = await self.setup_sse_consumer(task_send_params.id, False)
 
-            asyncio.create_task(self._run_streaming_agent(request))
+            asyncio.create_task(self._run_streaming_agent(request, key))
 
             return self.dequeue_events_for_sse(
                 request.id, task_send_params.id, sse_event_queue
@@ -0,0 +1,31 @@
+import pytest
+from starlette.testclient import TestClient
+
+from bench_dispatch import NoOpTaskManager
+from server import A2AServer
+
+AUTH = {"Authorization": "Bearer secret"}
+
+
+@pytest.fixture
+def client():
+    server = A2AServer(task_manager=NoOpTaskManager(), admin_token="secret")
+    return TestClient(server.app)
+
+
+def test_requires_the_admin_token(client):
+    assert client.get("/admin/profile").status_code == 401
+
+
+@pytest.mark.parametrize(
+    "query", ["mode=stacks", "mode=", "seconds=0", "seconds=abc", "interval_ms=-1"]
+)
+def test_invalid_parameters_are_rejected(client, query):
+    response = client.get(f"/admin/profile?{query}", headers=AUTH)
+    assert response.status_code == 400
+
+
+def test_samples_the_requested_mode(client):
+    response = client.get("/admin/profile?seconds=0.05&mode=threads", headers=AUTH)
+    assert response.status_code == 200
+    assert response.text.startswith("thread:")
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+
+from admission import AdmissionController, AdmissionRejected
+from bench_dispatch import NoOpTaskManager
+from server import A2AServer
+
+
+def test_rejects_when_the_global_queue_is_full():
+    async def run():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.05)
+        ticket = await controller.acquire("tasks/send", "a")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("tasks/send", "b")
+        ticket.release()
+        await controller.acquire("tasks/send", "b")
+        return controller, rejected.value
+
+    controller, rejection = asyncio.run(run())
+    assert rejection.scope == "global"
+    assert controller.shed["global"] == 1
+    assert controller.admitted["tasks/send"] == 2
+
+
+def test_waiting_for_a_session_does_not_hold_a_global_slot():
+    async def run():
+        controller = AdmissionController(
+            max_concurrent=2, max_concurrent_per_session=1, queue_timeout=1.0
+        )
+        first = await controller.acquire("tasks/send", "busy")
+        waiting = asyncio.create_task(controller.acquire("tasks/send", "busy"))
+        await asyncio.sleep(0)
+        # Only the first request holds a global slot; another session gets the second.
+        other = await asyncio.wait_for(controller.acquire("tasks/send", "other"), 0.1)
+        active = controller.stats()["active"]
+        first.release()
+        second = await waiting
+        for ticket in (other, second):
+            ticket.release()
+        return active, controller.stats()
+
+    active, stats = asyncio.run(run())
+    assert active == 2
+    assert stats["active"] == 0
+    assert stats["sessions_active"] == 0
+
+
+@pytest.mark.parametrize("max_waiting, admitted", [(1, 2), (3, 4)])
+def test_per_session_queue_is_configurable(max_waiting, admitted):
+    async def run():
+        controller = AdmissionController(
+            max_concurrent_per_session=1,
+            max_waiting_per_session=max_waiting,
+            queue_timeout=0.05,
+        )
+
+        async def admit():
+            try:
+                ticket = await controller.acquire("tasks/send", "s")
+            except AdmissionRejected:
+                return False
+            await asyncio.sleep(0.01)
+            ticket.release()
+            return True
+
+        return sum(await asyncio.gather(*(admit() for _ in range(5)))), controller.shed
+
+    count, shed = asyncio.run(run())
+    assert count == admitted
+    assert shed["session"] == 5 - admitted
+
+
+def test_all_waits_share_one_timeout():
+    async def run():
+        controller = AdmissionController(
+            max_concurrent=2, max_concurrent_per_session=1, queue_timeout=0.1
+        )
+        held = await controller.acquire("tasks/send", "s")
+        await controller.acquire("tasks/send", "t")
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        waiting = asyncio.create_task(controller.acquire("tasks/send", "s"))
+        await asyncio.sleep(0.08)
+        # Frees the session slot, but another session takes the global one.
+        held.release()
+        await controller.acquire("tasks/send", "u")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await waiting
+        return rejected.value.scope, loop.time() - start
+
+    scope, elapsed = asyncio.run(run())
+    assert scope == "global"
+    assert elapsed < 0.15
+
+
+def test_shed_request_gets_429_with_retry_after():
+    server = A2AServer(
+        task_manager=NoOpTaskManager(),
+        admission=AdmissionController(max_concurrent=0, max_queue=0, retry_after=2.4),
+    )
+    body = {
+        "jsonrpc": "2.0",
+        "id": 7,
+        "method": "tasks/send",
+        "params": {
+            "id": "t1",
+            "sessionId": "s",
+            "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]},
+        },
+    }
+
+    response = TestClient(server.app).post("/", json=body)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert response.json()["id"] == 7
+    assert response.json()["error"]["data"] == {"scope": "global"}
+    assert server.admission.stats()["sessions_active"] == 0
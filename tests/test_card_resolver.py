@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+from card_resolver import AgentCardCache, AsyncA2ACardResolver
+
+
+def test_retry_registers_cards_on_the_owning_loop(tmp_path, monkeypatch):
+    resolver = AsyncA2ACardResolver(cache=AgentCardCache(tmp_path))
+    attempts = []
+
+    async def fetch_all(urls):
+        attempts.append(list(urls))
+        if len(attempts) == 1:
+            return {}, list(urls)
+        return {url: {"name": url} for url in urls}, []
+
+    monkeypatch.setattr(resolver, "fetch_all", fetch_all)
+
+    async def run():
+        resolved = []
+        task = resolver.retry_in_background(
+            ["http://a"],
+            lambda url, document: resolved.append((url, threading.current_thread())),
+            initial_delay=0.01,
+        )
+        await task
+        return resolved
+
+    assert asyncio.run(run()) == [("http://a", threading.main_thread())]
+    assert attempts == [["http://a"], ["http://a"]]
+
+
+def test_nothing_to_retry():
+    resolver = AsyncA2ACardResolver()
+    assert resolver.retry_in_background([], lambda url, document: None) is None
@@ -0,0 +1,30 @@
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+
+from cassette import Cassette, CassetteChatModel
+from fakes import FakeChatModel
+
+
+@tool
+def get_exchange_rate(currency_from: str, currency_to: str) -> str:
+    """Returns the exchange rate between two currencies."""
+    return f"1 {currency_from} = 0.9 {currency_to}"
+
+
+def test_record_then_replay_with_tools(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    query = [HumanMessage("convert 100 USD to EUR")]
+
+    recorder = Cassette(path, "record")
+    tools = recorder.record_tools([get_exchange_rate])
+    model = CassetteChatModel(cassette=recorder, inner=FakeChatModel())
+    recorded = model.bind_tools(tools).invoke(query)
+    result = tools[0].invoke({"currency_from": "USD", "currency_to": "EUR"})
+
+    player = Cassette(path, "replay", timing="fast")
+    replayed_tools = player.replay_tools()
+    replayed = CassetteChatModel(cassette=player).bind_tools(replayed_tools).invoke(query)
+
+    assert [t.name for t in replayed_tools] == ["get_exchange_rate"]
+    assert replayed.tool_calls == recorded.tool_calls
+    assert replayed_tools[0].invoke({"currency_from": "USD", "currency_to": "EUR"}) == result
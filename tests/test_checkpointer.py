@@ -0,0 +1,108 @@
+import operator
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from checkpointer import EVICTIONS, BoundedMemorySaver, NamespacedCheckpointer
+from sqlite_checkpointer import BoundedSqliteSaver
+
+
+class State(TypedDict):
+    turns: Annotated[list[str], operator.add]
+
+
+def _graph(checkpointer):
+    builder = StateGraph(State)
+    builder.add_node("answer", lambda state: {"turns": ["answer"]})
+    builder.add_edge(START, "answer")
+    builder.add_edge("answer", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _turn(graph, thread_id, text="question"):
+    return graph.invoke({"turns": [text]}, {"configurable": {"thread_id": thread_id}})
+
+
+def _turns(graph, thread_id):
+    return graph.get_state({"configurable": {"thread_id": thread_id}}).values.get("turns", [])
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def saver(request, tmp_path):
+    if request.param == "memory":
+        yield BoundedMemorySaver(max_checkpoints_per_thread=2, sweep_interval=0)
+        return
+    saver = BoundedSqliteSaver(
+        str(tmp_path / "checkpoints.sqlite"), max_checkpoints_per_thread=2, sweep_interval=0
+    )
+    yield saver
+    saver.conn.close()
+
+
+def test_keeps_only_the_newest_checkpoints_per_thread(saver):
+    graph = _graph(saver)
+    for _ in range(4):
+        _turn(graph, "t")
+
+    assert len(list(saver.list({"configurable": {"thread_id": "t"}}))) == 2
+    assert len(_turns(graph, "t")) == 8
+
+
+def test_idle_threads_are_evicted(saver):
+    graph = _graph(saver)
+    _turn(graph, "idle")
+    evicted = EVICTIONS.value("ttl")
+
+    saver.session_ttl = 0
+    _turn(graph, "active")
+
+    assert _turns(graph, "idle") == []
+    assert EVICTIONS.value("ttl") > evicted
+
+
+def test_namespaces_keep_separate_conversations(saver):
+    currency = _graph(NamespacedCheckpointer(saver, "currency"))
+    email = _graph(NamespacedCheckpointer(saver, "email"))
+    _turn(currency, "s", "convert")
+    _turn(currency, "s", "again")
+    _turn(email, "s", "write")
+
+    assert _turns(currency, "s") == ["convert", "answer", "again", "answer"]
+    assert _turns(email, "s") == ["write", "answer"]
+    assert _turns(_graph(saver), "s") == []
+
+    listed = list(NamespacedCheckpointer(saver, "email").list({"configurable": {"thread_id": "s"}}))
+    assert listed and all(item.config["configurable"]["thread_id"] == "s" for item in listed)
+
+
+def test_memory_budget_evicts_least_recently_used_threads():
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=1, sweep_interval=3600)
+    graph = _graph(saver)
+    _turn(graph, "a")
+    one_thread = saver.total_bytes
+    saver.max_bytes = int(one_thread * 2.5)
+    evicted = EVICTIONS.value("budget")
+
+    _turn(graph, "b")
+    _turn(graph, "a")
+    _turn(graph, "c")
+
+    assert list(saver._threads) == ["a", "c"]
+    assert _turns(graph, "b") == []
+    assert EVICTIONS.value("budget") == evicted + 1
+    assert saver.total_bytes == sum(usage.bytes for usage in saver._threads.values())
+    assert saver.total_bytes <= saver.max_bytes
+
+
+def test_pruned_checkpoints_release_their_bytes():
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=1)
+    graph = _graph(saver)
+    _turn(graph, "t")
+    _turn(graph, "t")
+    size = saver.total_bytes
+    _turn(graph, "t")
+
+    # Only the history in the newest checkpoint grows; old checkpoints are gone.
+    assert saver.total_bytes < size * 2
+    assert len(saver.storage["t"][""]) == 1
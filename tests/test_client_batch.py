@@ -0,0 +1,32 @@
+import asyncio
+
+import client
+from client import A2AClient
+from custom_types import GetTaskRequest, GetTaskResponse, SendTaskRequest, SendTaskResponse
+from tracing import TRACEPARENT, JsonLinesExporter, Tracer
+
+
+def test_batch_sends_copies_with_unique_ids(tmp_path, monkeypatch):
+    tracer = Tracer("test", JsonLinesExporter(str(tmp_path / "spans.jsonl")))
+    monkeypatch.setattr(client, "TRACER", tracer)
+    sent = []
+
+    async def send_payload(payload):
+        sent.extend(payload)
+        return [{"jsonrpc": "2.0", "id": item["id"], "result": None} for item in reversed(payload)]
+
+    a2a = A2AClient(url="http://agent")
+    monkeypatch.setattr(a2a, "_send_payload", send_payload)
+    send = SendTaskRequest(
+        id=1,
+        params={"id": "t1", "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]}},
+    )
+    get = GetTaskRequest(id=1, params={"id": "t1"})
+
+    responses = asyncio.run(a2a.batch([send, get]))
+
+    assert [type(r) for r in responses] == [SendTaskResponse, GetTaskResponse]
+    assert sent[0]["id"] == 1 and sent[1]["id"] != 1
+    assert TRACEPARENT in sent[0]["params"]["metadata"]
+    assert send.params.metadata is None
+    assert get.id == 1
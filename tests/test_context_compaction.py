@@ -0,0 +1,93 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from context_compaction import COMPACTIONS, ContextCompactor
+
+
+class FailingModel(FakeListChatModel):
+    def _call(self, *args, **kwargs):
+        raise RuntimeError("provider down")
+
+
+def _turn(i, tool_result="0.9"):
+    """A turn with a tool call, so compaction must keep call and result together."""
+    call_id = f"call-{i}"
+    return [
+        HumanMessage(f"question {i}", id=f"h{i}"),
+        AIMessage(
+            "",
+            id=f"a{i}",
+            tool_calls=[{"name": "get_exchange_rate", "args": {"turn": i}, "id": call_id}],
+        ),
+        ToolMessage(tool_result, tool_call_id=call_id, name="get_exchange_rate", id=f"t{i}"),
+        AIMessage(f"answer {i}", id=f"r{i}"),
+    ]
+
+
+def _history(turns, **kwargs):
+    return [message for i in range(turns) for message in _turn(i, **kwargs)]
+
+
+def _assert_tool_pairs_intact(messages):
+    called = {call["id"] for m in messages if isinstance(m, AIMessage) for call in m.tool_calls}
+    answered = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+    assert called == answered
+
+
+@pytest.fixture
+def compactor():
+    model = FakeListChatModel(responses=["the user asked about rates"])
+    return ContextCompactor(model, keep_turns=2, summary_batch=2, max_tokens=100000)
+
+
+def test_short_history_is_sent_as_is(compactor):
+    messages = _history(3)
+    assert compactor({"messages": messages}) == {"llm_input_messages": messages}
+
+
+def test_old_turns_are_folded_into_the_summary(compactor):
+    messages = _history(5)
+    update = compactor({"messages": messages})
+
+    removed = [m.id for m in update["messages"]]
+    assert removed == [m.id for m in messages[:12]]
+    assert update["context_summary"] == "the user asked about rates"
+    summary, *kept = update["llm_input_messages"]
+    assert isinstance(summary, SystemMessage) and "the user asked about rates" in summary.text()
+    assert kept == messages[12:]
+    assert isinstance(kept[0], HumanMessage)
+    _assert_tool_pairs_intact(kept)
+
+
+def test_budget_compacts_whole_turns_and_keeps_the_current_one(compactor):
+    compactor.max_tokens = 300
+    messages = _history(3, tool_result="x" * 2000)
+    update = compactor({"messages": messages})
+
+    kept = update["llm_input_messages"][1:]
+    # Over budget even alone, the current turn is still sent whole.
+    assert kept == messages[8:]
+    _assert_tool_pairs_intact(kept)
+    _assert_tool_pairs_intact([m for m in messages if m.id in {r.id for r in update["messages"]}])
+
+
+def test_leading_tool_exchange_without_a_user_message_stays_together(compactor):
+    messages = _turn(0)[1:] + _history(4)[4:]
+    update = compactor({"messages": messages})
+
+    kept = update["llm_input_messages"][1:]
+    assert isinstance(kept[0], HumanMessage)
+    _assert_tool_pairs_intact(kept)
+
+
+def test_failed_summary_falls_back_to_the_transcript():
+    compactor = ContextCompactor(
+        FailingModel(responses=[]), name="test", keep_turns=1, summary_batch=1
+    )
+    fallbacks = COMPACTIONS.value("test", "fallback")
+    update = compactor({"messages": _history(2), "context_summary": "earlier"})
+
+    assert update["context_summary"].startswith("earlier\nUser: question 0")
+    assert "get_exchange_rate({'turn': 0})" in update["context_summary"]
+    assert COMPACTIONS.value("test", "fallback") == fallbacks + 1
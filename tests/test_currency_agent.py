@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import mcp.types
+import pytest
+
+import agent
+from agent import CurrencyAgent
+from currency_fast_path import FAST_PATH_REQUESTS
+from mcp_pool import MCPSessionPool
+
+RESULT = json.dumps({"amount": 1.0, "base": "USD", "date": "2024-03-01", "rates": {"EUR": 0.9}})
+
+
+def _mcp_tool(name):
+    return mcp.types.Tool(
+        name=name,
+        description="Exchange rate lookup.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "currency_from": {"type": "string"},
+                "currency_to": {"type": "string"},
+                "currency_date": {"type": "string"},
+            },
+        },
+    )
+
+
+@pytest.fixture
+def pool():
+    pool = MCPSessionPool({"currency_server": {}})
+    yield pool
+    pool._loop.close()
+
+
+@pytest.fixture
+def tool_calls():
+    return []
+
+
+@pytest.fixture
+def currency_agent(monkeypatch, pool, tool_calls):
+    def call_tool(server, name, arguments):
+        tool_calls.append((name, arguments))
+        return RESULT, None
+
+    # The pooled tool as CurrencyAgent gets it, with the session call replaced.
+    monkeypatch.setattr(pool, "call_tool", call_tool)
+    tool = pool._as_langchain_tool("currency_server", _mcp_tool("get_exchange_rate"))
+    monkeypatch.setenv("A2A_MODEL_PROVIDER", "fake")
+    monkeypatch.setattr(agent, "get_mcp_tools", lambda fetch: [tool])
+    currency_agent = CurrencyAgent()
+
+    def graph_invoke(*args, **kwargs):
+        raise AssertionError("the fast path ran the graph")
+
+    monkeypatch.setattr(currency_agent.graph, "invoke", graph_invoke)
+    return currency_agent
+
+
+def test_sync_invoke_takes_the_fast_path(currency_agent, tool_calls):
+    hits = FAST_PATH_REQUESTS.value("hit")
+
+    response = currency_agent.invoke("convert 100 USD to EUR on 2024-03-01", "fast-sync")
+
+    assert response["is_task_complete"]
+    assert response["content"].startswith("100.00 USD = 90.00 EUR")
+    assert tool_calls == [
+        (
+            "get_exchange_rate",
+            {"currency_from": "USD", "currency_to": "EUR", "currency_date": "2024-03-01"},
+        )
+    ]
+    assert FAST_PATH_REQUESTS.value("hit") == hits + 1
+
+
+def test_fast_path_turn_is_kept_in_the_session_history(currency_agent):
+    currency_agent.invoke("USD/EUR rate", "fast-history")
+
+    values = currency_agent.graph.get_state({"configurable": {"thread_id": "fast-history"}}).values
+    assert [m.type for m in values["messages"]] == ["human", "ai"]
+    assert values["structured_response"].status == "completed"
+    assert currency_agent.get_agent_response(
+        {"configurable": {"thread_id": "fast-history"}}
+    )["content"].startswith("1 USD = 0.9 EUR")
+
+
+def test_tool_list_change_rebuilds_the_graph(monkeypatch, pool):
+    listed = [_mcp_tool("get_exchange_rate")]
+
+    async def list_tools(server, operation):
+        return mcp.types.ListToolsResult(tools=listed)
+
+    monkeypatch.setattr(pool, "_with_session", list_tools)
+    monkeypatch.setattr(pool, "start", lambda: None)
+    monkeypatch.setattr(agent, "get_mcp_pool", lambda servers: pool)
+    monkeypatch.setenv("A2A_MODEL_PROVIDER", "fake")
+    monkeypatch.delenv("A2A_MCP_STUB", raising=False)
+    monkeypatch.delenv("A2A_CASSETTE", raising=False)
+    asyncio.run(pool._refresh_tools("currency_server"))
+    currency_agent = CurrencyAgent()
+    graph = currency_agent.graph
+
+    listed.append(_mcp_tool("get_exchange_rate_average"))
+    asyncio.run(pool._refresh_tools("currency_server"))
+
+    assert currency_agent.graph is not graph
+    assert sorted(tool.name for tool in currency_agent.tools) == [
+        "get_exchange_rate",
+        "get_exchange_rate_average",
+    ]
+    assert currency_agent.fast_path
@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_scheduler import (
+    INTERACTIVE,
+    NORMAL,
+    RATE_LIMITED,
+    LLMScheduler,
+    ModelLimits,
+    TokenBucket,
+    _parse_duration,
+)
+
+
+@pytest.fixture
+def scheduler():
+    return LLMScheduler(default_limits=ModelLimits(60, 6000, max_concurrency=8))
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(per_minute=60)
+    start = bucket.updated
+    bucket.take(60)
+
+    assert bucket.wait_time(1, start) == pytest.approx(1.0)
+    assert bucket.wait_time(1, start + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, start + 1.0) == 0.0
+    # A request larger than the bucket waits for a full bucket, not forever.
+    assert bucket.wait_time(600, start + 1.0) == pytest.approx(59.0)
+
+
+def test_token_bucket_corrects_the_reservation():
+    bucket = TokenBucket(per_minute=600)
+    now = bucket.updated
+    bucket.take(500)
+    bucket.adjust(500 - 120)
+
+    assert bucket.wait_time(480, now) == 0.0
+    assert bucket.wait_time(481, now) > 0
+
+
+def test_token_bucket_follows_the_provider_headers():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    bucket.sync(remaining=10, reset_after=None, now=now)
+    assert bucket.wait_time(10, now) == 0.0
+    assert bucket.wait_time(11, now) > 0
+
+    bucket.sync(remaining=0, reset_after=7.5, now=now)
+    assert bucket.wait_time(1, now) == pytest.approx(7.5)
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("2m59.56s", 179.56), ("7.66s", 7.66), ("120ms", 0.12), ("1h", 3600), ("3", 3), ("", None)],
+)
+def test_parse_duration(value, seconds):
+    assert _parse_duration(value) == (pytest.approx(seconds) if seconds is not None else None)
+
+
+def test_concurrency_halves_on_429_and_grows_additively(scheduler):
+    state = scheduler._state("m")
+    scheduler.observe_response("m", 429, {})
+    scheduler.observe_response("m", 429, {})
+    assert state.concurrency == 2.0
+
+    state.requests.blocked_until = 0.0  # Skip the pause; only the limit matters here.
+    permit = scheduler.acquire("m", 1)
+    scheduler.release(permit, ok=True)
+    assert state.concurrency == pytest.approx(2.5)
+
+    for _ in range(5):
+        scheduler.observe_response("m", 429, {})
+    assert state.concurrency == 1.0
+
+    state.concurrency = 7.95
+    state.requests.blocked_until = 0.0
+    scheduler.release(scheduler.acquire("m", 1), ok=True)
+    assert state.concurrency == 8.0
+
+
+def test_429_pauses_for_retry_after_with_jitter(scheduler):
+    limited = RATE_LIMITED.value("m")
+    before = time.monotonic()
+    scheduler.observe_response("m", 429, {"retry-after": "2"})
+    after = time.monotonic()
+
+    blocked_until = scheduler._state("m").requests.blocked_until
+    assert before + 2.0 <= blocked_until <= after + 2.5
+    assert RATE_LIMITED.value("m") == limited + 1
+
+
+def test_429_without_retry_after_pauses_one_second(scheduler):
+    before = time.monotonic()
+    scheduler.observe_response("m", 429, {})
+    assert before + 1.0 <= scheduler._state("m").requests.blocked_until <= time.monotonic() + 1.25
+
+
+def test_rate_limit_headers_sync_the_buckets(scheduler):
+    scheduler.observe_response(
+        "m",
+        200,
+        {
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "2m",
+            "x-ratelimit-remaining-tokens": "100",
+        },
+    )
+    state = scheduler._state("m")
+    assert state.requests.blocked_until >= time.monotonic() + 119
+    assert state.tokens.level == pytest.approx(100, abs=1)
+
+
+def test_waiters_are_admitted_by_priority_then_fifo():
+    scheduler = LLMScheduler(default_limits=ModelLimits(6000, 600000, max_concurrency=1))
+    admitted = []
+
+    async def run():
+        held = await scheduler.acquire_async("m", 1)
+
+        async def call(name, priority):
+            permit = await scheduler.acquire_async("m", 1, priority)
+            admitted.append(name)
+            scheduler.release(permit)
+
+        calls = [
+            asyncio.create_task(call("normal-1", NORMAL)),
+            asyncio.create_task(call("normal-2", NORMAL)),
+            asyncio.create_task(call("interactive", INTERACTIVE)),
+        ]
+        await asyncio.sleep(0.01)
+        scheduler.release(held)
+        await asyncio.wait_for(asyncio.gather(*calls), 1)
+
+    asyncio.run(run())
+    assert admitted == ["interactive", "normal-1", "normal-2"]
+
+
+def test_cancelled_waiter_leaves_the_queue(scheduler):
+    async def run():
+        scheduler._state("m").concurrency = 1
+        held = await scheduler.acquire_async("m", 1)
+        waiting = asyncio.create_task(scheduler.acquire_async("m", 1))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        scheduler.release(held)
+        return scheduler._state("m")
+
+    state = asyncio.run(run())
+    assert state.waiters == [] and state.in_flight == 0
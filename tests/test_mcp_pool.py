@@ -0,0 +1,71 @@
+import asyncio
+
+import anyio
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData
+
+from mcp_pool import MCPSessionPool, _PooledSession
+
+
+@pytest.fixture
+def pool():
+    pool = MCPSessionPool({"currency_server": {}})
+    yield pool
+    pool._loop.close()
+
+
+def _run(pool, operation, sessions=2):
+    async def run():
+        pool._idle["currency_server"] = asyncio.Queue()
+        pooled = [_PooledSession(pool, "currency_server", i) for i in range(sessions)]
+        for session in pooled:
+            session.session = object()
+            pool._release(session)
+        try:
+            return await pool._with_session("currency_server", operation), pooled
+        except Exception as e:
+            return e, pooled
+
+    return asyncio.run(run())
+
+
+def test_server_error_is_raised_without_retry(pool):
+    calls = []
+
+    async def operation(session):
+        calls.append(session)
+        raise McpError(ErrorData(code=-32602, message="Unknown tool"))
+
+    error, pooled = _run(pool, operation)
+
+    assert isinstance(error, McpError)
+    assert len(calls) == 1
+    assert not any(session.broken.is_set() for session in pooled)
+    assert pool._idle["currency_server"].qsize() == 2
+
+
+def test_transport_error_retries_on_another_session(pool):
+    calls = []
+
+    async def operation(session):
+        calls.append(session)
+        if len(calls) == 1:
+            raise anyio.ClosedResourceError()
+        return "ok"
+
+    result, pooled = _run(pool, operation)
+
+    assert result == "ok"
+    assert calls == [pooled[0].session, pooled[1].session]
+    assert pooled[0].broken.is_set() and not pooled[1].broken.is_set()
+
+
+def test_transport_error_twice_is_raised(pool):
+    async def operation(session):
+        raise anyio.BrokenResourceError()
+
+    error, pooled = _run(pool, operation)
+
+    assert isinstance(error, anyio.BrokenResourceError)
+    assert all(session.broken.is_set() for session in pooled)
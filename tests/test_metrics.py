@@ -0,0 +1,62 @@
+import pytest
+
+from metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def _samples(registry, prefix):
+    return {
+        line.rsplit(" ", 1)[0]: line.rsplit(" ", 1)[1]
+        for line in registry.render().splitlines()
+        if line.startswith(prefix)
+    }
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive(registry):
+    histogram = registry.histogram("latency", "Latency.", ("method",), buckets=(0.5, 0.1, 1.0))
+    for value in (0.05, 0.1, 0.3, 1.0, 7.0):
+        histogram.observe(value, "get")
+
+    assert _samples(registry, "latency") == {
+        'latency_bucket{method="get",le="0.1"}': "2",
+        'latency_bucket{method="get",le="0.5"}': "3",
+        'latency_bucket{method="get",le="1"}': "4",
+        'latency_bucket{method="get",le="+Inf"}': "5",
+        'latency_sum{method="get"}': "8.45",
+        'latency_count{method="get"}': "5",
+    }
+    assert histogram.count("get") == 5
+    assert histogram.count("send") == 0
+
+
+def test_histogram_series_are_per_label_set(registry):
+    histogram = registry.histogram("latency", "Latency.", ("method",), buckets=(1.0,))
+    histogram.observe(0.5, "get")
+    histogram.observe(2.0, "send")
+
+    samples = _samples(registry, "latency_bucket")
+    assert samples['latency_bucket{method="get",le="1"}'] == "1"
+    assert samples['latency_bucket{method="send",le="1"}'] == "0"
+    assert samples['latency_bucket{method="send",le="+Inf"}'] == "1"
+
+
+def test_counter_and_escaped_labels(registry):
+    counter = registry.counter("requests", "Requests.", ("method",))
+    counter.inc('a"b\n')
+    counter.inc('a"b\n', amount=2)
+
+    assert counter.value('a"b\n') == 3
+    assert _samples(registry, "requests") == {'requests{method="a\\"b\\n"}': "3"}
+
+
+def test_collectors_are_read_at_scrape_time(registry):
+    queue = []
+    registry.register_collector("queue_depth", "Queue depth.", lambda: [({}, len(queue))])
+    queue.extend([1, 2])
+
+    assert "# TYPE queue_depth gauge" in registry.render()
+    assert _samples(registry, "queue_depth") == {"queue_depth": "2"}
@@ -0,0 +1,108 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from rate_cache import ExchangeRateCache, RateTable
+
+PAST = "2020-01-02"
+
+
+class FakeSource:
+    def __init__(self):
+        self.calls = []
+        self.history: dict[tuple[str, str], dict[str, float]] = {}
+
+    async def __call__(self, base, date):
+        self.calls.append((base, date))
+        rates = self.history.get((base, date))
+        if rates is not None:
+            return rates
+        return RateTable({"EUR": 0.85, "GBP": 0.85, "USD": 0.85}, provisional=True)
+
+
+def test_provisional_historical_table_expires_with_latest_ttl(monkeypatch):
+    source = FakeSource()
+    cache = ExchangeRateCache(source, latest_ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr("rate_cache.time.monotonic", lambda: now[0])
+
+    assert asyncio.run(cache.get_rate("USD", "EUR", PAST)) == pytest.approx(0.85)
+    source.history[("USD", PAST)] = {"EUR": 0.9}
+    now[0] += 61
+    assert asyncio.run(cache.get_rate("USD", "EUR", PAST)) == pytest.approx(0.9)
+
+
+def test_real_table_replaces_provisional_row():
+    source = FakeSource()
+    cache = ExchangeRateCache(source)
+    assert asyncio.run(cache.get_rate("USD", "EUR", PAST)) == pytest.approx(0.85)
+    source.history[("CHF", PAST)] = {"EUR": 0.95, "USD": 1.1}
+    assert asyncio.run(cache.get_rate("CHF", "EUR", PAST)) == pytest.approx(0.95)
+    assert cache.cached_rate("USD", "EUR", PAST) == pytest.approx(0.95 / 1.1)
+
+
+def test_real_historical_table_is_kept():
+    source = FakeSource()
+    source.history[("USD", PAST)] = {"EUR": 0.9}
+    cache = ExchangeRateCache(source, latest_ttl=0)
+    assert asyncio.run(cache.get_rate("USD", "EUR", PAST)) == pytest.approx(0.9)
+    assert cache.cached_rate("EUR", "USD", PAST) == pytest.approx(1 / 0.9)
+
+
+def test_missing_pair_in_cached_table_is_not_refetched():
+    source = FakeSource()
+    source.history[("USD", PAST)] = {"EUR": 0.9, "GBP": 0.8}
+    cache = ExchangeRateCache(source)
+
+    for _ in range(3):
+        assert asyncio.run(cache.get_rate("USD", "JPY", PAST)) is None
+        rates = asyncio.run(cache.get_rates(["USD", "USD"], ["EUR", "JPY"], PAST))
+        assert rates[0] == pytest.approx(0.9)
+    assert source.calls == [("USD", PAST)]
+    assert cache.stats["misses"] == 5
+
+
+def test_each_table_keeps_its_own_expiry(monkeypatch):
+    source = FakeSource()
+    source.history[("USD", "latest")] = {"EUR": 0.9}
+    source.history[("JPY", "latest")] = {"KRW": 9.0}
+    cache = ExchangeRateCache(source, latest_ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr("rate_cache.time.monotonic", lambda: now[0])
+
+    asyncio.run(cache.get_rate("USD", "EUR", "latest"))
+    now[0] += 40
+    asyncio.run(cache.get_rate("JPY", "KRW", "latest"))
+    now[0] += 30
+    # The USD table expired; the JPY table merged later is still served.
+    assert cache.cached_rate("JPY", "KRW", "latest") == pytest.approx(9.0)
+    assert cache.cached_rate("USD", "EUR", "latest") is None
+    assert asyncio.run(cache.get_rate("USD", "EUR", "latest")) == pytest.approx(0.9)
+    assert source.calls == [("USD", "latest"), ("JPY", "latest"), ("USD", "latest")]
+
+
+def test_concurrent_loops_share_the_cache_under_eviction():
+    dates = [f"2020-01-{day:02d}" for day in range(1, 29)]
+
+    async def fetch(base, date):
+        await asyncio.sleep(0)
+        return {"EUR": 0.9, "GBP": 0.8}
+
+    cache = ExchangeRateCache(fetch, max_dates=4)
+
+    def worker(offset):
+        async def run():
+            for i in range(200):
+                date = dates[(i + offset) % len(dates)]
+                rate = await cache.get_rate("USD", "EUR", date)
+                assert rate == pytest.approx(0.9)
+                rates = await cache.get_rates(["EUR", "USD"], ["GBP", "GBP"], date)
+                assert rates[1] == pytest.approx(0.8)
+
+        asyncio.run(run())
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for future in [pool.submit(worker, offset) for offset in range(4)]:
+            future.result()
+    assert len(cache._dates) <= 4
@@ -0,0 +1,61 @@
+import math
+
+import pytest
+
+from rate_engine import RateEngine
+
+
+@pytest.fixture
+def engine():
+    engine = RateEngine(row_capacity=1, column_capacity=1)
+    engine.update("2024-01-02", "USD", {"EUR": 0.9, "GBP": 0.8})
+    return engine
+
+
+def test_cross_and_inverse_rates(engine):
+    assert engine.rate("USD", "EUR", "2024-01-02") == pytest.approx(0.9)
+    assert engine.rate("EUR", "USD", "2024-01-02") == pytest.approx(1 / 0.9)
+    assert engine.rate("EUR", "GBP", "2024-01-02") == pytest.approx(0.8 / 0.9)
+    assert engine.rate("USD", "JPY", "2024-01-02") is None
+
+
+def test_merge_overwrites_existing_quotes(engine):
+    engine.update("2024-01-02", "EUR", {"USD": 1.0, "CHF": 0.95})
+    assert engine.rate("EUR", "USD", "2024-01-02") == pytest.approx(1.0)
+    assert engine.rate("EUR", "CHF", "2024-01-02") == pytest.approx(0.95)
+    # GBP was only quoted by the USD table; its rate to the new table's base stays.
+    assert engine.rate("EUR", "GBP", "2024-01-02") == pytest.approx(0.8 / 0.9)
+
+
+def test_fresh_table_for_the_same_base_replaces_its_quotes(engine):
+    engine.update("2024-01-02", "USD", {"EUR": 0.92})
+    assert engine.rate("USD", "EUR", "2024-01-02") == pytest.approx(0.92)
+    assert engine.rate("USD", "GBP", "2024-01-02") == pytest.approx(0.8)
+
+
+@pytest.mark.parametrize("base, rates", [("XXX", {}), ("JPY", {"KRW": 9.0})])
+def test_empty_or_disjoint_update_keeps_existing_quotes(engine, base, rates):
+    engine.update("2024-01-02", base, rates)
+    assert engine.rate("USD", "EUR", "2024-01-02") == pytest.approx(0.9)
+    assert engine.rate("EUR", "GBP", "2024-01-02") == pytest.approx(0.8 / 0.9)
+
+
+def test_disjoint_tables_are_linked_later(engine):
+    engine.update("2024-01-02", "JPY", {"KRW": 9.0})
+    assert engine.rate("JPY", "KRW", "2024-01-02") == pytest.approx(9.0)
+    assert engine.rate("USD", "KRW", "2024-01-02") is None
+    engine.update("2024-01-02", "USD", {"JPY": 150.0})
+    assert engine.rate("USD", "KRW", "2024-01-02") == pytest.approx(1350.0)
+    assert engine.rate("GBP", "KRW", "2024-01-02") == pytest.approx(1350.0 / 0.8)
+    rates = engine.rates(["USD", "JPY", "EUR", "ZZZ"], ["KRW", "KRW", "GBP", "USD"], "2024-01-02")
+    assert rates[:3] == pytest.approx([1350.0, 9.0, 0.8 / 0.9])
+    assert math.isnan(rates[3])
+
+
+def test_drop_frees_all_rows(engine):
+    engine.update("2024-01-02", "JPY", {"KRW": 9.0})
+    engine.drop("2024-01-02")
+    assert not engine.has_date("2024-01-02")
+    assert engine.rate("USD", "EUR", "2024-01-02") is None
+    engine.update("2024-01-03", "USD", {"EUR": 0.91})
+    assert engine.rate("USD", "EUR", "2024-01-03") == pytest.approx(0.91)
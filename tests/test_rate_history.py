@@ -0,0 +1,34 @@
+import pytest
+
+from rate_history import RateHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RateHistory(str(tmp_path))
+    history.append("2024-03-01", {"EUR": 0.9, "GBP": 0.8})
+    return history
+
+
+def test_rate_and_table(history):
+    assert history.rate("EUR", "GBP", "2024-03-01") == pytest.approx(0.8 / 0.9)
+    assert history.table("EUR", "2024-03-01") == pytest.approx({"GBP": 0.8 / 0.9, "USD": 1 / 0.9})
+    assert history.rate("USD", "EUR", "2024-03-02") is None
+    assert history.rate("USD", "EUR", "2024-02-29") is None
+
+
+@pytest.mark.parametrize("date", ["latest", "2024-13-01", ""])
+def test_malformed_date_is_a_miss(history, date):
+    assert history.rate("USD", "EUR", date) is None
+    assert history.table("USD", date) is None
+    for start, end in ((date, "2024-03-01"), ("2024-03-01", date)):
+        lo, rates = history.series("USD", "EUR", start, end)
+        assert lo == 0 and len(rates) == 0
+        assert history.stats("USD", "EUR", start, end) is None
+
+
+def test_missing_store(tmp_path):
+    history = RateHistory(str(tmp_path / "missing"))
+
+    assert history.rate("USD", "EUR", "2024-03-01") is None
+    assert history.currencies == []
@@ -0,0 +1,91 @@
+import pytest
+
+from semantic_cache import SemanticCache, anchors, content_words
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(max_entries=16)
+
+
+@pytest.mark.parametrize(
+    "cached, query",
+    [
+        ("Sort a list ascending", "Please sort a list ascending!"),
+        ("Reverse a linked list", "can you reverse a linked list?"),
+        ("Implement binary search in Python", "  IMPLEMENT binary search in python  "),
+        ("Sort the lists ascending", "sort a list ascending"),
+        ("Explain the time complexity of radix sort", "Explain radix sort time complexity"),
+        ("Write a function for a bloom filter", "Write a bloom filter function"),
+    ],
+)
+def test_paraphrase_hits(cache, cached, query):
+    cache.put("agent", cached, "answer")
+    assert cache.get("agent", query) == "answer"
+
+
+@pytest.mark.parametrize(
+    "cached, query",
+    [
+        ("Sort a list ascending", "Sort a list descending"),
+        ("Reverse a linked list", "Reverse a doubly linked list"),
+        ("Reverse a singly linked list", "Reverse a doubly linked list"),
+        ("Implement binary search in Python", "Implement binary search in Java"),
+        ("Find the maximum of an array", "Find the minimum of an array"),
+    ],
+)
+def test_one_modifier_changed_misses(cache, cached, query):
+    cache.put("agent", cached, "answer")
+    assert cache.get("agent", query) is None
+
+
+@pytest.mark.parametrize(
+    "cached, query",
+    [
+        ("Convert 100 USD to EUR", "Convert 100 EUR to USD"),
+        ("Convert 100 USD to EUR", "Convert 1000 USD to EUR"),
+        ("Convert 100 USD to EUR", "Convert 100 USD to GBP"),
+    ],
+)
+def test_amounts_and_currencies_must_match_at_any_threshold(cached, query):
+    cache = SemanticCache(threshold=0.5, max_entries=16)
+    cache.put("agent", cached, "answer")
+    assert cache.get("agent", query) is None
+
+
+def test_threshold_decides_rewordings(cache):
+    cache.put("agent", "Implement heapsort in Python", "answer")
+    reworded = "Python implementation of heapsort"
+
+    cache.threshold = 0.9
+    assert cache.get("agent", reworded) is None
+    cache.threshold = 0.8
+    assert cache.get("agent", reworded) == "answer"
+
+
+def test_picks_the_closest_candidate(cache):
+    cache.put("agent", "Sort a list ascending", "ascending")
+    cache.put("agent", "Sort a list descending", "descending")
+    assert cache.get("agent", "please sort a list descending") == "descending"
+    assert cache.get("agent", "sort a list ascending?") == "ascending"
+
+
+def test_namespaces_are_separate(cache):
+    cache.put("a", "Sort a list ascending", "answer")
+    assert cache.get("b", "Sort a list ascending") is None
+
+
+def test_clear_resets_slots_and_expiry(cache):
+    cache.put("agent", "Sort a list ascending", "answer")
+    cache.clear()
+    assert cache.get("agent", "Sort a list ascending") is None
+    assert cache._next_slot == 0
+    assert not cache._expires.any()
+
+
+def test_content_words_drop_filler_and_keep_order():
+    assert content_words("Can you please convert the USD to EUR?") == ("convert", "usd", "to", "eur")
+
+
+def test_anchors_are_numbers_and_currency_codes_in_order():
+    assert anchors("Convert 1,250.50 usd to EUR, try it all") == ("1250.50", "usd", "eur")
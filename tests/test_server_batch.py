@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+from bench_dispatch import NoOpTaskManager
+from server import A2AServer
+
+
+def _batch(items):
+    server = A2AServer(task_manager=NoOpTaskManager())
+    response = asyncio.run(server._process_batch(items))
+    return json.loads(response.body)
+
+
+def test_malformed_items_get_their_own_invalid_request():
+    responses = _batch(
+        [
+            {"jsonrpc": "2.0", "id": 1, "method": ["tasks/get"], "params": {}},
+            {"jsonrpc": "2.0", "id": {"a": 1}, "method": {"a": 1}},
+            {"jsonrpc": "2.0", "id": 3},
+            {"jsonrpc": "2.0", "id": 4, "method": "tasks/get", "params": {"id": "bench"}},
+        ]
+    )
+
+    assert [(r.get("id"), r.get("error", {}).get("code")) for r in responses] == [
+        (1, -32600),
+        (None, -32600),
+        (3, -32600),
+        (4, None),
+    ]
+    assert responses[3]["result"]["id"] == "bench"
+
+
+def test_streaming_methods_are_rejected_per_item():
+    responses = _batch([{"jsonrpc": "2.0", "id": 1, "method": "tasks/sendSubscribe", "params": {}}])
+
+    assert responses[0]["error"]["code"] == -32600
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from custom_types import Message, TaskSendParams
+from push_notification_auth import PushNotificationSenderAuth
+from task_manager import AgentTaskManager
+
+
+class FakeAgent:
+    def __init__(self):
+        self.history: set[str] = set()
+        self.recorded = []
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    def has_history(self, query, sessionId):
+        return sessionId in self.history
+
+    def record_turn(self, query, sessionId, response):
+        self.recorded.append((query, sessionId))
+
+    async def stream(self, query, sessionId):
+        yield {"is_task_complete": False, "require_user_input": False, "content": "Working..."}
+        self.started.set()
+        await self.release.wait()
+        yield {"is_task_complete": True, "require_user_input": False, "content": f"Echo: {query}"}
+
+
+def _params(task_id, session_id, text="convert 100 USD to EUR"):
+    return TaskSendParams(
+        id=task_id,
+        sessionId=session_id,
+        message=Message(role="user", parts=[{"type": "text", "text": text}]),
+    )
+
+
+@pytest.fixture
+def manager():
+    return AgentTaskManager(FakeAgent(), PushNotificationSenderAuth())
+
+
+def test_coalescing_key_asks_the_checkpointer(manager):
+    manager.agent.history.add("old")
+
+    assert asyncio.run(manager._coalescing_key(_params("t1", "new"))) == "convert 100 usd to eur"
+    assert asyncio.run(manager._coalescing_key(_params("t2", "old"))) is None
+    manager.coalesce_requests = False
+    assert asyncio.run(manager._coalescing_key(_params("t3", "new"))) is None
+
+
+def test_followers_share_the_run_and_record_it(manager):
+    async def run():
+        def start():
+            return manager.agent.stream("q", "a")
+
+        leader = manager._coalesced("q", "q", "a", start)
+        follower = manager._coalesced("q", "q", "b", start)
+        consume = [asyncio.create_task(_collect(leader)), asyncio.create_task(_collect(follower))]
+        await manager.agent.started.wait()
+        manager.agent.release.set()
+        return await asyncio.gather(*consume)
+
+    leader, follower = asyncio.run(run())
+    assert leader == follower == ["Working...", "Echo: q"]
+    assert manager.agent.recorded == [("q", "b")]
+
+
+def test_cancelled_flight_ends_the_followers(manager):
+    async def run():
+        def start():
+            return manager.agent.stream("q", "a")
+
+        leader = asyncio.create_task(_collect(manager._coalesced("q", "q", "a", start)))
+        follower = asyncio.create_task(_collect(manager._coalesced("q", "q", "b", start)))
+        await manager.agent.started.wait()
+        manager._flights["q"].task.cancel()
+        return await asyncio.wait_for(
+            asyncio.gather(leader, follower, return_exceptions=True), timeout=1
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert manager._flights == {}
+
+
+async def _collect(stream):
+    return [item["content"] async for item in stream]
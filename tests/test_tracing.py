@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from tracing import (
+    NOOP_SPAN,
+    TRACEPARENT,
+    JsonLinesExporter,
+    SpanContext,
+    Tracer,
+    current_traceparent,
+    extract,
+    inject_headers,
+    inject_metadata,
+)
+
+PARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+@pytest.fixture
+def exported(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer("test", JsonLinesExporter(str(path)))
+
+    def spans():
+        tracer.exporter._file.flush()
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    return tracer, spans
+
+
+def test_untraced_request_gets_the_noop_span():
+    tracer = Tracer("test")
+
+    with tracer.span("a2a.server tasks/get") as span:
+        assert span is NOOP_SPAN
+        assert current_traceparent() is None
+        assert inject_headers({"accept": "text/plain"}) == {"accept": "text/plain"}
+        assert inject_metadata(None) is None
+
+
+def test_incoming_traceparent_propagates_without_an_exporter():
+    tracer = Tracer("test")
+    parent = extract({TRACEPARENT: PARENT})
+
+    with tracer.span("a2a.server tasks/send", parent=parent) as span:
+        assert span.context.trace_id == parent.trace_id
+        assert span.parent_span_id == parent.span_id
+        outgoing = inject_metadata({"user": "x"})
+    assert outgoing["user"] == "x"
+    child = SpanContext.from_traceparent(outgoing[TRACEPARENT])
+    assert child.trace_id == parent.trace_id
+    assert child.span_id == span.context.span_id != parent.span_id
+    assert current_traceparent() is None
+
+
+def test_metadata_wins_over_headers():
+    other = "00-" + "1" * 32 + "-" + "2" * 16 + "-01"
+    context = extract({TRACEPARENT: other}, {TRACEPARENT: PARENT})
+    assert context.to_traceparent() == PARENT
+    assert extract({TRACEPARENT: "garbage"}) is None
+
+
+def test_exported_spans_form_a_tree(exported):
+    tracer, spans = exported
+
+    with tracer.span("root") as root:
+        with tracer.span("child", attributes={"k": 1}):
+            pass
+        detached = tracer.start_span("stream")
+    tracer.end_span(detached)
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("boom")
+
+    by_name = {span["name"]: span for span in spans()}
+    assert len(root.context.trace_id) == 32 and len(root.context.span_id) == 16
+    assert by_name["root"]["parentSpanId"] is None
+    assert by_name["child"]["parentSpanId"] == root.context.span_id
+    assert by_name["child"]["attributes"] == {"k": 1}
+    assert by_name["stream"]["parentSpanId"] == root.context.span_id
+    assert by_name["failing"]["status"] == "ERROR"
+    assert by_name["failing"]["traceId"] != root.context.trace_id
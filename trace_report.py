@@ -0,0 +1,95 @@
+"""Rebuilds request span trees from the JSON-lines files written by tracing.py.
+
+Spans from several processes (host, A2A server) can be combined by passing
+all of their trace files. For each trace the tree is printed with durations,
+and the critical path (the child that finished last, level by level) is
+marked with "*".
+
+    python trace_report.py host_traces.jsonl server_traces.jsonl --trace-id <id>
+"""
+
+import json
+from collections import defaultdict
+
+import click
+
+
+def load_spans(paths) -> list[dict]:
+    spans = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    spans.append(json.loads(line))
+    return spans
+
+
+def _duration_ms(span: dict) -> float:
+    return (span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1e6
+
+
+def _critical_path(span_id: str, children: dict[str, list[dict]]) -> set[str]:
+    path = set()
+    while children.get(span_id):
+        last = max(children[span_id], key=lambda s: s["endTimeUnixNano"])
+        path.add(last["spanId"])
+        span_id = last["spanId"]
+    return path
+
+
+def print_trace(trace_id: str, spans: list[dict]):
+    by_id = {span["spanId"]: span for span in spans}
+    children: dict[str, list[dict]] = defaultdict(list)
+    roots = []
+    for span in spans:
+        parent = span.get("parentSpanId")
+        if parent and parent in by_id:
+            children[parent].append(span)
+        else:
+            roots.append(span)
+
+    click.echo(f"trace {trace_id}")
+    for root in sorted(roots, key=lambda s: s["startTimeUnixNano"]):
+        critical = {root["spanId"]} | _critical_path(root["spanId"], children)
+        origin = root["startTimeUnixNano"]
+
+        def walk(span: dict, depth: int):
+            marker = "*" if span["spanId"] in critical else " "
+            offset = (span["startTimeUnixNano"] - origin) / 1e6
+            click.echo(
+                f"{marker} {'  ' * depth}{span['name']} [{span['service']}] "
+                f"+{offset:.1f}ms {_duration_ms(span):.1f}ms {span['status']}"
+            )
+            for child in sorted(children[span["spanId"]], key=lambda s: s["startTimeUnixNano"]):
+                walk(child, depth + 1)
+
+        walk(root, 0)
+
+
+@click.command()
+@click.argument("paths", nargs=-1, required=True)
+@click.option("--trace-id", "trace_id", default=None, help="Only print this trace.")
+@click.option("--slowest", default=5, help="Number of slowest traces to print.")
+def main(paths, trace_id, slowest):
+    traces: dict[str, list[dict]] = defaultdict(list)
+    for span in load_spans(paths):
+        traces[span["traceId"]].append(span)
+
+    if trace_id:
+        selected = [trace_id] if trace_id in traces else []
+    else:
+        selected = sorted(
+            traces,
+            key=lambda t: max(s["endTimeUnixNano"] for s in traces[t])
+            - min(s["startTimeUnixNano"] for s in traces[t]),
+            reverse=True,
+        )[:slowest]
+
+    for tid in selected:
+        print_trace(tid, traces[tid])
+        click.echo()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Lightweight distributed tracing for the host -> A2A -> agent -> MCP path.
+
+Spans follow the W3C trace-context model: the active span lives in a
+ContextVar, and it crosses process boundaries as a ``traceparent`` value
+carried both in HTTP headers and in the JSON-RPC ``metadata``. Finished spans
+are appended as JSON lines (OTLP-like field names) to the file named by
+``A2A_TRACE_FILE``. With no file configured, spans are only created below an
+incoming ``traceparent``, so context keeps propagating for the caller's
+trace. Everything else gets the shared NOOP_SPAN, which costs no ids and
+records nothing.
+
+Use trace_report.py to rebuild the span tree of one trace from that file.
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, ContextManager, Mapping
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = "traceparent"
+
+
+class SpanContext:
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @classmethod
+    def from_traceparent(cls, value: str | None) -> "SpanContext | None":
+        if not value:
+            return None
+        parts = value.strip().split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        return cls(parts[1], parts[2])
+
+
+# Span ids need to be unique, not unpredictable; seeded apart from the global
+# generator so that code seeding ``random`` does not produce colliding ids.
+_ids = random.Random()
+
+
+class Span:
+    recording = True
+
+    def __init__(
+        self,
+        name: str,
+        parent: SpanContext | None,
+        attributes: dict[str, Any] | None = None,
+    ):
+        self.name = name
+        self.context = SpanContext(
+            parent.trace_id if parent else f"{_ids.getrandbits(128):032x}",
+            f"{_ids.getrandbits(64):016x}",
+        )
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.status = "OK"
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, e: BaseException):
+        self.status = "ERROR"
+        self.attributes["exception.type"] = type(e).__name__
+        self.attributes["exception.message"] = str(e)
+
+    def to_dict(self, service_name: str) -> dict[str, Any]:
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "service": service_name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class _NoopSpan(Span):
+    """Stands in for spans nobody will see: no exporter and no remote parent."""
+
+    recording = False
+
+    def __init__(self):
+        self.name = ""
+        self.context = None
+        self.parent_span_id = None
+        self.attributes = {}
+        self.status = "OK"
+        self.start_ns = 0
+        self.end_ns = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, e: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonLinesExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def export(self, record: dict[str, Any]):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+
+_current_span: ContextVar[Span | None] = ContextVar("a2a_current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, service_name: str, exporter: JsonLinesExporter | None = None):
+        self.service_name = service_name
+        self.exporter = exporter
+
+    def start_span(
+        self,
+        name: str,
+        parent: SpanContext | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Span:
+        """Starts a span without activating it; pair with end_span()."""
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current else None
+        if parent is None and self.exporter is None:
+            return NOOP_SPAN
+        return Span(name, parent, attributes)
+
+    def end_span(self, span: Span):
+        if not span.recording:
+            return
+        span.end_ns = time.time_ns()
+        if self.exporter is not None:
+            try:
+                self.exporter.export(span.to_dict(self.service_name))
+            except Exception as e:
+                logger.warning(f"Failed to export span {span.name}: {e}")
+
+    def span(
+        self,
+        name: str,
+        parent: SpanContext | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> ContextManager[Span]:
+        """Runs the block inside a new span that is the current span."""
+        span = self.start_span(name, parent, attributes)
+        if not span.recording:
+            return _NOOP_SCOPE
+        return _SpanScope(self, span)
+
+
+class _SpanScope:
+    """Makes the span current for the block, ending it on exit.
+
+    A plain class rather than @contextmanager: every request enters one, and
+    the generator machinery costs more than the no-op span itself.
+    """
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: Tracer, span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.span.record_exception(exc)
+        _current_span.reset(self.token)
+        self.tracer.end_span(self.span)
+        return False
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> Span:
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+def current_traceparent() -> str | None:
+    span = _current_span.get()
+    return span.context.to_traceparent() if span and span.recording else None
+
+
+def _traceparent_for(span: Span | None) -> str | None:
+    if span is None:
+        return current_traceparent()
+    return span.context.to_traceparent() if span.recording else None
+
+
+def inject_headers(
+    headers: dict[str, str] | None = None, span: Span | None = None
+) -> dict[str, str]:
+    """Returns a copy of ``headers`` carrying the given (or current) span."""
+    headers = dict(headers or {})
+    traceparent = _traceparent_for(span)
+    if traceparent:
+        headers[TRACEPARENT] = traceparent
+    return headers
+
+
+def inject_metadata(
+    metadata: dict[str, Any] | None, span: Span | None = None
+) -> dict[str, Any] | None:
+    """Returns a copy of a JSON-RPC ``metadata`` dict carrying the span."""
+    traceparent = _traceparent_for(span)
+    if not traceparent:
+        return metadata
+    return {**(metadata or {}), TRACEPARENT: traceparent}
+
+
+def extract(
+    headers: Mapping[str, str] | None = None, metadata: Mapping[str, Any] | None = None
+) -> SpanContext | None:
+    """Finds the remote parent, preferring JSON-RPC metadata over HTTP headers."""
+    if metadata and metadata.get(TRACEPARENT):
+        return SpanContext.from_traceparent(metadata[TRACEPARENT])
+    if headers:
+        return SpanContext.from_traceparent(headers.get(TRACEPARENT))
+    return None
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Records LangChain chat-model and tool runs (e.g. MCP tools) as spans."""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self._spans: dict[UUID, Span] = {}
+
+    def _start(self, run_id: UUID, name: str, attributes: dict[str, Any]):
+        self._spans[run_id] = self.tracer.start_span(name, attributes=attributes)
+
+    def _end(self, run_id: UUID, error: BaseException | None = None):
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        if error is not None:
+            span.record_exception(error)
+        self.tracer.end_span(span)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model", "")
+        n_messages = len(messages[0]) if messages else 0
+        self._start(run_id, "llm.chat", {"llm.model": model, "llm.messages": n_messages})
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        tool_name = (serialized or {}).get("name", "tool")
+        self._start(run_id, f"tool.{tool_name}", {"tool.input": str(input_str)[:512]})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+def _default_service_name() -> str:
+    script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "a2a"
+    return os.getenv("A2A_SERVICE_NAME") or os.path.splitext(script)[0]
+
+
+def configure_tracing(path: str | None, service_name: str | None = None) -> Tracer:
+    """(Re)configures the process-wide tracer; ``path=None`` disables export."""
+    TRACER.exporter = JsonLinesExporter(path) if path else None
+    if service_name:
+        TRACER.service_name = service_name
+    return TRACER
+
+
+TRACER = Tracer(_default_service_name())
+if os.getenv("A2A_TRACE_FILE"):
+    configure_tracing(os.getenv("A2A_TRACE_FILE"))
+
+TRACING_CALLBACK = TracingCallbackHandler(TRACER)
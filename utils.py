@@ -1,5 +1,7 @@
 
-from typing import List
+import asyncio
+import threading
+from typing import Any, Coroutine, List
 
 from custom_types import (
     ContentTypeNotSupportedError,
@@ -28,3 +30,30 @@ def new_incompatible_types_error(request_id):
 
 def new_not_implemented_error(request_id):
     return JSONRPCResponse(id=request_id, error=UnsupportedOperationError())
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Runs a coroutine to completion from synchronous code.
+
+    Falls back to a worker thread when the caller already runs inside an
+    event loop, where ``asyncio.run`` is not allowed.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: dict[str, Any] = {}
+
+    def _runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=_runner, daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]